@@ -0,0 +1,83 @@
+"""Per-stage output token budgets learned from earlier calls."""
+
+import json
+import math
+import tempfile
+from collections import defaultdict, deque
+from pathlib import Path
+
+from src.core.config import Config
+from src.core.telemetry import percentile
+
+OUTPUT_LENGTHS_FILE = "output_lengths.json"
+DEFAULT_PERCENTILE = 0.95
+MIN_SAMPLES = 20
+MAX_SAMPLES = 200
+MIN_MAX_TOKENS = 512
+# Output lengths are estimated from characters, which undercounts tokens of
+# non-Latin text, so the limit leaves this much room above the percentile.
+HEADROOM = 2.0
+
+
+class OutputBudget:
+    """Sets ``max_tokens`` per stage from the lengths of past responses.
+
+    The last ``max_samples`` output lengths of every stage are kept (and
+    persisted across sessions when a path is given). Once a stage has
+    ``min_samples`` of them, its limit is the ``percentile`` length times
+    :data:`HEADROOM`, never below :data:`MIN_MAX_TOKENS` nor above the
+    configured ``max_tokens``. A short Stage 1 list then no longer reserves
+    the provider quota of a full dossier.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        percentile: float = DEFAULT_PERCENTILE,
+        min_samples: int = MIN_SAMPLES,
+        max_samples: int = MAX_SAMPLES,
+    ) -> None:
+        if not 0 < percentile <= 1:
+            raise ValueError("Percentile must be in (0, 1]")
+        self.path = Path(path) if path is not None else None
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._samples: defaultdict[str, deque[int]] = defaultdict(
+            lambda: deque(maxlen=max_samples)
+        )
+        if self.path is not None and self.path.exists():
+            with self.path.open(encoding="utf-8") as f:
+                for stage, lengths in json.load(f)["stages"].items():
+                    self._samples[stage].extend(lengths)
+
+    @classmethod
+    def from_config(cls, config: Config) -> "OutputBudget":
+        """Budget persisted in the cache directory."""
+        return cls(
+            Path(config.data.cache_dir) / OUTPUT_LENGTHS_FILE,
+            config.llm.max_tokens_percentile,
+        )
+
+    def record(self, stage: str, tokens: int) -> None:
+        """Add the output length of a finished call."""
+        self._samples[stage].append(tokens)
+
+    def limit(self, stage: str, ceiling: int) -> int | None:
+        """Learned ``max_tokens`` for a stage, or None while still learning."""
+        samples = self._samples.get(stage)
+        if samples is None or len(samples) < self.min_samples:
+            return None
+        learned = math.ceil(percentile(list(samples), self.percentile) * HEADROOM)
+        return min(ceiling, max(MIN_MAX_TOKENS, learned))
+
+    def save(self) -> None:
+        """Persist the samples, replacing the previous file atomically."""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        stages = {stage: list(lengths) for stage, lengths in self._samples.items()}
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.path.parent, suffix=".tmp", delete=False
+        ) as f:
+            json.dump({"stages": stages}, f)
+        Path(f.name).replace(self.path)
@@ -0,0 +1,168 @@
+"""Record and replay of LLM traffic ("cassettes") for whole research sessions.
+
+A cassette is a JSON-lines file (gzip-compressed when the name ends in
+``.gz``): a header line, then one line per call with the request key, the
+streamed chunks and their offsets from the start of the call.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import logging
+import time
+from collections import defaultdict, deque
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import IO, Any
+
+from src.core.config import LLMConfig
+from src.core.llm_client import LLMClient, LLMError, LLMRequest, TransientLLMError
+from src.core.retry import is_retryable
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+REPLAY_LATENCIES = ("recorded", "zero")
+
+
+def request_key(request: LLMRequest) -> str:
+    """Stable key of everything in a request that affects the response."""
+    digest = hashlib.sha256()
+    parts = [
+        request.stage,
+        request.system or "",
+        request.prompt,
+        str(request.max_tokens),
+        str(request.temperature),
+    ]
+    # Only schema requests carry the schema, so older cassettes still match.
+    if request.response_schema is not None:
+        parts.append(json.dumps(request.response_schema, sort_keys=True))
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return io.TextIOWrapper(gzip.GzipFile(path, mode), encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+class RecordingLLMClient(LLMClient):
+    """Wraps a provider client and writes every call to a cassette."""
+
+    def __init__(self, inner: LLMClient, path: str | Path) -> None:
+        super().__init__(inner.config)
+        self.inner = inner
+        self.provider = inner.provider
+        self.path = Path(path)
+        self.recorded = 0
+        self._file: IO[str] | None = None
+
+    async def stream(self, request: LLMRequest, timeout: float) -> AsyncIterator[str]:
+        """Stream from the wrapped client while recording chunks and timing."""
+        chunks: list[list[Any]] = []
+        start = time.monotonic()
+        complete = False
+        retryable = False
+        try:
+            async for chunk in self.inner.stream(request, timeout):
+                chunks.append([round(time.monotonic() - start, 4), chunk])
+                yield chunk
+            complete = True
+        except GeneratorExit:
+            # The caller closed the stream because the output was complete.
+            complete = True
+            raise
+        except BaseException as e:
+            # A stream cancelled from outside is almost always a call timeout.
+            retryable = isinstance(e, asyncio.CancelledError) or is_retryable(e)
+            raise
+        finally:
+            self._write(
+                {
+                    "key": request_key(request),
+                    "stage": request.stage,
+                    "chunks": chunks,
+                    "complete": complete,
+                    "retryable": retryable,
+                }
+            )
+
+    def close(self) -> None:
+        """Flush and close the cassette file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, entry: dict[str, Any]) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = _open(self.path, "w")
+            header = {
+                "version": CASSETTE_VERSION,
+                "provider": self.provider,
+                "model": self.config.model,
+            }
+            self._file.write(json.dumps(header) + "\n")
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.recorded += 1
+
+
+class ReplayLLMClient(LLMClient):
+    """Serves recorded responses back instead of calling a provider.
+
+    Calls are matched by request content, so concurrent branches replay
+    correctly whatever order they run in; identical requests are served in
+    recorded order, so recorded failures and their retries replay as well. With ``latency="recorded"`` chunks arrive at their
+    recorded offsets, with ``"zero"`` they arrive immediately.
+    """
+
+    def __init__(self, path: str | Path, latency: str = "recorded") -> None:
+        if latency not in REPLAY_LATENCIES:
+            raise ValueError(f"Invalid replay latency: {latency}")
+        self.path = Path(path)
+        self.latency = latency
+        self._entries: defaultdict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        with _open(self.path, "r") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Not a cassette file: {self.path}")
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+        super().__init__(LLMConfig(provider=header["provider"], model=header["model"]))
+        self.provider = header["provider"]
+
+    @property
+    def remaining(self) -> int:
+        """Recorded calls not yet replayed."""
+        return sum(len(entries) for entries in self._entries.values())
+
+    async def stream(
+        self,
+        request: LLMRequest,
+        timeout: float,  # noqa: ARG002
+    ) -> AsyncIterator[str]:
+        """Yield the recorded chunks of the matching call."""
+        entries = self._entries.get(request_key(request))
+        if not entries:
+            raise LLMError(f"No recorded response for {request.stage} request")
+        entry = entries.popleft()
+        elapsed = 0.0
+        for offset, chunk in entry["chunks"]:
+            if self.latency == "recorded" and offset > elapsed:
+                await asyncio.sleep(offset - elapsed)
+                elapsed = offset
+            yield chunk
+        if not entry["complete"]:
+            message = f"Recorded {request.stage} call did not complete"
+            if entry.get("retryable"):
+                raise TransientLLMError(message)
+            raise LLMError(message)
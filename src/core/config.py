@@ -1,15 +1,20 @@
 """Configuration management for AI Researcher."""
 
+import functools
+import hashlib
+import json
 import os
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field, fields, replace
 from pathlib import Path
 from typing import Any
 
 import yaml
 from dotenv import load_dotenv  # type: ignore[import-not-found]
 
+from src.core.providers import is_known_provider, provider_api_key
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class LLMConfig:
     """Configuration for LLM providers."""
 
@@ -20,29 +25,52 @@ class LLMConfig:
     max_tokens: int = 8192
     temperature: float = 0.7
     timeout: int = 30
-
-
-@dataclass
+    max_concurrent: int = 8
+    requests_per_minute: int | None = None
+    max_retries: int = 3
+    retry_base_delay: float = 0.5
+    circuit_breaker_threshold: int = 5
+    circuit_breaker_reset: float = 30.0
+    structured_output: bool = True
+    adaptive_max_tokens: bool = True
+    max_tokens_percentile: float = 0.95
+    warm_up: bool = True
+
+
+@dataclass(frozen=True, slots=True)
 class DataConfig:
     """Configuration for data handling."""
 
     mindmap_csv_path: str = "data/mindmap.csv"
     output_dir: str = "output"
     cache_dir: str = ".cache"
+    inbox_dir: str = "inbox"
+    prompts_dir: str = ".taskmaster/docs/prompts"
+    prompt_profile: str = "full"  # "full", "compact", "minimal"
+    metrics_textfile: str | None = None
     max_file_size_mb: int = 100
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class EngineConfig:
     """Configuration for research engine."""
 
     max_recursion_depth: int = 5
+    beam_width: int = 3
     concurrent_queries: int = 3
     session_timeout: int = 3600
     auto_save_interval: int = 300
+    inbox_poll_interval: float = 1.0
+    synthesis_chunk_chars: int = 12000
+    resident_text_mb: int = 64
+    knowledge_cache: bool = True
+    knowledge_reuse_threshold: float = 0.85
+    knowledge_context_threshold: float = 0.5
+    citation_store: bool = True
+    metrics_port: int | None = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Config:
     """Main configuration class."""
 
@@ -55,77 +83,186 @@ class Config:
     debug: bool = False
     log_level: str = "INFO"
 
+    def override(self, **layer: Any) -> "Config":
+        """Copy with a layer of settings applied over this one.
+
+        A layer has the shape of the YAML file: ``llm``, ``data`` and
+        ``engine`` map to dicts of fields, other keys are top-level fields.
+        Unknown keys are ignored.
+        """
+        changes: dict[str, Any] = {}
+        for name, value in layer.items():
+            if name in _SECTIONS:
+                if not isinstance(value, dict):
+                    raise TypeError(f"Config section {name} must be a mapping")
+                section = getattr(self, name)
+                known = {f.name for f in fields(section)}
+                changes[name] = replace(
+                    section, **{k: v for k, v in value.items() if k in known}
+                )
+            elif name in _ROOT_FIELDS:
+                changes[name] = value
+        return replace(self, **changes) if changes else self
+
+
+_SECTIONS = ("llm", "data", "engine")
+_ROOT_FIELDS = ("mode", "debug", "log_level")
+ENV_PREFIX = "AI_RESEARCHER_"
+# Variables documented in the README that predate the prefixed form.
+ENV_ALIASES = {
+    "DEFAULT_LLM_PROVIDER": ("llm", "provider"),
+    "DEFAULT_MODEL": ("llm", "model"),
+}
+ENV_FILES = (Path(".env"), Path(".taskmaster/.env"), Path("../.env"))
+# Fields whose values are hashed into config_hash; secrets stay out.
+_UNHASHED_FIELDS = frozenset({"api_key"})
+
+
+@functools.lru_cache(maxsize=128)
+def config_hash(config: Any) -> str:
+    """Stable short hash of a config (or one of its sections) for cache keys."""
+    values = {k: v for k, v in asdict(config).items() if k not in _UNHASHED_FIELDS}
+    for section in _SECTIONS:
+        if isinstance(values.get(section), dict):
+            values[section] = {
+                k: v for k, v in values[section].items() if k not in _UNHASHED_FIELDS
+            }
+    text = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _stamp(path: Path) -> tuple[str, int] | None:
+    try:
+        return str(path.resolve()), path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _env_value(section: str | None, name: str, raw: str) -> Any:
+    """Environment strings typed like the field they set (YAML scalars)."""
+    target = getattr(Config(), section) if section else Config()
+    field_type = {f.name: f.type for f in fields(target)}.get(name)
+    return raw if field_type is str else yaml.safe_load(raw)
+
+
+def environment_layer(environ: dict[str, str]) -> dict[str, Any]:
+    """Settings from ``AI_RESEARCHER_<SECTION>_<FIELD>`` variables.
+
+    ``AI_RESEARCHER_LLM_MODEL`` sets ``llm.model`` and
+    ``AI_RESEARCHER_MODE`` sets ``mode``; values are parsed as YAML scalars.
+    """
+    layer: dict[str, Any] = {}
+    for key, raw in sorted(environ.items()):
+        if key in ENV_ALIASES:
+            section, name = ENV_ALIASES[key]
+        elif key.startswith(ENV_PREFIX):
+            rest = key.removeprefix(ENV_PREFIX).lower()
+            head, _, tail = rest.partition("_")
+            section, name = (head, tail) if head in _SECTIONS else ("", rest)
+        else:
+            continue
+        if section:
+            layer.setdefault(section, {})[name] = _env_value(section, name, raw)
+        elif name in _ROOT_FIELDS:
+            layer[name] = _env_value(None, name, raw)
+    return layer
+
+
+@functools.lru_cache(maxsize=8)
+def _load_dotenv(path: str, mtime_ns: int) -> None:  # noqa: ARG001
+    # Cached by mtime: an unchanged .env is read once per process. Values
+    # already in the environment win, so the environment layer outranks .env.
+    load_dotenv(path)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_layers(
+    config_path: str,
+    config_stamp: tuple[str, int] | None,
+    environ: tuple[tuple[str, str], ...],
+) -> Config:
+    """Defaults, YAML file and environment layers merged into one config.
+
+    The stamp (path and mtime) only keys the cache, so an edited file is
+    read again and an unchanged one is not.
+    """
+    config = Config()
+    if config_stamp is not None:
+        config_file = Path(config_path)
+        try:
+            with config_file.open("r", encoding="utf-8") as f:
+                config_data = yaml.safe_load(f)
+            if config_data:
+                config = config.override(**config_data)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML in config file {config_file}: {e}") from e
+        except Exception as e:
+            raise ValueError(f"Error loading config file {config_file}: {e}") from e
+    return config.override(**environment_layer(dict(environ)))
+
 
 class ConfigManager:
-    """Manages configuration loading and validation."""
+    """Loads, validates and holds the configuration.
+
+    Layers apply in order: defaults, the YAML file, ``.env``, the
+    environment and CLI overrides (:meth:`apply_overrides`). The result is a
+    frozen :class:`Config` shared safely between threads and tasks. Loading
+    is cached by the files' modification times and the relevant environment
+    variables, so constructing another manager for unchanged sources costs
+    a few ``stat`` calls.
+    """
 
     def __init__(self, config_path: str | None = None):
         self.config_path = config_path or ".taskmaster/config.yaml"
-        self.config = Config()
         self._load_environment()
-        self._load_config_file()
+        environ = tuple(
+            sorted(
+                (key, value)
+                for key, value in os.environ.items()
+                if key.startswith(ENV_PREFIX) or key in ENV_ALIASES
+            )
+        )
+        self.config = _load_layers(
+            self.config_path, _stamp(Path(self.config_path)), environ
+        )
         self._validate_config()
 
     def _load_environment(self) -> None:
-        """Load environment variables from .env file."""
-        # Try to load .env from project root and .taskmaster directory
-        env_paths = [Path(".env"), Path(".taskmaster/.env"), Path("../.env")]
-
-        for env_path in env_paths:
-            if env_path.exists():
-                load_dotenv(env_path)
+        """Load environment variables from the first .env file found."""
+        for env_path in ENV_FILES:
+            stamp = _stamp(env_path)
+            if stamp is not None:
+                _load_dotenv(*stamp)
                 break
 
-    def _load_config_file(self) -> None:
-        """Load configuration from YAML file."""
-        config_file = Path(self.config_path)
-        if config_file.exists():
-            try:
-                with config_file.open("r", encoding="utf-8") as f:
-                    config_data = yaml.safe_load(f)
-                    if config_data:
-                        self._update_config_from_dict(config_data)
-            except yaml.YAMLError as e:
-                raise ValueError(
-                    f"Invalid YAML in config file {config_file}: {e}"
-                ) from e
-            except Exception as e:
-                raise ValueError(f"Error loading config file {config_file}: {e}") from e
-
-    def _update_config_from_dict(self, config_data: dict[str, Any]) -> None:
-        """Update config object from dictionary."""
-        if "llm" in config_data:
-            llm_data = config_data["llm"]
-            for key, value in llm_data.items():
-                if hasattr(self.config.llm, key):
-                    setattr(self.config.llm, key, value)
-
-        if "data" in config_data:
-            data_data = config_data["data"]
-            for key, value in data_data.items():
-                if hasattr(self.config.data, key):
-                    setattr(self.config.data, key, value)
-
-        if "engine" in config_data:
-            engine_data = config_data["engine"]
-            for key, value in engine_data.items():
-                if hasattr(self.config.engine, key):
-                    setattr(self.config.engine, key, value)
-
-        # Update root level settings
-        for key in ["mode", "debug", "log_level"]:
-            if key in config_data:
-                setattr(self.config, key, config_data[key])
+    def apply_overrides(self, **layer: Any) -> Config:
+        """Apply a layer of overrides (e.g. CLI options) and revalidate."""
+        self.config = self.config.override(**layer)
+        self._validate_config()
+        return self.config
 
     def _validate_config(self) -> None:
         """Validate configuration settings."""
-        # Validate LLM config
-        if self.config.llm.provider not in [
-            "gemini",
-            "openai",
-            "anthropic",
-            "perplexity",
-        ]:
+        self._validate_llm_config()
+
+        # Validate data config
+        if self.config.data.max_file_size_mb <= 0:
+            raise ValueError("Max file size must be positive")
+
+        self._validate_engine_config()
+
+        # Validate mode
+        if self.config.mode not in ["automatic", "semi-manual", "manual"]:
+            raise ValueError(f"Invalid mode: {self.config.mode}")
+
+        # Validate log level
+        valid_log_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+        if self.config.log_level not in valid_log_levels:
+            raise ValueError(f"Invalid log level: {self.config.log_level}")
+
+    def _validate_llm_config(self) -> None:
+        """Validate LLM provider settings."""
+        if not is_known_provider(self.config.llm.provider):
             raise ValueError(f"Unsupported LLM provider: {self.config.llm.provider}")
 
         MAX_TEMPERATURE = 2
@@ -138,54 +275,73 @@ class ConfigManager:
         if self.config.llm.max_tokens <= 0:
             raise ValueError("LLM max_tokens must be positive")
 
-        # Validate data config
-        if self.config.data.max_file_size_mb <= 0:
-            raise ValueError("Max file size must be positive")
+        if not 0 < self.config.llm.max_tokens_percentile <= 1:
+            raise ValueError("LLM max_tokens_percentile must be in (0, 1]")
+
+        if self.config.llm.max_concurrent <= 0:
+            raise ValueError("LLM max_concurrent must be positive")
+
+        rate = self.config.llm.requests_per_minute
+        if rate is not None and rate <= 0:
+            raise ValueError("LLM requests_per_minute must be positive")
+
+        if self.config.llm.max_retries < 0:
+            raise ValueError("LLM max_retries must not be negative")
+
+        if self.config.llm.retry_base_delay < 0:
+            raise ValueError("LLM retry_base_delay must not be negative")
 
-        # Validate engine config
+        if self.config.llm.circuit_breaker_threshold <= 0:
+            raise ValueError("LLM circuit_breaker_threshold must be positive")
+
+        if self.config.llm.circuit_breaker_reset <= 0:
+            raise ValueError("LLM circuit_breaker_reset must be positive")
+
+    def _validate_engine_config(self) -> None:
+        """Validate research engine settings."""
         if self.config.engine.max_recursion_depth <= 0:
             raise ValueError("Max recursion depth must be positive")
 
+        if self.config.engine.beam_width <= 0:
+            raise ValueError("Beam width must be positive")
+
         if self.config.engine.concurrent_queries <= 0:
             raise ValueError("Concurrent queries must be positive")
 
-        # Validate mode
-        if self.config.mode not in ["automatic", "semi-manual", "manual"]:
-            raise ValueError(f"Invalid mode: {self.config.mode}")
+        if self.config.engine.inbox_poll_interval <= 0:
+            raise ValueError("Inbox poll interval must be positive")
 
-        # Validate log level
-        valid_log_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
-        if self.config.log_level not in valid_log_levels:
-            raise ValueError(f"Invalid log level: {self.config.log_level}")
+        if self.config.engine.synthesis_chunk_chars <= 0:
+            raise ValueError("Synthesis chunk size must be positive")
 
-    def get_api_key(self, provider: str) -> str | None:
-        """Get API key for specified provider."""
-        key_mapping = {
-            "gemini": "GOOGLE_API_KEY",
-            "openai": "OPENAI_API_KEY",
-            "anthropic": "ANTHROPIC_API_KEY",
-            "perplexity": "PERPLEXITY_API_KEY",
-        }
+        if self.config.engine.resident_text_mb < 0:
+            raise ValueError("Resident text cap must not be negative")
 
-        env_key = key_mapping.get(provider)
-        if env_key:
-            return os.getenv(env_key)
+        reuse = self.config.engine.knowledge_reuse_threshold
+        context = self.config.engine.knowledge_context_threshold
+        if not 0 <= context <= reuse <= 1:
+            raise ValueError(
+                "Knowledge thresholds must satisfy 0 <= context <= reuse <= 1"
+            )
 
-        return None
+        MAX_PORT = 65535
+        port = self.config.engine.metrics_port
+        if port is not None and not 0 < port <= MAX_PORT:
+            raise ValueError("Metrics port must be between 1 and 65535")
+
+    def get_api_key(self, provider: str) -> str | None:
+        """Get API key for specified provider."""
+        if not is_known_provider(provider):
+            return None
+        return provider_api_key(provider)
 
     def get_llm_config(self, provider: str | None = None) -> LLMConfig:
         """Get LLM configuration for specified provider."""
         if provider is None:
             provider = self.config.llm.provider
 
-        return LLMConfig(
-            provider=provider,
-            model=self.config.llm.model,
-            api_key=self.get_api_key(provider),
-            base_url=self.config.llm.base_url,
-            max_tokens=self.config.llm.max_tokens,
-            temperature=self.config.llm.temperature,
-            timeout=self.config.llm.timeout,
+        return replace(
+            self.config.llm, provider=provider, api_key=self.get_api_key(provider)
         )
 
     def ensure_directories(self) -> None:
@@ -193,6 +349,7 @@ class ConfigManager:
         directories = [
             self.config.data.output_dir,
             self.config.data.cache_dir,
+            self.config.data.inbox_dir,
             Path(self.config.data.mindmap_csv_path).parent,
         ]
 
@@ -211,18 +368,45 @@ class ConfigManager:
                 "max_tokens": self.config.llm.max_tokens,
                 "temperature": self.config.llm.temperature,
                 "timeout": self.config.llm.timeout,
+                "max_concurrent": self.config.llm.max_concurrent,
+                "requests_per_minute": self.config.llm.requests_per_minute,
+                "max_retries": self.config.llm.max_retries,
+                "retry_base_delay": self.config.llm.retry_base_delay,
+                "circuit_breaker_threshold": self.config.llm.circuit_breaker_threshold,
+                "circuit_breaker_reset": self.config.llm.circuit_breaker_reset,
+                "structured_output": self.config.llm.structured_output,
+                "adaptive_max_tokens": self.config.llm.adaptive_max_tokens,
+                "max_tokens_percentile": self.config.llm.max_tokens_percentile,
+                "warm_up": self.config.llm.warm_up,
             },
             "data": {
                 "mindmap_csv_path": self.config.data.mindmap_csv_path,
                 "output_dir": self.config.data.output_dir,
                 "cache_dir": self.config.data.cache_dir,
+                "inbox_dir": self.config.data.inbox_dir,
+                "prompts_dir": self.config.data.prompts_dir,
+                "prompt_profile": self.config.data.prompt_profile,
+                "metrics_textfile": self.config.data.metrics_textfile,
                 "max_file_size_mb": self.config.data.max_file_size_mb,
             },
             "engine": {
                 "max_recursion_depth": self.config.engine.max_recursion_depth,
+                "beam_width": self.config.engine.beam_width,
                 "concurrent_queries": self.config.engine.concurrent_queries,
                 "session_timeout": self.config.engine.session_timeout,
                 "auto_save_interval": self.config.engine.auto_save_interval,
+                "inbox_poll_interval": self.config.engine.inbox_poll_interval,
+                "synthesis_chunk_chars": self.config.engine.synthesis_chunk_chars,
+                "resident_text_mb": self.config.engine.resident_text_mb,
+                "knowledge_cache": self.config.engine.knowledge_cache,
+                "knowledge_reuse_threshold": (
+                    self.config.engine.knowledge_reuse_threshold
+                ),
+                "knowledge_context_threshold": (
+                    self.config.engine.knowledge_context_threshold
+                ),
+                "citation_store": self.config.engine.citation_store,
+                "metrics_port": self.config.engine.metrics_port,
             },
             "mode": self.config.mode,
             "debug": self.config.debug,
@@ -243,8 +427,3 @@ class ConfigManager:
 
         with Path(save_path).open("w", encoding="utf-8") as f:
             yaml.dump(cleaned_dict, f, default_flow_style=False, indent=2)
-
-
-# Global configuration instance
-config_manager = ConfigManager()
-config = config_manager.config
@@ -0,0 +1,54 @@
+"""Session deadline tracking for research sessions."""
+
+import time
+from collections.abc import Callable
+
+from src.core.config import EngineConfig
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when work cannot be completed before the session deadline."""
+
+    retryable = False
+
+    def __init__(self, message: str, partial: str = "") -> None:
+        super().__init__(message)
+        self.partial = partial
+
+
+class Deadline:
+    """Absolute session deadline measured on a monotonic clock."""
+
+    def __init__(
+        self, timeout: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if timeout <= 0:
+            raise ValueError("Deadline timeout must be positive")
+        self._clock = clock
+        self.timeout = timeout
+        self.expires_at = clock() + timeout
+
+    @classmethod
+    def from_config(cls, config: EngineConfig) -> "Deadline":
+        """Create a deadline from the configured session timeout."""
+        return cls(config.session_timeout)
+
+    def remaining(self) -> float:
+        """Seconds left until the deadline, never negative."""
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return self.remaining() <= 0
+
+    def can_finish(self, estimate: float) -> bool:
+        """Whether work expected to take ``estimate`` seconds fits the budget."""
+        return not self.expired and self.remaining() >= estimate
+
+    def timeout_for(self, per_call: float) -> float:
+        """Shrink a per-call timeout so it ends no later than the deadline."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError("Session deadline exceeded")
+        return min(per_call, remaining)
@@ -0,0 +1,507 @@
+"""Unified LLM client interface and provider adapters."""
+
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, replace
+from typing import Any
+
+from src.core.budget import OutputBudget
+from src.core.config import LLMConfig
+from src.core.deadline import Deadline, DeadlineExceededError
+from src.core.providers import get_provider
+from src.core.retry import (
+    RATE_LIMIT_STATUS,
+    CircuitBreaker,
+    RetryPolicy,
+    is_retryable,
+    retry_after,
+    status_code,
+)
+from src.core.telemetry import Telemetry
+
+logger = logging.getLogger(__name__)
+
+ChunkSink = Callable[[str], None]
+# Given the text streamed so far, the length of the complete output once the
+# expected structure is complete, else None.
+CompletionCheck = Callable[[str], int | None]
+
+CHARS_PER_TOKEN = 4
+WARM_UP_TIMEOUT = 5.0
+PERPLEXITY_BASE_URL = "https://api.perplexity.ai"
+
+
+class LLMError(Exception):
+    """Base error for LLM provider failures."""
+
+
+class LLMTimeoutError(LLMError, TimeoutError):
+    """Raised when a single call exceeds its own timeout."""
+
+    retryable = True
+
+    def __init__(self, message: str, partial: str = "") -> None:
+        super().__init__(message)
+        self.partial = partial
+
+
+class TransientLLMError(LLMError):
+    """A provider failure that is expected to go away on retry."""
+
+    retryable = True
+
+
+class CircuitOpenError(LLMError):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+    retryable = False
+
+    def __init__(self, provider: str, retry_in: float) -> None:
+        super().__init__(
+            f"{provider} circuit breaker is open; next probe in {retry_in:.1f}s"
+        )
+        self.retry_in = retry_in
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate used when the provider does not report usage."""
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+@dataclass(frozen=True)
+class LLMRequest:
+    """A single prompt sent to an LLM provider."""
+
+    prompt: str
+    stage: str = "default"
+    system: str | None = None
+    max_tokens: int | None = None
+    temperature: float | None = None
+    response_schema: dict[str, Any] | None = None
+    complete_at: CompletionCheck | None = None
+
+
+@dataclass
+class LLMResponse:
+    """Text and accounting for a completed LLM call."""
+
+    text: str
+    provider: str
+    model: str
+    stage: str
+    latency: float
+    input_tokens: int = 0
+    output_tokens: int = 0
+    ttft: float | None = None
+
+
+class LLMClient(ABC):
+    """Base class for provider adapters.
+
+    Adapters only implement :meth:`stream`; :meth:`generate` applies the
+    timeout (shrunk to the session deadline when one is given) and collects
+    the streamed chunks so partial output survives a timeout.
+
+    Transient failures are retried with jittered exponential backoff,
+    honouring ``Retry-After``, as long as the session deadline leaves room
+    for the wait. An attempt that already streamed chunks to a ``sink`` is
+    not retried, since the sink cannot take them back. A per-client circuit
+    breaker makes calls fail fast with :class:`CircuitOpenError` while the
+    provider keeps failing. Callers only see the final outcome, so response
+    cache entries and journal events are written once per request.
+
+    With a ``budget``, requests without their own ``max_tokens`` get the
+    limit learned for their stage, and every response length is recorded. A
+    request's ``complete_at`` check ends the stream as soon as the output is
+    complete, and the text is cut where the check says it ends.
+
+    :meth:`warm_up` sets up the provider connection (DNS, TCP, TLS, auth)
+    ahead of the first call, so it can overlap with session start-up work.
+    """
+
+    provider = "base"
+    telemetry: Telemetry | None = None
+    budget: OutputBudget | None = None
+
+    def __init__(self, config: LLMConfig) -> None:
+        self.config = config
+        self.retry = RetryPolicy.from_config(config)
+        self.breaker = CircuitBreaker.from_config(config)
+
+    @abstractmethod
+    def stream(self, request: LLMRequest, timeout: float) -> AsyncIterator[str]:
+        """Yield response text chunks from the provider."""
+
+    async def connect(self) -> None:  # noqa: B027
+        """Open the provider connection, e.g. with a cheap authenticated call.
+
+        Adapters without a connection to set up keep this no-op.
+        """
+
+    async def warm_up(self) -> float | None:
+        """Connect ahead of the first call; returns the seconds it took.
+
+        A failed or slow warm-up is logged and returns None: the first call
+        then simply sets up its own connection.
+        """
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(WARM_UP_TIMEOUT):
+                await self.connect()
+        except Exception as e:
+            logger.debug("%s warm-up failed: %s", self.provider, e)
+            return None
+        elapsed = time.monotonic() - start
+        logger.debug("%s connection warmed up in %.3fs", self.provider, elapsed)
+        return elapsed
+
+    async def generate(
+        self,
+        request: LLMRequest,
+        deadline: Deadline | None = None,
+        sink: ChunkSink | None = None,
+    ) -> LLMResponse:
+        """Run a request to completion within the call and session budget."""
+        budget = self.budget
+        if budget is not None and request.max_tokens is None:
+            limit = budget.limit(request.stage, self.config.max_tokens)
+            if limit is not None:
+                request = replace(request, max_tokens=limit)
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(self.provider, self.breaker.retry_in())
+            streamed = False
+
+            def forward(chunk: str) -> None:
+                nonlocal streamed
+                streamed = True
+                if sink is not None:
+                    sink(chunk)
+
+            try:
+                response = await self._attempt(request, deadline, forward)
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.release()
+                    raise
+                self.breaker.record_failure()
+                attempt += 1
+                if (streamed and sink is not None) or attempt > self.retry.max_retries:
+                    raise
+                delay = self.retry.delay(attempt, retry_after(e))
+                if deadline is not None and deadline.remaining() <= delay:
+                    raise
+                logger.warning(
+                    "%s %s call failed (%s); retry %d in %.2fs",
+                    self.provider,
+                    request.stage,
+                    type(e).__name__,
+                    attempt,
+                    delay,
+                )
+                if self.telemetry is not None:
+                    kind = (
+                        "rate_limit" if status_code(e) == RATE_LIMIT_STATUS else "retry"
+                    )
+                    self.telemetry.record_wait(kind, delay)
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            if budget is not None:
+                budget.record(request.stage, response.output_tokens)
+            return response
+
+    async def _attempt(
+        self, request: LLMRequest, deadline: Deadline | None, sink: ChunkSink
+    ) -> LLMResponse:
+        timeout = float(self.config.timeout)
+        if deadline is not None:
+            timeout = deadline.timeout_for(timeout)
+
+        telemetry = self.telemetry
+        if telemetry is None:
+            return await self._collect(request, timeout, deadline, sink)
+        telemetry.call_started(self.provider)
+        try:
+            response = await self._collect(request, timeout, deadline, sink)
+        except BaseException as e:
+            telemetry.call_finished(
+                self.provider, request.stage, 0.0, error=type(e).__name__
+            )
+            raise
+        telemetry.call_finished(
+            self.provider,
+            request.stage,
+            response.latency,
+            input_tokens=response.input_tokens,
+            output_tokens=response.output_tokens,
+            ttft=response.ttft,
+        )
+        return response
+
+    async def _collect(
+        self,
+        request: LLMRequest,
+        timeout: float,
+        deadline: Deadline | None,
+        sink: ChunkSink | None,
+    ) -> LLMResponse:
+        chunks: list[str] = []
+        start = time.monotonic()
+        ttft = None
+        stream = self.stream(request, timeout)
+        try:
+            async with asyncio.timeout(timeout):
+                async for chunk in stream:
+                    if ttft is None:
+                        ttft = time.monotonic() - start
+                    chunks.append(chunk)
+                    if sink is not None:
+                        sink(chunk)
+                    if request.complete_at is not None and "\n" in chunk:
+                        text = "".join(chunks)
+                        end = request.complete_at(text)
+                        if end is not None:
+                            chunks = [text[:end]]
+                            self._stopped_early(request)
+                            break
+        except TimeoutError as e:
+            partial = "".join(chunks)
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceededError(
+                    f"Session deadline reached during {request.stage}", partial
+                ) from e
+            raise LLMTimeoutError(
+                f"{self.provider} call timed out after {timeout:.1f}s", partial
+            ) from e
+        finally:
+            # Closing the stream ends the provider request when it stopped early.
+            close = getattr(stream, "aclose", None)
+            if close is not None:
+                await close()
+
+        text = "".join(chunks)
+        return LLMResponse(
+            text=text,
+            provider=self.provider,
+            model=self.config.model,
+            stage=request.stage,
+            latency=time.monotonic() - start,
+            input_tokens=estimate_tokens((request.system or "") + request.prompt),
+            output_tokens=estimate_tokens(text),
+            ttft=ttft,
+        )
+
+    def _stopped_early(self, request: LLMRequest) -> None:
+        logger.debug("%s %s output complete; stopping", self.provider, request.stage)
+        if self.telemetry is not None:
+            self.telemetry.early_stop(request.stage)
+
+    @staticmethod
+    def _schema_instruction(request: LLMRequest) -> str:
+        # For providers without a native schema mode the schema goes into the
+        # prompt; callers still fall back to free-form parsing.
+        if request.response_schema is None:
+            return ""
+        return (
+            "\n\nRespond with a single JSON object, without markdown fences, "
+            "that matches this JSON schema:\n"
+            + json.dumps(request.response_schema, ensure_ascii=False)
+        )
+
+    def _max_tokens(self, request: LLMRequest) -> int:
+        return request.max_tokens or self.config.max_tokens
+
+    def _temperature(self, request: LLMRequest) -> float:
+        if request.temperature is None:
+            return self.config.temperature
+        return request.temperature
+
+
+class MockLLMClient(LLMClient):
+    """Offline client returning canned responses, for tests and dry runs."""
+
+    provider = "mock"
+
+    def __init__(
+        self,
+        config: LLMConfig | None = None,
+        responses: dict[str, str] | None = None,
+        default: str = "",
+        delay: float = 0.0,
+        chunk_size: int = 64,
+    ) -> None:
+        super().__init__(config or LLMConfig(provider="mock", model="mock"))
+        self.responses = responses or {}
+        self.default = default
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.requests: list[LLMRequest] = []
+
+    async def stream(
+        self,
+        request: LLMRequest,
+        timeout: float,  # noqa: ARG002
+    ) -> AsyncIterator[str]:
+        """Yield the canned response for the request stage in fixed-size chunks."""
+        self.requests.append(request)
+        text = self.responses.get(request.stage, self.default)
+        for i in range(0, len(text), self.chunk_size):
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            yield text[i : i + self.chunk_size]
+
+
+class OpenAIClient(LLMClient):
+    """Adapter for OpenAI and OpenAI-compatible chat completion APIs."""
+
+    provider = "openai"
+    default_base_url: str | None = None
+
+    def __init__(self, config: LLMConfig) -> None:
+        super().__init__(config)
+        from openai import AsyncOpenAI  # noqa: PLC0415
+
+        self._client = AsyncOpenAI(
+            api_key=config.api_key,
+            base_url=config.base_url or self.default_base_url,
+        )
+
+    async def connect(self) -> None:
+        """Open a pooled connection by looking up the configured model."""
+        await self._client.models.retrieve(self.config.model)
+
+    async def stream(self, request: LLMRequest, timeout: float) -> AsyncIterator[str]:
+        """Stream chat completion deltas."""
+        messages = []
+        if request.system:
+            messages.append({"role": "system", "content": request.system})
+        messages.append({"role": "user", "content": request.prompt})
+        kwargs: dict[str, Any] = {}
+        if request.response_schema is not None:
+            kwargs["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": request.response_schema.get("title", "response"),
+                    "schema": request.response_schema,
+                },
+            }
+        response = await self._client.chat.completions.create(
+            model=self.config.model,
+            messages=messages,
+            max_tokens=self._max_tokens(request),
+            temperature=self._temperature(request),
+            stream=True,
+            timeout=timeout,
+            **kwargs,
+        )
+        async for event in response:
+            if event.choices and event.choices[0].delta.content:
+                yield event.choices[0].delta.content
+
+
+class PerplexityClient(OpenAIClient):
+    """Adapter for the Perplexity API, which is OpenAI-compatible."""
+
+    provider = "perplexity"
+    default_base_url = PERPLEXITY_BASE_URL
+
+
+class AnthropicClient(LLMClient):
+    """Adapter for the Anthropic Messages API."""
+
+    provider = "anthropic"
+
+    def __init__(self, config: LLMConfig) -> None:
+        super().__init__(config)
+        from anthropic import AsyncAnthropic  # noqa: PLC0415
+
+        self._client = AsyncAnthropic(api_key=config.api_key, base_url=config.base_url)
+
+    async def connect(self) -> None:
+        """Open a pooled connection by looking up the configured model."""
+        await self._client.models.retrieve(self.config.model)
+
+    async def stream(self, request: LLMRequest, timeout: float) -> AsyncIterator[str]:
+        """Stream message text deltas."""
+        system = (request.system or "") + self._schema_instruction(request)
+        kwargs: dict[str, Any] = {
+            "model": self.config.model,
+            "max_tokens": self._max_tokens(request),
+            "temperature": self._temperature(request),
+            "messages": [{"role": "user", "content": request.prompt}],
+            "timeout": timeout,
+        }
+        if system:
+            kwargs["system"] = system
+        async with self._client.messages.stream(**kwargs) as response:
+            async for text in response.text_stream:
+                yield text
+
+
+class GeminiClient(LLMClient):
+    """Adapter for Google Gemini via google-generativeai."""
+
+    provider = "gemini"
+
+    def __init__(self, config: LLMConfig) -> None:
+        super().__init__(config)
+        import google.generativeai as genai  # noqa: PLC0415
+
+        genai.configure(api_key=config.api_key)
+        self._genai = genai
+
+    async def connect(self) -> None:
+        """Open the async channel with a token count, which costs no quota."""
+        model = self._genai.GenerativeModel(self.config.model)
+        await model.count_tokens_async("ping")
+
+    async def stream(self, request: LLMRequest, timeout: float) -> AsyncIterator[str]:
+        """Stream generated content chunks."""
+        model = self._genai.GenerativeModel(
+            self.config.model, system_instruction=request.system
+        )
+        generation_config: dict[str, Any] = {
+            "max_output_tokens": self._max_tokens(request),
+            "temperature": self._temperature(request),
+        }
+        if request.response_schema is not None:
+            generation_config["response_mime_type"] = "application/json"
+        response = await model.generate_content_async(
+            request.prompt + self._schema_instruction(request),
+            generation_config=generation_config,
+            stream=True,
+            request_options={"timeout": timeout},
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+def create_llm_client(config: LLMConfig) -> LLMClient:
+    """Create the adapter for the configured provider.
+
+    The adapter and its SDK are imported only now, for the selected provider.
+    """
+    spec = get_provider(config.provider)
+    client_class = spec.load()
+    if not (isinstance(client_class, type) and issubclass(client_class, LLMClient)):
+        raise TypeError(f"Adapter {spec.adapter} for {spec.name} is not an LLMClient")
+    client: LLMClient = client_class(
+        replace(
+            config,
+            base_url=config.base_url or spec.base_url,
+            api_key=config.api_key or spec.default_api_key,
+        )
+    )
+    # OpenAI-compatible providers share an adapter but report their own name.
+    client.provider = spec.name
+    return client
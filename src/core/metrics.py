@@ -0,0 +1,259 @@
+"""Prometheus-format metrics: registry, text exposition, HTTP and textfile export."""
+
+import asyncio
+import contextlib
+import logging
+import math
+import os
+import tempfile
+import threading
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "airesearcher_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelKey = tuple[str, ...]
+M = TypeVar("M", bound="Metric")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: LabelKey, **extra: str) -> str:
+    pairs = [*zip(names, values, strict=True), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Metric:
+    """A metric family with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.label_names}, "
+                f"got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self) -> Iterator[str]:
+        """Exposition lines for the current values."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """HELP, TYPE and sample lines of the family."""
+        header = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        return "\n".join([*header, *self.samples()])
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help_text, labels)
+        self._values: dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add a non-negative amount."""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Current value for a label set."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        """Exposition lines for the current values."""
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            labels = _format_labels(self.label_names, key)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down."""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add a (possibly negative) amount."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels: str) -> None:
+        """Replace the value."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[LabelKey, list[int]] = {}
+        self._sums: dict[LabelKey, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation."""
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def count(self, **labels: str) -> int:
+        """Number of observations for a label set."""
+        return sum(self._counts.get(self._key(labels), []))
+
+    def samples(self) -> Iterator[str]:
+        """Exposition lines for the current values."""
+        with self._lock:
+            items = sorted((k, list(v), self._sums[k]) for k, v in self._counts.items())
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, le=_format_value(bound))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.label_names, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """Holds metric families and renders them in Prometheus text format.
+
+    Families are created on first request and shared afterwards, so any
+    component can ask for the same metric by name.
+    """
+
+    def __init__(self, prefix: str = METRIC_PREFIX) -> None:
+        self.prefix = prefix
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(
+        self, name: str, help_text: str, labels: tuple[str, ...] = ()
+    ) -> Counter:
+        """Get or create a counter."""
+        return self._get(Counter, name, lambda n: Counter(n, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._get(Gauge, name, lambda n: Gauge(n, help_text, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._get(
+            Histogram, name, lambda n: Histogram(n, help_text, labels, buckets)
+        )
+
+    def _get(self, cls: type[M], name: str, factory: Callable[[str], M]) -> M:
+        full_name = self.prefix + name
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = factory(full_name)
+                self._metrics[full_name] = metric
+        # Gauge subclasses Counter, so compare exact types.
+        if type(metric) is not cls or not isinstance(metric, cls):
+            raise ValueError(f"Metric {full_name} is already a {metric.kind}")
+        return metric
+
+    def render(self) -> str:
+        """All families in Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return "".join(metric.render() + "\n" for metric in metrics)
+
+    def write_textfile(self, path: str | Path) -> Path:
+        """Atomically write the metrics for node_exporter's textfile collector."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, suffix=".prom.tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        Path(tmp_name).replace(target)
+        return target
+
+    async def serve_http(self, port: int, host: str = "127.0.0.1") -> asyncio.Server:
+        """Serve ``GET /metrics`` on a local port."""
+
+        async def handle(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            try:
+                request_line = (await reader.readline()).decode("latin-1")
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                if request_line.split()[:2] == ["GET", "/metrics"]:
+                    status, body = "200 OK", self.render().encode("utf-8")
+                else:
+                    status, body = "404 Not Found", b"not found\n"
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+            finally:
+                writer.close()
+                with contextlib.suppress(ConnectionError):
+                    await writer.wait_closed()
+
+        server = await asyncio.start_server(handle, host, port)
+        logger.info("Serving metrics on http://%s:%d/metrics", host, port)
+        return server
@@ -0,0 +1,114 @@
+"""Registry of LLM providers, resolved lazily by name.
+
+Built-in providers and OpenAI-compatible services are described by a
+:class:`ProviderSpec` whose adapter is an import path, so neither the
+adapter module nor its SDK is imported until the provider is selected.
+Third-party packages register adapters under the ``ai_researcher.providers``
+entry point group, or at runtime with :func:`register_provider`.
+"""
+
+import functools
+import importlib
+import os
+from dataclasses import dataclass
+from importlib.metadata import EntryPoint, entry_points
+from typing import Any
+
+ENTRY_POINT_GROUP = "ai_researcher.providers"
+
+_OPENAI_ADAPTER = "src.core.llm_client:OpenAIClient"
+
+
+@dataclass(frozen=True)
+class ProviderSpec:
+    """How to build the client for one provider.
+
+    ``adapter`` is a ``module:attribute`` path to an ``LLMClient`` subclass.
+    ``base_url`` and ``default_api_key`` apply when the configuration does
+    not set them (e.g. a local Ollama server that ignores the key).
+    """
+
+    name: str
+    adapter: str
+    api_key_env: str | None = None
+    base_url: str | None = None
+    default_api_key: str | None = None
+
+    def load(self) -> Any:
+        """Import and return the adapter class."""
+        module, _, attribute = self.adapter.partition(":")
+        return getattr(importlib.import_module(module), attribute)
+
+
+_BUILTIN = (
+    ProviderSpec("gemini", "src.core.llm_client:GeminiClient", "GOOGLE_API_KEY"),
+    ProviderSpec("openai", _OPENAI_ADAPTER, "OPENAI_API_KEY"),
+    ProviderSpec(
+        "anthropic", "src.core.llm_client:AnthropicClient", "ANTHROPIC_API_KEY"
+    ),
+    ProviderSpec(
+        "perplexity", "src.core.llm_client:PerplexityClient", "PERPLEXITY_API_KEY"
+    ),
+    ProviderSpec(
+        "mistral", _OPENAI_ADAPTER, "MISTRAL_API_KEY", "https://api.mistral.ai/v1"
+    ),
+    ProviderSpec(
+        "groq", _OPENAI_ADAPTER, "GROQ_API_KEY", "https://api.groq.com/openai/v1"
+    ),
+    ProviderSpec(
+        "openrouter",
+        _OPENAI_ADAPTER,
+        "OPENROUTER_API_KEY",
+        "https://openrouter.ai/api/v1",
+    ),
+    ProviderSpec("xai", _OPENAI_ADAPTER, "XAI_API_KEY", "https://api.x.ai/v1"),
+    ProviderSpec(
+        "ollama",
+        _OPENAI_ADAPTER,
+        "OLLAMA_API_KEY",
+        "http://localhost:11434/v1",
+        default_api_key="ollama",
+    ),
+)
+
+_registry: dict[str, ProviderSpec] = {spec.name: spec for spec in _BUILTIN}
+
+
+def register_provider(spec: ProviderSpec) -> None:
+    """Add or replace a provider."""
+    _registry[spec.name] = spec
+
+
+@functools.cache
+def _entry_points() -> dict[str, EntryPoint]:
+    # Reading entry point metadata does not import the plugins themselves.
+    return {ep.name: ep for ep in entry_points(group=ENTRY_POINT_GROUP)}
+
+
+def get_provider(name: str) -> ProviderSpec:
+    """Spec of a registered or plugin provider."""
+    spec = _registry.get(name)
+    if spec is not None:
+        return spec
+    entry_point = _entry_points().get(name)
+    if entry_point is None:
+        raise ValueError(f"Unsupported LLM provider: {name}")
+    return ProviderSpec(
+        name, entry_point.value, f"{name.upper().replace('-', '_')}_API_KEY"
+    )
+
+
+def provider_names() -> list[str]:
+    """Every provider that can be selected."""
+    return sorted({*_registry, *_entry_points()})
+
+
+def is_known_provider(name: str) -> bool:
+    """Whether a provider can be selected."""
+    return name in _registry or name in _entry_points()
+
+
+def provider_api_key(name: str) -> str | None:
+    """API key for a provider from its environment variable."""
+    spec = get_provider(name)
+    return os.getenv(spec.api_key_env) if spec.api_key_env else None
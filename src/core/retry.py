@@ -0,0 +1,166 @@
+"""Retry policy and circuit breaker for transient provider failures."""
+
+import email.utils
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from src.core.config import LLMConfig
+
+RETRYABLE_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 529})
+RATE_LIMIT_STATUS = 429
+DEFAULT_MAX_DELAY = 60.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def status_code(exc: BaseException) -> int | None:
+    """HTTP status of a provider SDK error, if it carries one."""
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether an error is transient, so the same request may succeed later.
+
+    Errors can decide for themselves with a ``retryable`` attribute. SDK
+    errors are classified by HTTP status (rate limits, overload and server
+    errors are retryable; bad requests and auth failures are not); network
+    errors and timeouts without a status are retryable.
+    """
+    retryable = getattr(exc, "retryable", None)
+    if isinstance(retryable, bool):
+        return retryable
+    status = status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    if isinstance(exc, ConnectionError | TimeoutError):
+        return True
+    # SDK network errors (APIConnectionError, APITimeoutError, ...) do not
+    # subclass the builtins.
+    name = type(exc).__name__
+    return "Connection" in name or "Timeout" in name
+
+
+def retry_after(exc: BaseException, now: float | None = None) -> float | None:
+    """Seconds the provider asked us to wait (``Retry-After`` header)."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when - (time.time() if now is None else now))
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter, capped at ``max_delay``."""
+
+    max_retries: int = 3
+    base_delay: float = 0.5
+    max_delay: float = DEFAULT_MAX_DELAY
+
+    @classmethod
+    def from_config(cls, config: LLMConfig) -> "RetryPolicy":
+        """Policy from the provider configuration."""
+        return cls(config.max_retries, config.retry_base_delay)
+
+    def delay(
+        self,
+        attempt: int,
+        requested: float | None = None,
+        rng: Callable[[float, float], float] = random.uniform,
+    ) -> float:
+        """Seconds to wait before retry number ``attempt`` (1-based).
+
+        A delay the provider requested is honoured as a minimum.
+        """
+        backoff = rng(0.0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if requested is not None:
+            return max(requested, backoff)
+        return backoff
+
+
+class CircuitBreaker:
+    """Stops calls to a provider after repeated transient failures.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    calls fail fast. Once ``reset_timeout`` has passed, a single probe call
+    is let through: success closes the breaker, failure reopens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if failure_threshold <= 0:
+            raise ValueError("Failure threshold must be positive")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @classmethod
+    def from_config(cls, config: LLMConfig) -> "CircuitBreaker":
+        """Breaker from the provider configuration."""
+        return cls(config.circuit_breaker_threshold, config.circuit_breaker_reset)
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (claims the probe when half open)."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and self.retry_in() <= 0:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed."""
+        return max(0.0, self._opened_at + self.reset_timeout - self.clock())
+
+    def record_success(self) -> None:
+        """A call succeeded: close the breaker."""
+        self.state = CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """A call failed transiently: count it, opening the breaker if needed."""
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self._opened_at = self.clock()
+        self._probing = False
+
+    def release(self) -> None:
+        """A call ended without a verdict (e.g. cancelled): free the probe."""
+        self._probing = False
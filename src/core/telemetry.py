@@ -0,0 +1,245 @@
+"""In-process session telemetry: call latencies, token rates, queues, waits."""
+
+import time
+from collections import Counter, defaultdict, deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from src.core.metrics import MetricsRegistry
+
+DEFAULT_RATE_WINDOW = 30.0
+DEFAULT_LATENCY_SAMPLES = 512
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of the samples (0.0 when there are none)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+@dataclass(frozen=True)
+class StageLatency:
+    """Latency summary for one stage."""
+
+    calls: int
+    p50: float
+    p95: float
+    ttft_p50: float = 0.0
+
+
+@dataclass(frozen=True)
+class TelemetrySnapshot:
+    """Point-in-time view of a session, as shown by the dashboard."""
+
+    queue_by_depth: dict[int, int]
+    in_flight: dict[str, int]
+    tokens_in_per_sec: float
+    tokens_out_per_sec: float
+    waits: dict[str, float]
+    latency: dict[str, StageLatency]
+    errors: dict[str, int] = field(default_factory=dict)
+    parses: dict[str, int] = field(default_factory=dict)
+    reasks: int = 0
+
+    @property
+    def parse_failure_rate(self) -> float:
+        """Share of parsed responses that yielded no questions."""
+        total = sum(self.parses.values())
+        return self.parses.get("failed", 0) / total if total else 0.0
+
+
+class Telemetry:
+    """Collects the live numbers of a research session.
+
+    Recording is a few dict and deque updates, cheap enough for the hot path;
+    aggregation (percentiles, rates) only happens in :meth:`snapshot`. When a
+    metrics registry is given, every event is also counted there for export.
+    """
+
+    def __init__(
+        self,
+        rate_window: float = DEFAULT_RATE_WINDOW,
+        latency_samples: int = DEFAULT_LATENCY_SAMPLES,
+        clock: Callable[[], float] = time.monotonic,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        self.rate_window = rate_window
+        self._clock = clock
+        self._started = clock()
+        self._latencies: defaultdict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=latency_samples)
+        )
+        self._ttft: defaultdict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=latency_samples)
+        )
+        self.first_ttft: float | None = None
+        self._calls: Counter[str] = Counter()
+        self._tokens: deque[tuple[float, int, int]] = deque()
+        self._queue: Counter[int] = Counter()
+        self._in_flight: Counter[str] = Counter()
+        self._waits: defaultdict[str, float] = defaultdict(float)
+        self._errors: Counter[str] = Counter()
+        self._parses: Counter[str] = Counter()
+        self.reasks = 0
+        self.early_stops = 0
+        self.skipped = 0
+        self.metrics = metrics
+        if metrics is not None:
+            self._m_requests = metrics.counter(
+                "llm_requests_total", "Completed LLM calls.", ("provider", "stage")
+            )
+            self._m_errors = metrics.counter(
+                "llm_errors_total", "Failed LLM calls.", ("provider", "error")
+            )
+            self._m_tokens = metrics.counter(
+                "llm_tokens_total", "Estimated LLM tokens.", ("provider", "direction")
+            )
+            self._m_latency = metrics.histogram(
+                "llm_latency_seconds", "LLM call latency.", ("stage",)
+            )
+            self._m_ttft = metrics.histogram(
+                "llm_ttft_seconds", "LLM time to first token.", ("stage",)
+            )
+            self._m_first_ttft = metrics.gauge(
+                "llm_first_call_ttft_seconds",
+                "Time to first token of the session's first LLM call.",
+            )
+            self._m_in_flight = metrics.gauge(
+                "llm_in_flight", "LLM calls in progress.", ("provider",)
+            )
+            self._m_waits = metrics.counter(
+                "scheduler_wait_seconds_total", "Time spent throttled.", ("kind",)
+            )
+            self._m_queue = metrics.gauge(
+                "branches_queued", "Queued or running branches.", ("depth",)
+            )
+            self._m_skipped = metrics.counter(
+                "branches_skipped_total", "Branches skipped for the deadline."
+            )
+            self._m_parses = metrics.counter(
+                "parse_results_total",
+                "Parsed LLM responses by outcome.",
+                ("stage", "outcome"),
+            )
+            self._m_reasks = metrics.counter(
+                "llm_reasks_total", "Repair calls after a failed parse.", ("stage",)
+            )
+            self._m_early_stops = metrics.counter(
+                "llm_early_stops_total",
+                "Generations ended once their output was complete.",
+                ("stage",),
+            )
+
+    def call_started(self, provider: str) -> None:
+        """Count a provider call as in flight."""
+        self._in_flight[provider] += 1
+        if self.metrics is not None:
+            self._m_in_flight.inc(provider=provider)
+
+    def call_finished(
+        self,
+        provider: str,
+        stage: str,
+        latency: float,
+        *,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        ttft: float | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Record a finished (or failed) provider call."""
+        self._in_flight[provider] -= 1
+        if self.metrics is not None:
+            self._m_in_flight.inc(-1, provider=provider)
+        if error is not None:
+            self._errors[error] += 1
+            if self.metrics is not None:
+                self._m_errors.inc(provider=provider, error=error)
+            return
+        self._calls[stage] += 1
+        self._latencies[stage].append(latency)
+        self._tokens.append((self._clock(), input_tokens, output_tokens))
+        if ttft is not None:
+            self._record_ttft(stage, ttft)
+        if self.metrics is not None:
+            self._m_requests.inc(provider=provider, stage=stage)
+            self._m_latency.observe(latency, stage=stage)
+            self._m_tokens.inc(input_tokens, provider=provider, direction="in")
+            self._m_tokens.inc(output_tokens, provider=provider, direction="out")
+
+    def _record_ttft(self, stage: str, ttft: float) -> None:
+        self._ttft[stage].append(ttft)
+        first = self.first_ttft is None
+        if first:
+            self.first_ttft = ttft
+        if self.metrics is not None:
+            self._m_ttft.observe(ttft, stage=stage)
+            if first:
+                self._m_first_ttft.set(ttft)
+
+    def record_wait(self, kind: str, seconds: float) -> None:
+        """Add time spent waiting on a throttle (slots, rate limits)."""
+        self._waits[kind] += seconds
+        if self.metrics is not None:
+            self._m_waits.inc(seconds, kind=kind)
+
+    def branch_skipped(self) -> None:
+        """Count a branch that was not started because of the deadline."""
+        self.skipped += 1
+        if self.metrics is not None:
+            self._m_skipped.inc()
+
+    def parse_finished(self, stage: str, outcome: str) -> None:
+        """Count a parsed response (``structured``, ``markdown`` or ``failed``)."""
+        self._parses[outcome] += 1
+        if self.metrics is not None:
+            self._m_parses.inc(stage=stage, outcome=outcome)
+
+    def reask(self, stage: str) -> None:
+        """Count a repair call made because a response could not be parsed."""
+        self.reasks += 1
+        if self.metrics is not None:
+            self._m_reasks.inc(stage=stage)
+
+    def early_stop(self, stage: str) -> None:
+        """Count a generation ended early because its output was complete."""
+        self.early_stops += 1
+        if self.metrics is not None:
+            self._m_early_stops.inc(stage=stage)
+
+    def queue_changed(self, depth: int, delta: int) -> None:
+        """Adjust the number of queued or running branches at a depth."""
+        self._queue[depth] += delta
+        if self._queue[depth] <= 0:
+            del self._queue[depth]
+        if self.metrics is not None:
+            self._m_queue.set(self._queue[depth], depth=str(depth))
+
+    def snapshot(self) -> TelemetrySnapshot:
+        """Aggregate the recorded data into a snapshot."""
+        now = self._clock()
+        while self._tokens and now - self._tokens[0][0] > self.rate_window:
+            self._tokens.popleft()
+        span = min(self.rate_window, max(now - self._started, 1e-9))
+        return TelemetrySnapshot(
+            queue_by_depth=dict(sorted(self._queue.items())),
+            in_flight={k: v for k, v in self._in_flight.items() if v > 0},
+            tokens_in_per_sec=sum(t[1] for t in self._tokens) / span,
+            tokens_out_per_sec=sum(t[2] for t in self._tokens) / span,
+            waits=dict(self._waits),
+            latency={
+                stage: StageLatency(
+                    self._calls[stage],
+                    percentile(list(samples), 0.5),
+                    percentile(list(samples), 0.95),
+                    percentile(list(self._ttft.get(stage, ())), 0.5),
+                )
+                for stage, samples in sorted(self._latencies.items())
+            },
+            errors=dict(self._errors),
+            parses=dict(self._parses),
+            reasks=self.reasks,
+        )
@@ -0,0 +1,107 @@
+"""On-disk cache of LLM responses keyed by request content."""
+
+import hashlib
+import json
+import tempfile
+import threading
+from pathlib import Path
+
+from src.core.metrics import MetricsRegistry
+from src.data.storage import StorageWriter
+from src.utils.profiling import profiled
+
+
+def cache_key(*parts: str) -> str:
+    """Stable key for a sequence of request components."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """Stores response texts as small JSON files under the cache directory.
+
+    With a :class:`StorageWriter` entries are written on its thread and
+    served from memory until they are on disk.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        metrics: MetricsRegistry | None = None,
+        writer: StorageWriter | None = None,
+    ) -> None:
+        self.root = Path(cache_dir) / "responses"
+        self.writer = writer
+        self._pending: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._lookups = (
+            metrics.counter(
+                "cache_lookups_total", "Response cache lookups.", ("result",)
+            )
+            if metrics is not None
+            else None
+        )
+
+    @profiled("cache")
+    def get(self, key: str) -> str | None:
+        """Return the cached text for a key, or None."""
+        path = self._path(key)
+        pending = self._pending.get(key)
+        if pending is None and not path.exists():
+            self.misses += 1
+            if self._lookups is not None:
+                self._lookups.inc(result="miss")
+            return None
+        self.hits += 1
+        if self._lookups is not None:
+            self._lookups.inc(result="hit")
+        if pending is not None:
+            return pending
+        with path.open("r", encoding="utf-8") as f:
+            text: str = json.load(f)["text"]
+        return text
+
+    @profiled("cache")
+    def set(self, key: str, text: str) -> None:
+        """Store text for a key, replacing any previous entry atomically."""
+        path = self._path(key)
+        if self.writer is not None:
+            with self._lock:
+                self._pending[key] = text
+            self.writer.write(
+                path,
+                json.dumps({"text": text}, ensure_ascii=False),
+                atomic=True,
+                done=lambda: self._written(key, text),
+            )
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A unique temp name per writer keeps concurrent sets of one key apart.
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False
+        ) as f:
+            json.dump({"text": text}, f, ensure_ascii=False)
+        Path(f.name).replace(path)
+
+    def _written(self, key: str, text: str) -> None:
+        # A newer text for the key stays pending until it is written too.
+        with self._lock:
+            if self._pending.get(key) is text:
+                del self._pending[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._pending or self._path(key).exists()
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
@@ -0,0 +1,158 @@
+"""Interned table of cited sources shared by every dossier."""
+
+import re
+import sqlite3
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+from src.core.config import Config
+from src.utils.parsers import Citation, citation_spans, extract_citations, normalize_url
+
+CITATIONS_FILE = "citations.sqlite3"
+REFERENCE_PREFIX = "S"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT,
+    first_seen TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS citations (
+    source_id INTEGER NOT NULL REFERENCES sources (id),
+    dossier TEXT NOT NULL,
+    UNIQUE (source_id, dossier)
+);
+CREATE INDEX IF NOT EXISTS citations_by_dossier ON citations (dossier);
+"""
+
+# A reference that compact() wrote and the model kept, not already a link.
+_REFERENCE_PATTERN = re.compile(rf"\[{REFERENCE_PREFIX}(\d+)\](?!\()")
+
+
+@dataclass(frozen=True)
+class Source:
+    """A cited source, stored once however many dossiers cite it."""
+
+    id: int
+    url: str
+    title: str | None
+    first_seen: str
+
+    @property
+    def reference(self) -> str:
+        """Short form used in prompts and dossiers, e.g. ``[S12]``."""
+        return f"[{REFERENCE_PREFIX}{self.id}]"
+
+
+class CitationStore:
+    """SQLite table of sources keyed by normalized URL, and who cites them.
+
+    :meth:`compact` replaces the URLs of a text with ``[S<id>]`` references
+    and lists every source once, so synthesis prompts do not repeat long
+    URLs; :meth:`expand` turns references in the dossier back into links.
+    :meth:`add` records the sources a dossier cites for :meth:`cited_by`.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.executescript(_SCHEMA)
+
+    @classmethod
+    def from_config(cls, config: Config) -> "CitationStore":
+        """Store in the cache directory."""
+        return cls(Path(config.data.cache_dir) / CITATIONS_FILE)
+
+    def __len__(self) -> int:
+        row = self._db.execute("SELECT count(*) FROM sources").fetchone()
+        return int(row[0])
+
+    def intern(self, citation: Citation) -> Source:
+        """The stored source for a citation, adding it on first sight."""
+        with self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO sources (url, title, first_seen) "
+                "VALUES (?, ?, ?)",
+                (citation.url, citation.title, datetime.now(UTC).isoformat()),
+            )
+        row = self._db.execute(
+            "SELECT id, url, title, first_seen FROM sources WHERE url = ?",
+            (citation.url,),
+        ).fetchone()
+        return Source(*row)
+
+    def source(self, source_id: int) -> Source | None:
+        """A stored source by id."""
+        row = self._db.execute(
+            "SELECT id, url, title, first_seen FROM sources WHERE id = ?",
+            (source_id,),
+        ).fetchone()
+        return Source(*row) if row else None
+
+    def add(self, dossier: str, text: str) -> list[Source]:
+        """Record the sources a dossier cites; returns them in citation order."""
+        sources = [self.intern(citation) for citation in extract_citations(text)]
+        with self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO citations (source_id, dossier) VALUES (?, ?)",
+                [(source.id, dossier) for source in sources],
+            )
+        return sources
+
+    def cited_by(self, url: str) -> list[str]:
+        """Dossiers citing a URL, in the order they were recorded."""
+        rows = self._db.execute(
+            "SELECT dossier FROM citations JOIN sources "
+            "ON citations.source_id = sources.id WHERE url = ? "
+            "ORDER BY citations.rowid",
+            (normalize_url(url),),
+        ).fetchall()
+        return [dossier for (dossier,) in rows]
+
+    def sources(self, dossier: str) -> list[Source]:
+        """Sources a dossier cites, by id."""
+        rows = self._db.execute(
+            "SELECT id, url, title, first_seen FROM sources JOIN citations "
+            "ON citations.source_id = sources.id WHERE dossier = ? ORDER BY id",
+            (dossier,),
+        ).fetchall()
+        return [Source(*row) for row in rows]
+
+    def compact(self, text: str) -> tuple[str, str]:
+        """A text with references in place of URLs, and the list of sources.
+
+        A titled link keeps its title before the reference; the list has one
+        ``[S<id>] <url>`` line per source.
+        """
+        parts: list[str] = []
+        legend: dict[int, str] = {}
+        last = 0
+        for start, end, citation in citation_spans(text):
+            source = self.intern(citation)
+            legend.setdefault(source.id, f"{source.reference} {source.url}")
+            # A link expand() wrote goes back to its bare reference.
+            title = (
+                f"{citation.title} "
+                if citation.title and f"[{citation.title}]" != source.reference
+                else ""
+            )
+            parts.extend((text[last:start], title, source.reference))
+            last = end
+        parts.append(text[last:])
+        return "".join(parts), "\n".join(legend.values())
+
+    def expand(self, text: str) -> str:
+        """Turn ``[S<id>]`` references into markdown links to the sources."""
+
+        def link(match: re.Match[str]) -> str:
+            source = self.source(int(match[1]))
+            return match[0] if source is None else f"{match[0]}({source.url})"
+
+        return _REFERENCE_PATTERN.sub(link, text)
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
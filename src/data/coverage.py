@@ -0,0 +1,184 @@
+"""Bitmap index of research progress over the mindmap."""
+
+import struct
+import tempfile
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from src.data.kb_loader import MindmapNode
+from src.utils.parsers import Question
+
+STAGE_STRATEGIZED = 1
+STAGE_DECOMPOSED = 2
+STAGE_DOSSIER = 4
+STAGE_EXPANDED = 8
+COVERAGE_STAGES = {
+    "strategized": STAGE_STRATEGIZED,
+    "decomposed": STAGE_DECOMPOSED,
+    "dossier": STAGE_DOSSIER,
+    "expanded": STAGE_EXPANDED,
+}
+COVERAGE_FILE = "coverage.bin"
+
+# One record per node with progress: the 8 bytes of its hex id and its stages.
+_RECORD = struct.Struct("8sB")
+
+
+@dataclass(frozen=True)
+class BranchProgress:
+    """How many tracked nodes of a subtree have reached a stage."""
+
+    node: MindmapNode
+    done: int
+    total: int
+
+    @property
+    def fraction(self) -> float:
+        """Share of the subtree done (1.0 when nothing in it is tracked)."""
+        return self.done / self.total if self.total else 1.0
+
+
+def journal_stages(events: Iterable[dict[str, Any]]) -> int:
+    """Stages a node reached, read from its session journal.
+
+    ``decomposed`` means Stage 0 and Stage 1 finished; a saved dossier below
+    depth 1 means follow-up questions of the key questions were researched.
+    """
+    stages = 0
+    for event in events:
+        if event["event"] == "decomposed":
+            stages |= STAGE_STRATEGIZED | STAGE_DECOMPOSED
+        elif event["event"] == "dossier_saved":
+            stages |= STAGE_DOSSIER
+            if Question(str(event["number"]), "").depth > 1:
+                stages |= STAGE_EXPANDED
+    return stages
+
+
+def _bitset(positions: Iterable[int], size: int) -> int:
+    # Setting bits in a bytearray avoids rebuilding a big int per position.
+    data = bytearray((size + 7) // 8)
+    for position in positions:
+        data[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(data, "little")
+
+
+def _positions(bits: int) -> Iterator[int]:
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for offset, byte in enumerate(data):
+        if byte:
+            for bit in range(8):
+                if byte >> bit & 1:
+                    yield offset * 8 + bit
+
+
+def _subtree_ends(nodes: list[MindmapNode]) -> list[int]:
+    ends = [len(nodes)] * len(nodes)
+    ancestors: list[int] = []
+    for position, node in enumerate(nodes):
+        while ancestors:
+            parent = nodes[ancestors[-1]]
+            if node.path[: parent.level] == parent.path:
+                break
+            ends[ancestors.pop()] = position
+        ancestors.append(position)
+    return ends
+
+
+class CoverageIndex:
+    """Which stages every mindmap node has reached, one bitset per stage.
+
+    Nodes are kept sorted by path, so every subtree is a contiguous run of
+    bits: the progress of a branch is a mask and a popcount, and the nodes
+    of a level lacking a stage are one AND-NOT, however large the mindmap.
+    With a path the index is loaded from (and saved to) a compact file of
+    node ids and stage bits; nodes no longer in the mindmap are dropped.
+    """
+
+    def __init__(self, nodes: list[MindmapNode], path: str | Path | None = None):
+        self.path = Path(path) if path is not None else None
+        self.nodes = sorted(nodes, key=lambda node: node.path)
+        self._positions = {node.id: i for i, node in enumerate(self.nodes)}
+        self._ends = _subtree_ends(self.nodes)
+        by_level: defaultdict[int, list[int]] = defaultdict(list)
+        for position, node in enumerate(self.nodes):
+            by_level[node.level].append(position)
+        self._levels = {
+            level: _bitset(positions, len(self.nodes))
+            for level, positions in by_level.items()
+        }
+        reached: defaultdict[int, list[int]] = defaultdict(list)
+        if self.path is not None and self.path.exists():
+            for raw_id, stages in _RECORD.iter_unpack(self.path.read_bytes()):
+                found = self._positions.get(raw_id.hex())
+                for stage in COVERAGE_STAGES.values():
+                    if found is not None and stages & stage:
+                        reached[stage].append(found)
+        self._stages = {
+            stage: _bitset(reached[stage], len(self.nodes))
+            for stage in COVERAGE_STAGES.values()
+        }
+
+    def mark(self, node_id: str, stages: int) -> None:
+        """Record that a node reached the given stages."""
+        bit = 1 << self._positions[node_id]
+        for stage in self._stages:
+            if stages & stage:
+                self._stages[stage] |= bit
+
+    def stages(self, node_id: str) -> int:
+        """Stages a node has reached."""
+        position = self._positions[node_id]
+        return sum(
+            stage for stage, bits in self._stages.items() if bits >> position & 1
+        )
+
+    def missing(self, stage: int, level: int) -> list[MindmapNode]:
+        """Nodes of a level that have not reached a stage, in path order."""
+        bits = self._levels.get(level, 0) & ~self._stages[stage]
+        return [self.nodes[position] for position in _positions(bits)]
+
+    def progress(
+        self, stage: int, level: int, *, tracked: tuple[int, int]
+    ) -> list[BranchProgress]:
+        """Share of tracked nodes that reached a stage below each node of a level.
+
+        ``tracked`` is the inclusive range of levels that are researched;
+        a subtree's count includes its root.
+        """
+        first, last = tracked
+        scope = 0
+        for tracked_level in range(first, last + 1):
+            scope |= self._levels.get(tracked_level, 0)
+        done = self._stages[stage] & scope
+        branches = []
+        for position in _positions(self._levels.get(level, 0)):
+            span = (1 << (self._ends[position] - position)) - 1
+            branches.append(
+                BranchProgress(
+                    self.nodes[position],
+                    (done >> position & span).bit_count(),
+                    (scope >> position & span).bit_count(),
+                )
+            )
+        return branches
+
+    def save(self) -> None:
+        """Persist the index, replacing the previous file atomically."""
+        if self.path is None:
+            return
+        reached: defaultdict[int, int] = defaultdict(int)
+        for stage, bits in self._stages.items():
+            for position in _positions(bits):
+                reached[position] |= stage
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=self.path.parent, suffix=".tmp", delete=False
+        ) as f:
+            for position in sorted(reached):
+                node = self.nodes[position]
+                f.write(_RECORD.pack(bytes.fromhex(node.id), reached[position]))
+        Path(f.name).replace(self.path)
@@ -0,0 +1,138 @@
+"""Loading of the hierarchical mindmap CSV (Level 1 -> Level 5)."""
+
+import csv
+import hashlib
+import json
+import tempfile
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.utils.profiling import profiled
+
+LEVEL_PREFIX = "Level "
+TOPIC_SEPARATOR = " > "
+NODE_ID_LENGTH = 16
+
+
+@dataclass(frozen=True)
+class MindmapNode:
+    """A mindmap node, identified by its path from the Level 1 root."""
+
+    path: tuple[str, ...]
+
+    @property
+    def level(self) -> int:
+        """Mindmap level of the node (1 for the root)."""
+        return len(self.path)
+
+    @property
+    def topic(self) -> str:
+        """Research topic for the node: its path joined with ``>``."""
+        return TOPIC_SEPARATOR.join(self.path)
+
+    @property
+    def id(self) -> str:
+        """Stable identifier derived from the path, safe as a file name."""
+        return node_id(self.topic)
+
+
+def node_id(topic: str) -> str:
+    """Identifier of the node with the given topic."""
+    return hashlib.sha256(topic.encode("utf-8")).hexdigest()[:NODE_ID_LENGTH]
+
+
+@dataclass
+class MindmapDiff:
+    """Topics of a mindmap compared with a previous manifest."""
+
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+
+
+@profiled("load")
+def load_mindmap(path: str | Path) -> list[MindmapNode]:
+    """Every node of a mindmap CSV, in first-seen order.
+
+    Each row lists one branch, one column per level; empty trailing cells
+    end the branch early. Nodes shared by several rows are returned once.
+    """
+    with Path(path).open(encoding="utf-8", newline="") as f:
+        rows = csv.reader(f)
+        header = next(rows, [])
+        levels = [i for i, name in enumerate(header) if name.startswith(LEVEL_PREFIX)]
+        if not levels:
+            raise ValueError(f"Mindmap CSV has no Level columns: {path}")
+        nodes: dict[tuple[str, ...], MindmapNode] = {}
+        for row in rows:
+            branch: list[str] = []
+            for index in levels:
+                cell = row[index].strip() if index < len(row) else ""
+                if not cell:
+                    break
+                branch.append(cell)
+                key = tuple(branch)
+                if key not in nodes:
+                    nodes[key] = MindmapNode(key)
+    return list(nodes.values())
+
+
+def nodes_at_levels(
+    nodes: list[MindmapNode], first: int, last: int
+) -> list[MindmapNode]:
+    """Nodes whose level lies between ``first`` and ``last`` inclusive."""
+    return [node for node in nodes if first <= node.level <= last]
+
+
+def node_digests(nodes: list[MindmapNode]) -> dict[str, str]:
+    """Content hash of every node's subtree, keyed by topic.
+
+    A node's hash covers its path and the hashes of its children, so an
+    edit changes the hashes of the edited nodes and their ancestors only.
+    """
+    children: defaultdict[tuple[str, ...], list[MindmapNode]] = defaultdict(list)
+    for node in nodes:
+        children[node.path[:-1]].append(node)
+    digests: dict[str, str] = {}
+    for node in sorted(nodes, key=lambda n: n.level, reverse=True):
+        digest = hashlib.sha256(node.topic.encode("utf-8"))
+        for child in sorted(children[node.path], key=lambda n: n.path):
+            digest.update(b"\0" + digests[child.topic].encode("ascii"))
+        digests[node.topic] = digest.hexdigest()
+    return {node.topic: digests[node.topic] for node in nodes}
+
+
+def diff_digests(old: dict[str, str], new: dict[str, str]) -> MindmapDiff:
+    """Compare node digests of a previous run with the current mindmap."""
+    diff = MindmapDiff(removed=[topic for topic in old if topic not in new])
+    for topic, digest in new.items():
+        if topic not in old:
+            diff.added.append(topic)
+        elif old[topic] != digest:
+            diff.changed.append(topic)
+        else:
+            diff.unchanged.append(topic)
+    return diff
+
+
+def load_manifest(path: str | Path) -> dict[str, str]:
+    """Node digests recorded by a previous run, or nothing if there was none."""
+    manifest = Path(path)
+    if not manifest.exists():
+        return {}
+    with manifest.open(encoding="utf-8") as f:
+        nodes: dict[str, str] = json.load(f)["nodes"]
+    return nodes
+
+
+def save_manifest(path: str | Path, digests: dict[str, str]) -> None:
+    """Record node digests, replacing the previous manifest atomically."""
+    manifest = Path(path)
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=manifest.parent, suffix=".tmp", delete=False
+    ) as f:
+        json.dump({"nodes": digests}, f, ensure_ascii=False, indent=1)
+    Path(f.name).replace(manifest)
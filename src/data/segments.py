@@ -0,0 +1,109 @@
+"""Append-only, mmap-backed text segments referenced by small handles."""
+
+import hashlib
+import mmap
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+DEFAULT_RESIDENT_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class TextHandle:
+    """Location of a stored text: byte offset and length, plus content hash."""
+
+    offset: int
+    length: int
+    digest: str
+
+
+class SegmentStore:
+    """Keeps large texts on disk so callers only need to hold handles.
+
+    Texts are appended to a single segment file and read back through a
+    memory map. Identical texts are stored once. Recently loaded texts stay
+    decoded in an LRU cache bounded by ``max_resident_bytes``; everything
+    else lives only in the page cache, which the OS can reclaim.
+    """
+
+    def __init__(
+        self, path: str | Path, max_resident_bytes: int = DEFAULT_RESIDENT_BYTES
+    ) -> None:
+        if max_resident_bytes < 0:
+            raise ValueError("Resident memory cap must not be negative")
+        self.path = Path(path)
+        self.max_resident_bytes = max_resident_bytes
+        self.resident_bytes = 0
+        self._resident: OrderedDict[int, tuple[str, int]] = OrderedDict()
+        self._by_digest: dict[str, TextHandle] = {}
+        self._file: BinaryIO | None = None
+        self._map: mmap.mmap | None = None
+        self._size = 0
+
+    def put(self, text: str) -> TextHandle:
+        """Append a text (unless already stored) and return its handle."""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        handle = self._by_digest.get(digest)
+        if handle is not None:
+            return handle
+        file = self._open()
+        file.write(data)
+        file.flush()
+        handle = TextHandle(self._size, len(data), digest)
+        self._size += len(data)
+        self._by_digest[digest] = handle
+        return handle
+
+    def get(self, handle: TextHandle) -> str:
+        """Load the text behind a handle."""
+        if handle.length == 0:
+            return ""
+        resident = self._resident.get(handle.offset)
+        if resident is not None:
+            self._resident.move_to_end(handle.offset)
+            return resident[0]
+        self._open()
+        if handle.offset + handle.length > self._size:
+            raise ValueError(f"Handle beyond end of segment file: {handle}")
+        if self._map is None or len(self._map) < handle.offset + handle.length:
+            self._remap()
+        assert self._map is not None
+        text = self._map[handle.offset : handle.offset + handle.length].decode("utf-8")
+        self._keep(handle, text)
+        return text
+
+    def close(self) -> None:
+        """Release the memory map, file handle and resident texts."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._resident.clear()
+        self.resident_bytes = 0
+
+    def _open(self) -> BinaryIO:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("ab+")
+            self._size = self._file.seek(0, 2)
+        return self._file
+
+    def _remap(self) -> None:
+        # The file only grows, so a map that ends before a handle is stale.
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._open().fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _keep(self, handle: TextHandle, text: str) -> None:
+        if handle.length > self.max_resident_bytes:
+            return
+        self._resident[handle.offset] = (text, handle.length)
+        self.resident_bytes += handle.length
+        while self.resident_bytes > self.max_resident_bytes:
+            _, (_, length) = self._resident.popitem(last=False)
+            self.resident_bytes -= length
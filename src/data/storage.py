@@ -0,0 +1,353 @@
+"""Persistence of research results (markdown dossiers and JSON journal)."""
+
+import json
+import logging
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from src.core.config import Config
+from src.core.metrics import MetricsRegistry
+from src.utils.profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+_TASK_ID_PATTERN = re.compile(r"^[\w.-]+$")
+MAX_PENDING_WRITES = 1024
+MAX_BATCH = 256
+DEFAULT_SYNC_INTERVAL = 300.0
+
+
+def validate_task_id(task_id: str) -> str:
+    """Ensure a task id is safe to use as a file name."""
+    if not _TASK_ID_PATTERN.match(task_id):
+        raise ValueError(f"Invalid task id: {task_id!r}")
+    return task_id
+
+
+@dataclass(frozen=True)
+class _Write:
+    path: Path
+    text: str
+    append: bool = False
+    atomic: bool = False
+    done: Callable[[], None] | None = None
+
+
+@dataclass(frozen=True)
+class _Flush:
+    synced: threading.Event
+
+
+class StorageWriter:
+    """Applies file writes on a background thread, in batches.
+
+    Callers enqueue writes and return at once; the thread drains the queue
+    in batches, joining appends to the same file into one write. Files are
+    fsynced together every ``sync_interval`` seconds and on :meth:`flush`
+    or :meth:`close` rather than after every write. When ``max_pending``
+    writes are queued, enqueueing blocks until the disk catches up. The
+    first write error is logged and raised by the next flush or close.
+    """
+
+    def __init__(
+        self,
+        sync_interval: float = DEFAULT_SYNC_INTERVAL,
+        max_pending: int = MAX_PENDING_WRITES,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        if sync_interval <= 0:
+            raise ValueError("Sync interval must be positive")
+        self.sync_interval = sync_interval
+        self._queue: queue.Queue[_Write | _Flush | None] = queue.Queue(max_pending)
+        self._dirty: set[Path] = set()
+        self._error: OSError | None = None
+        self._depth = (
+            metrics.gauge("storage_queue_depth", "Writes waiting for the writer.")
+            if metrics is not None
+            else None
+        )
+        self._syncs = (
+            metrics.counter("storage_fsyncs_total", "Files synced to disk.")
+            if metrics is not None
+            else None
+        )
+        self._thread = threading.Thread(
+            target=self._run, name="storage-writer", daemon=True
+        )
+        self._thread.start()
+
+    @classmethod
+    def from_config(
+        cls, config: Config, metrics: MetricsRegistry | None = None
+    ) -> "StorageWriter":
+        """Writer syncing every ``engine.auto_save_interval`` seconds."""
+        return cls(float(config.engine.auto_save_interval), metrics=metrics)
+
+    def write(
+        self,
+        path: Path,
+        text: str,
+        *,
+        atomic: bool = False,
+        done: Callable[[], None] | None = None,
+    ) -> None:
+        """Queue replacing a file; ``done`` runs on the thread once written."""
+        self._put(_Write(path, text, atomic=atomic, done=done))
+
+    def append(self, path: Path, text: str) -> None:
+        """Queue appending text to a file."""
+        self._put(_Write(path, text, append=True))
+
+    def flush(self) -> None:
+        """Wait until every queued write is applied and synced."""
+        synced = threading.Event()
+        self._put(_Flush(synced))
+        synced.wait()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Flush and stop the thread; later writes are refused."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_error()
+
+    def _put(self, item: _Write | _Flush) -> None:
+        if not self._thread.is_alive():
+            raise RuntimeError("Storage writer is closed")
+        self._queue.put(item)
+        if self._depth is not None:
+            self._depth.set(self._queue.qsize())
+
+    def _raise_error(self) -> None:
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.sync_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = _Flush(threading.Event())
+            batch = [item]
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if self._depth is not None:
+                self._depth.set(self._queue.qsize())
+            stop = self._apply(batch)
+            if stop or time.monotonic() >= deadline:
+                self._sync()
+                deadline = time.monotonic() + self.sync_interval
+            if stop:
+                return
+
+    def _apply(self, batch: list[_Write | _Flush | None]) -> bool:
+        appends: dict[Path, list[str]] = {}
+        for item in batch:
+            if isinstance(item, _Write) and item.append:
+                appends.setdefault(item.path, []).append(item.text)
+                continue
+            # Queued appends go first, so flushes see everything before them.
+            self._append_all(appends)
+            if item is None:
+                return True
+            if isinstance(item, _Flush):
+                self._sync()
+                item.synced.set()
+            else:
+                self._replace(item)
+        self._append_all(appends)
+        return False
+
+    def _append_all(self, appends: dict[Path, list[str]]) -> None:
+        for path, texts in appends.items():
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with path.open("a", encoding="utf-8") as f:
+                    f.write("".join(texts))
+                self._dirty.add(path)
+            except OSError as e:
+                self._failed(path, e)
+        appends.clear()
+
+    def _replace(self, item: _Write) -> None:
+        try:
+            item.path.parent.mkdir(parents=True, exist_ok=True)
+            if item.atomic:
+                with tempfile.NamedTemporaryFile(
+                    "w",
+                    encoding="utf-8",
+                    dir=item.path.parent,
+                    suffix=".tmp",
+                    delete=False,
+                ) as f:
+                    f.write(item.text)
+                Path(f.name).replace(item.path)
+            else:
+                item.path.write_text(item.text, encoding="utf-8")
+            self._dirty.add(item.path)
+        except OSError as e:
+            self._failed(item.path, e)
+        finally:
+            if item.done is not None:
+                item.done()
+
+    def _sync(self) -> None:
+        for path in self._dirty:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue  # replaced or deleted since it was written
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        if self._syncs is not None:
+            self._syncs.inc(len(self._dirty))
+        self._dirty.clear()
+
+    def _failed(self, path: Path, error: OSError) -> None:
+        logger.error("Writing %s failed: %s", path, error)
+        if self._error is None:
+            self._error = error
+
+
+class ResearchStorage:
+    """Stores dossiers, partial outputs and the session journal on disk.
+
+    With a :class:`StorageWriter` the files are written on its thread, so
+    saving never waits for the disk; reads flush the writer first.
+    """
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        metrics: MetricsRegistry | None = None,
+        writer: StorageWriter | None = None,
+    ) -> None:
+        self.output_dir = Path(output_dir)
+        self.writer = writer
+        self.dossier_dir = self.output_dir / "dossiers"
+        self.partial_dir = self.output_dir / "partial"
+        self.history_dir = self.dossier_dir / "history"
+        self.journal_path = self.output_dir / "journal.jsonl"
+        self.pruned_path = self.output_dir / "pruned.jsonl"
+        self.metrics = metrics
+        if metrics is not None:
+            self._writes = metrics.counter(
+                "storage_writes_total", "Files and records written.", ("kind",)
+            )
+            self._bytes = metrics.counter(
+                "storage_bytes_written_total", "Bytes written.", ("kind",)
+            )
+
+    def save_dossier(self, task_id: str, text: str) -> Path:
+        """Write a finished dossier as markdown."""
+        return self._write(self.dossier_dir, task_id, text)
+
+    def load_dossier(self, task_id: str) -> str | None:
+        """Read a finished dossier, if one exists."""
+        self.flush()
+        path = self.dossier_dir / f"{validate_task_id(task_id)}.md"
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+    def update_dossier(self, task_id: str, text: str) -> int:
+        """Replace a dossier, keeping the previous text as a numbered version.
+
+        Returns the version of the new text (the first dossier is version 1).
+        """
+        previous = self.load_dossier(task_id)
+        version = self.dossier_version(task_id)
+        if previous is not None:
+            self._write(self.history_dir, f"{task_id}.v{version}", previous)
+            version += 1
+        self.save_dossier(task_id, text)
+        return version
+
+    def dossier_version(self, task_id: str) -> int:
+        """Version of the current dossier: one more than the versions kept."""
+        self.flush()
+        pattern = f"{validate_task_id(task_id)}.v*.md"
+        return 1 + sum(1 for _ in self.history_dir.glob(pattern))
+
+    def load_dossier_version(self, task_id: str, version: int) -> str | None:
+        """Read an earlier version of a dossier, if it was kept."""
+        self.flush()
+        path = self.history_dir / f"{validate_task_id(task_id)}.v{version}.md"
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+    def save_partial(self, task_id: str, text: str) -> Path:
+        """Write output from a call that was cut short."""
+        return self._write(self.partial_dir, task_id, text)
+
+    def append_journal(self, event: str, **fields: Any) -> None:
+        """Append a timestamped event to the session journal."""
+        entry = {"ts": datetime.now(UTC).isoformat(), "event": event, **fields}
+        self._append_jsonl(self.journal_path, entry)
+
+    def read_journal(self) -> list[dict[str, Any]]:
+        """Return all journal events in order."""
+        self.flush()
+        return self._read_jsonl(self.journal_path)
+
+    def append_pruned(self, **fields: Any) -> None:
+        """Record a research candidate that was not expanded."""
+        self._append_jsonl(self.pruned_path, fields)
+
+    def read_pruned(self) -> list[dict[str, Any]]:
+        """Return all pruned candidates in the order they were recorded."""
+        self.flush()
+        return self._read_jsonl(self.pruned_path)
+
+    def flush(self) -> None:
+        """Wait for queued writes to reach the disk."""
+        if self.writer is not None:
+            self.writer.flush()
+
+    @profiled("storage")
+    def _append_jsonl(self, path: Path, entry: dict[str, Any]) -> None:
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        if self.writer is not None:
+            self.writer.append(path, line)
+        else:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as f:
+                f.write(line)
+        self._count(path.stem, line)
+
+    @staticmethod
+    def _read_jsonl(path: Path) -> list[dict[str, Any]]:
+        if not path.exists():
+            return []
+        with path.open("r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    @profiled("storage")
+    def _write(self, directory: Path, task_id: str, text: str) -> Path:
+        path = directory / f"{validate_task_id(task_id)}.md"
+        if self.writer is not None:
+            self.writer.write(path, text)
+        else:
+            directory.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+        self._count(directory.name, text)
+        return path
+
+    def _count(self, kind: str, text: str) -> None:
+        if self.metrics is not None:
+            self._writes.inc(kind=kind)
+            self._bytes.inc(len(text.encode("utf-8")), kind=kind)
@@ -0,0 +1,158 @@
+"""Search execution for manual and automated research modes."""
+
+import asyncio
+import contextlib
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from src.core.config import Config
+from src.core.llm_client import LLMClient, LLMRequest
+from src.data.storage import validate_task_id
+from src.engine.prompts import STAGE_SEARCH
+from src.engine.scheduler import ResearchScheduler
+
+logger = logging.getLogger(__name__)
+
+PROMPT_SUFFIX = ".prompt.md"
+RESULT_SUFFIX = ".result.md"
+DONE_SUFFIX = ".done.md"
+
+
+class SearchExecutor(ABC):
+    """Interface for obtaining search results for a generated search prompt."""
+
+    @abstractmethod
+    async def search(self, task_id: str, prompt: str) -> str:
+        """Return the search result text for the given prompt."""
+
+
+class ManualSearchInbox:
+    """Feeds manually pasted search results to parked scheduler futures.
+
+    Each pending search is written to ``<inbox>/<task_id>.prompt.md``. The
+    operator answers by saving ``<task_id>.result.md`` next to it, or by
+    sending the task id and result text over the local socket.
+
+    Result files should be written under another name and renamed into
+    place. As a guard against editors that write in place, a result file is
+    only consumed once its size and mtime are unchanged between two polls.
+    """
+
+    def __init__(
+        self,
+        inbox_dir: str | Path,
+        scheduler: ResearchScheduler,
+        poll_interval: float = 1.0,
+    ) -> None:
+        self.inbox_dir = Path(inbox_dir)
+        self.scheduler = scheduler
+        self.poll_interval = poll_interval
+        self._seen: dict[str, tuple[int, int]] = {}
+
+    def request(self, task_id: str, prompt: str) -> "asyncio.Future[str]":
+        """Publish a search prompt and return the future for its result."""
+        validate_task_id(task_id)
+        self.inbox_dir.mkdir(parents=True, exist_ok=True)
+        (self.inbox_dir / f"{task_id}{PROMPT_SUFFIX}").write_text(
+            prompt, encoding="utf-8"
+        )
+        logger.info("Manual search %s is waiting in %s", task_id, self.inbox_dir)
+        return self.scheduler.park(task_id)
+
+    def submit(self, task_id: str, result: str) -> bool:
+        """Resolve a pending search with the given result text."""
+        resolved = self.scheduler.resolve(task_id, result)
+        if not resolved:
+            logger.warning("No pending manual search for %s", task_id)
+        return resolved
+
+    def poll(self) -> int:
+        """Pick up result files for pending searches; return how many resolved."""
+        resolved = 0
+        for task_id in self.scheduler.parked:
+            result_path = self.inbox_dir / f"{task_id}{RESULT_SUFFIX}"
+            try:
+                stat = result_path.stat()
+            except FileNotFoundError:
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if self._seen.get(task_id) != signature:
+                # Still being written, or first sighting; check again next poll.
+                self._seen[task_id] = signature
+                continue
+            del self._seen[task_id]
+            result = result_path.read_text(encoding="utf-8")
+            result_path.replace(self.inbox_dir / f"{task_id}{DONE_SUFFIX}")
+            if self.submit(task_id, result):
+                resolved += 1
+        return resolved
+
+    async def watch(self) -> None:
+        """Poll the inbox directory until cancelled."""
+        while True:
+            self.poll()
+            await asyncio.sleep(self.poll_interval)
+
+    async def serve_socket(self, path: str | Path) -> asyncio.AbstractServer:
+        """Accept results on a Unix socket: first line task id, rest is the text."""
+
+        async def handle(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            try:
+                task_id = (await reader.readline()).decode("utf-8").strip()
+                result = (await reader.read()).decode("utf-8")
+                ok = self.submit(task_id, result)
+                writer.write(b"ok\n" if ok else b"unknown\n")
+                await writer.drain()
+            finally:
+                writer.close()
+                with contextlib.suppress(ConnectionError):
+                    await writer.wait_closed()
+
+        return await asyncio.start_unix_server(handle, path=str(path))
+
+
+class ManualSearchExecutor(SearchExecutor):
+    """Semi-manual mode: the operator runs the search and pastes the result."""
+
+    def __init__(self, inbox: ManualSearchInbox) -> None:
+        self.inbox = inbox
+
+    async def search(self, task_id: str, prompt: str) -> str:
+        """Wait for the operator's result without holding a concurrency slot."""
+        return await self.inbox.request(task_id, prompt)
+
+
+class LLMSearchExecutor(SearchExecutor):
+    """Automatic mode: the search prompt is answered by an online LLM."""
+
+    def __init__(self, client: LLMClient, scheduler: ResearchScheduler) -> None:
+        self.client = client
+        self.scheduler = scheduler
+
+    async def search(self, task_id: str, prompt: str) -> str:
+        """Run the search prompt under the scheduler's concurrency limit."""
+        validate_task_id(task_id)
+        request = LLMRequest(prompt=prompt, stage=STAGE_SEARCH)
+        deadline = self.scheduler.deadline
+        response = await self.scheduler.run_llm(
+            lambda: self.client.generate(request, deadline=deadline)
+        )
+        return response.text
+
+
+def create_search_executor(
+    config: Config, client: LLMClient, scheduler: ResearchScheduler
+) -> tuple[SearchExecutor, ManualSearchInbox | None]:
+    """Executor for the configured mode and, in manual modes, its inbox.
+
+    The caller is responsible for running the inbox's :meth:`watch` loop.
+    """
+    if config.mode == "automatic":
+        return LLMSearchExecutor(client, scheduler), None
+    inbox = ManualSearchInbox(
+        config.data.inbox_dir, scheduler, config.engine.inbox_poll_interval
+    )
+    return ManualSearchExecutor(inbox), inbox
@@ -0,0 +1,141 @@
+"""Incremental research of a whole mindmap, driven by a node manifest."""
+
+import logging
+import shutil
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.core.config import Config
+from src.core.llm_client import LLMError
+from src.data.coverage import (
+    COVERAGE_FILE,
+    STAGE_DECOMPOSED,
+    STAGE_STRATEGIZED,
+    CoverageIndex,
+    journal_stages,
+)
+from src.data.kb_loader import (
+    MindmapDiff,
+    MindmapNode,
+    diff_digests,
+    load_manifest,
+    node_digests,
+    node_id,
+    nodes_at_levels,
+    save_manifest,
+)
+from src.data.storage import ResearchStorage
+from src.engine.prewarm import PREWARM_LEVELS
+
+logger = logging.getLogger(__name__)
+
+MINDMAP_DIR = "mindmap"
+MANIFEST_FILE = "manifest.json"
+
+TopicRunner = Callable[[Config, str], Awaitable[object]]
+
+
+@dataclass
+class MindmapRun:
+    """Outcome of an incremental mindmap run."""
+
+    diff: MindmapDiff
+    researched: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+
+
+def mindmap_root(config: Config) -> Path:
+    """Directory holding one output directory per researched node."""
+    return Path(config.data.output_dir) / MINDMAP_DIR
+
+
+def load_coverage(config: Config, nodes: list[MindmapNode]) -> CoverageIndex:
+    """Coverage index of a mindmap, persisted next to the manifest."""
+    return CoverageIndex(nodes, mindmap_root(config) / COVERAGE_FILE)
+
+
+def rebuild_coverage(config: Config, nodes: list[MindmapNode]) -> CoverageIndex:
+    """Coverage index rebuilt from the journals of every node output.
+
+    Needed once for outputs written before the index existed; stages only
+    known from pre-warming are kept.
+    """
+    coverage = load_coverage(config, nodes)
+    root = mindmap_root(config)
+    for node in nodes_at_levels(nodes, *PREWARM_LEVELS):
+        stages = journal_stages(ResearchStorage(root / node.id).read_journal())
+        coverage.mark(node.id, stages)
+    coverage.save()
+    return coverage
+
+
+def mark_prewarmed(config: Config, nodes: list[MindmapNode], failed: list[str]) -> None:
+    """Record Stage 0/1 as done for pre-warmed nodes that did not fail."""
+    coverage = load_coverage(config, nodes)
+    skipped = set(failed)
+    for node in nodes_at_levels(nodes, *PREWARM_LEVELS):
+        if node.topic not in skipped:
+            coverage.mark(node.id, STAGE_STRATEGIZED | STAGE_DECOMPOSED)
+    coverage.save()
+
+
+def plan_mindmap(
+    config: Config, nodes: list[MindmapNode]
+) -> tuple[list[MindmapNode], dict[str, str], MindmapDiff]:
+    """Nodes to research (Level 2-4), their digests and the manifest diff."""
+    digests = node_digests(nodes)
+    targets = nodes_at_levels(nodes, *PREWARM_LEVELS)
+    current = {node.topic: digests[node.topic] for node in targets}
+    previous = load_manifest(mindmap_root(config) / MANIFEST_FILE)
+    return targets, current, diff_digests(previous, current)
+
+
+async def research_mindmap(
+    config: Config,
+    nodes: list[MindmapNode],
+    run_topic: TopicRunner,
+) -> MindmapRun:
+    """Research the mindmap's Level 2-4 nodes, skipping work already done.
+
+    Every node writes to ``<output_dir>/mindmap/<node id>``, and the
+    manifest there records the subtree hash of every finished node. On a
+    rerun only added nodes (and nodes whose last run failed) are
+    researched. Outputs of removed nodes are deleted, and all other outputs
+    are kept: a node's research depends on its path only, so an edit below
+    a node does not invalidate the node itself. The stages every node
+    reached are recorded in the coverage index as nodes finish.
+    """
+    root = mindmap_root(config)
+    manifest_path = root / MANIFEST_FILE
+    targets, digests, diff = plan_mindmap(config, nodes)
+    manifest = load_manifest(manifest_path)
+    for topic in diff.removed:
+        shutil.rmtree(root / node_id(topic), ignore_errors=True)
+        del manifest[topic]
+    for topic in diff.changed:
+        manifest[topic] = digests[topic]
+    save_manifest(manifest_path, manifest)
+    coverage = load_coverage(config, nodes)
+    coverage.save()  # drops the removed nodes
+
+    run = MindmapRun(diff)
+    for node in targets:
+        if node.topic in manifest:
+            continue
+        node_config = config.override(data={"output_dir": str(root / node.id)})
+        # Leftovers of an interrupted run would mix into the new journal.
+        shutil.rmtree(node_config.data.output_dir, ignore_errors=True)
+        try:
+            await run_topic(node_config, node.topic)
+        except (LLMError, TimeoutError) as e:
+            logger.warning("Researching %s failed: %s", node.topic, e)
+            run.failed.append(node.topic)
+            continue
+        run.researched.append(node.topic)
+        manifest[node.topic] = digests[node.topic]
+        save_manifest(manifest_path, manifest)
+        storage = ResearchStorage(node_config.data.output_dir)
+        coverage.mark(node.id, journal_stages(storage.read_journal()))
+        coverage.save()
+    return run
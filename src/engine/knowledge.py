@@ -0,0 +1,166 @@
+"""Cross-session knowledge cache: full-text index of past dossiers."""
+
+import hashlib
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.core.config import Config
+from src.core.metrics import MetricsRegistry
+from src.engine.planner import keywords
+from src.utils.profiling import profiled
+
+KNOWLEDGE_FILE = "knowledge.sqlite3"
+DEFAULT_CANDIDATES = 10
+DEFAULT_MAX_CONTEXT = 2
+# BM25 weights of the question and body columns: a matching question says
+# far more about a prior dossier than a passing mention in its body.
+QUESTION_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS dossiers USING fts5(
+    question, body, source UNINDEXED, digest UNINDEXED, tokenize = 'unicode61'
+)
+"""
+
+
+def similarity(first: str, second: str) -> float:
+    """Jaccard overlap of two questions' keywords (1.0 for the same words)."""
+    a, b = keywords(first), keywords(second)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass(frozen=True)
+class KnowledgeHit:
+    """A prior dossier retrieved for a new question."""
+
+    question: str
+    dossier: str
+    source: str
+    similarity: float
+
+
+@dataclass(frozen=True)
+class Recall:
+    """Prior dossiers for a question: one to reuse, or some to use as context."""
+
+    reuse: KnowledgeHit | None = None
+    context: list[KnowledgeHit] = field(default_factory=list)
+
+
+class KnowledgeIndex:
+    """SQLite FTS5 index of every dossier written, shared across sessions.
+
+    Candidates for a new question are retrieved by BM25 over prior questions
+    and dossier bodies, then judged by keyword similarity of the questions:
+    at ``reuse_threshold`` or above a prior dossier is reused outright, at
+    ``context_threshold`` or above it is handed to synthesis as context.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        reuse_threshold: float = 0.85,
+        context_threshold: float = 0.5,
+        max_context: int = DEFAULT_MAX_CONTEXT,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        if not 0 <= context_threshold <= reuse_threshold <= 1:
+            raise ValueError("Thresholds must satisfy 0 <= context <= reuse <= 1")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.reuse_threshold = reuse_threshold
+        self.context_threshold = context_threshold
+        self.max_context = max_context
+        self._db = sqlite3.connect(self.path)
+        self._db.execute(_SCHEMA)
+        self._lookups = (
+            metrics.counter(
+                "knowledge_lookups_total",
+                "Knowledge cache lookups by result.",
+                ("result",),
+            )
+            if metrics is not None
+            else None
+        )
+
+    @classmethod
+    def from_config(
+        cls, config: Config, metrics: MetricsRegistry | None = None
+    ) -> "KnowledgeIndex":
+        """Index in the cache directory with the configured thresholds."""
+        return cls(
+            Path(config.data.cache_dir) / KNOWLEDGE_FILE,
+            config.engine.knowledge_reuse_threshold,
+            config.engine.knowledge_context_threshold,
+            metrics=metrics,
+        )
+
+    def __len__(self) -> int:
+        row = self._db.execute("SELECT count(*) FROM dossiers").fetchone()
+        return int(row[0])
+
+    @profiled("knowledge")
+    def add(self, question: str, dossier: str, source: str) -> bool:
+        """Index a dossier; returns False if the same text is already indexed."""
+        digest = hashlib.sha256(dossier.encode("utf-8")).hexdigest()
+        with self._db:
+            if self._db.execute(
+                "SELECT 1 FROM dossiers WHERE digest = ?", (digest,)
+            ).fetchone():
+                return False
+            self._db.execute(
+                "INSERT INTO dossiers (question, body, source, digest) "
+                "VALUES (?, ?, ?, ?)",
+                (question, dossier, source, digest),
+            )
+        return True
+
+    @profiled("knowledge")
+    def search(
+        self, question: str, limit: int = DEFAULT_CANDIDATES
+    ) -> list[KnowledgeHit]:
+        """Prior dossiers sharing words with a question, most similar first."""
+        words = keywords(question)
+        if not words:
+            return []
+        # Quoting makes every keyword a literal term, whatever its characters.
+        query = " OR ".join(f'"{word}"' for word in sorted(words))
+        rows = self._db.execute(
+            "SELECT question, body, source FROM dossiers WHERE dossiers MATCH ? "
+            "ORDER BY bm25(dossiers, ?, ?) LIMIT ?",
+            (query, QUESTION_WEIGHT, BODY_WEIGHT, limit),
+        ).fetchall()
+        hits = [
+            KnowledgeHit(prior, body, source, similarity(question, prior))
+            for prior, body, source in rows
+        ]
+        # sorted() is stable, so equally similar hits keep their BM25 order.
+        return sorted(hits, key=lambda hit: hit.similarity, reverse=True)
+
+    def recall(self, question: str) -> Recall:
+        """Decide how prior dossiers can serve a new question."""
+        hits = [
+            hit
+            for hit in self.search(question)
+            if hit.similarity >= self.context_threshold
+        ]
+        if hits and hits[0].similarity >= self.reuse_threshold:
+            recall = Recall(reuse=hits[0])
+            result = "reuse"
+        elif hits:
+            recall = Recall(context=hits[: self.max_context])
+            result = "context"
+        else:
+            recall = Recall()
+            result = "miss"
+        if self._lookups is not None:
+            self._lookups.inc(result=result)
+        return recall
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
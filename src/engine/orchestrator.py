@@ -0,0 +1,462 @@
+"""Main research loop: strategy, decomposition, search, dossiers, recursion."""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from src.core.config import Config
+from src.core.deadline import DeadlineExceededError
+from src.core.llm_client import LLMClient, LLMError, LLMRequest, estimate_tokens
+from src.data.cache import ResponseCache, cache_key
+from src.data.citations import CitationStore
+from src.data.segments import SegmentStore, TextHandle
+from src.data.storage import ResearchStorage
+from src.engine.execution import SearchExecutor
+from src.engine.knowledge import KnowledgeHit, KnowledgeIndex, Recall
+from src.engine.planner import BeamPlanner, Candidate
+from src.engine.prompts import (
+    DEFAULT_STRATEGIST,
+    REPAIR_SYSTEM,
+    STAGE_DECOMPOSITION,
+    STAGE_REPAIR,
+    STAGE_SEARCH,
+    STAGE_STRATEGY,
+    PromptManager,
+)
+from src.engine.scheduler import ResearchScheduler
+from src.engine.synthesis import MapReduceSynthesizer
+from src.utils.parsers import (
+    PARSE_FAILED,
+    QUESTION_LIST_SCHEMA,
+    Question,
+    apply_section_patch,
+    parse_questions,
+    split_next_level_section,
+)
+from src.utils.profiling import profile_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BranchResult:
+    """Outcome of researching one hierarchical question.
+
+    The dossier and search results are not kept in memory; ``dossier`` and
+    ``sources`` are handles into the orchestrator's segment store.
+    """
+
+    number: str
+    question: str
+    depth: int
+    dossier_path: Path
+    parent: str | None = None
+    dossier: TextHandle | None = None
+    sources: TextHandle | None = None
+
+
+@dataclass(frozen=True)
+class DossierUpdate:
+    """Outcome of patching a saved dossier with new search results.
+
+    ``sections`` are the heading lines of the changed sections; when it is
+    empty the dossier was left as it was and ``version`` is unchanged.
+    """
+
+    number: str
+    version: int
+    sections: list[str]
+    dossier_path: Path
+
+
+def child_number(parent: str, number: str, index: int) -> str:
+    """Hierarchical number for a follow-up question of ``parent``.
+
+    Numbers the dossier proposes are kept when they extend the parent's
+    number ("1.0" -> "1.2", "1.2" -> "1.2.1"); anything else is renumbered
+    as the ``index``-th child of the parent.
+    """
+    stem = parent.removesuffix(".0")
+    if number.startswith(f"{stem}.") and number.count(".") == stem.count(".") + 1:
+        return number
+    return f"{stem}.{index}"
+
+
+def _prior_context(hit: KnowledgeHit) -> str:
+    """A prior dossier, without its follow-ups, as an extra search result."""
+    body, _ = split_next_level_section(hit.dossier)
+    return f"Prior dossier on a similar question ({hit.question}):\n\n{body}"
+
+
+class ResearchOrchestrator:
+    """Drives a research session for one mindmap topic.
+
+    Stage 0 and Stage 1 turn the topic into numbered key questions. Each
+    question is then searched, synthesized into a dossier and mined for
+    next-level questions. Recursion proceeds level by level: the beam
+    planner keeps the best ``beam_width`` candidates of each level and the
+    rest are logged to storage so they can be expanded later.
+
+    Follow-up questions are numbered under their parent, so every branch
+    writes its own dossier even when two dossiers propose the same number.
+
+    Stage 1 asks for a structured (JSON) question list when
+    ``llm.structured_output`` is on; every question list is parsed as JSON
+    first and as markdown otherwise. A list that cannot be parsed either way
+    gets one structured repair call.
+
+    With a knowledge index, each question is first looked up among dossiers
+    of earlier sessions: a near-identical prior question has its dossier
+    reused without searching, and similar ones are passed to synthesis
+    alongside the search results. New dossiers are added to the index.
+
+    With a citation store, synthesis cites sources by interned id and every
+    saved dossier records the sources it cites.
+
+    :meth:`update` refreshes a saved dossier with search results that came
+    in later: the model only sees the new results and returns the changed
+    sections, which replace their counterparts in a new dossier version.
+
+    Search results and dossiers go to a segment file in the output directory
+    as soon as a branch finishes; results only carry handles, and
+    :meth:`load_text` reads a text back under the ``resident_text_mb`` cap.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        client: LLMClient,
+        executor: SearchExecutor,
+        *,
+        scheduler: ResearchScheduler | None = None,
+        storage: ResearchStorage | None = None,
+        prompts: PromptManager | None = None,
+        cache: ResponseCache | None = None,
+        segments: SegmentStore | None = None,
+        knowledge: KnowledgeIndex | None = None,
+        citations: CitationStore | None = None,
+    ) -> None:
+        self.config = config
+        self.client = client
+        self.executor = executor
+        self.scheduler = scheduler or ResearchScheduler.from_config(config.engine)
+        self.storage = storage or ResearchStorage(config.data.output_dir)
+        self.prompts = prompts or PromptManager.from_config(config.data)
+        self.cache = cache
+        self.knowledge = knowledge
+        self.citations = citations
+        self.segments = segments or SegmentStore(
+            Path(config.data.output_dir) / "segments.bin",
+            config.engine.resident_text_mb * 1024 * 1024,
+        )
+        self.synthesizer = MapReduceSynthesizer(
+            client,
+            self.prompts,
+            self.scheduler,
+            cache,
+            config.engine.synthesis_chunk_chars,
+            citations=citations,
+        )
+        self.planner = BeamPlanner(
+            config.engine.beam_width, config.engine.max_recursion_depth
+        )
+        self.results: list[BranchResult] = []
+        self._seen: set[str] = set()
+        self._durations: list[float] = []
+
+    async def run(
+        self, topic: str, strategist: str = DEFAULT_STRATEGIST
+    ) -> list[BranchResult]:
+        """Research a topic from strategy through recursive dossiers."""
+        self.storage.append_journal("session_started", topic=topic)
+        questions = await self.decompose(topic, strategist)
+        self.storage.append_journal("decomposed", topic=topic, questions=len(questions))
+
+        await self.expand([Candidate(q.number, q.text, 1) for q in questions])
+        self.storage.append_journal("session_finished", dossiers=len(self.results))
+        return self.results
+
+    async def decompose(
+        self, topic: str, strategist: str = DEFAULT_STRATEGIST
+    ) -> list[Question]:
+        """Stage 0 strategy and Stage 1 key questions for a topic.
+
+        Both responses are served from the response cache when present, so a
+        topic warmed by ``prewarm`` goes straight to Stage 2.
+        """
+        strategy = await self._generate(
+            self.prompts.strategy_name(strategist), STAGE_STRATEGY, f"Topic: {topic}"
+        )
+        decomposition = await self._generate(
+            STAGE_DECOMPOSITION,
+            STAGE_DECOMPOSITION,
+            strategy,
+            schema=self._schema(),
+        )
+        return await self._questions(STAGE_DECOMPOSITION, decomposition)
+
+    async def expand(self, candidates: list[Candidate]) -> list[BranchResult]:
+        """Research candidates and recurse into their follow-up questions."""
+        level = candidates
+        while level:
+            tasks = [self._spawn_branch(c) for c in level]
+            finished = await self.scheduler.run_until_deadline()
+            profile_snapshot(f"depth-{level[0].depth}")
+            children = [
+                child
+                for task in tasks
+                if task is not None and not task.cancelled() and not task.exception()
+                for child in task.result()
+            ]
+            if not finished or not children:
+                break
+            if children[0].depth > self.config.engine.max_recursion_depth:
+                break
+            kept, pruned = self.planner.select(children)
+            for scored in pruned:
+                self.storage.append_pruned(
+                    number=scored.candidate.number,
+                    question=scored.candidate.question,
+                    depth=scored.candidate.depth,
+                    parent=scored.candidate.parent,
+                    score=round(scored.score, 4),
+                )
+            logger.info(
+                "Expanding %d of %d candidates at depth %d",
+                len(kept),
+                len(children),
+                children[0].depth,
+            )
+            level = [scored.candidate for scored in kept]
+        return self.results
+
+    def _spawn_branch(
+        self, candidate: Candidate
+    ) -> asyncio.Task[list[Candidate]] | None:
+        if candidate.number in self._seen:
+            self.storage.append_journal(
+                "candidate_duplicate",
+                number=candidate.number,
+                question=candidate.question,
+                parent=candidate.parent,
+            )
+            return None
+        self._seen.add(candidate.number)
+        buffer: list[str] = []
+
+        def persist_partial() -> None:
+            if buffer:
+                self.storage.save_partial(candidate.number, "".join(buffer))
+            self.storage.append_journal("branch_cancelled", number=candidate.number)
+
+        task = self.scheduler.spawn(
+            self._research(candidate, buffer),
+            estimate=self._branch_estimate(),
+            on_cancel=persist_partial,
+        )
+        telemetry = self.scheduler.telemetry
+        if task is not None and telemetry is not None:
+            telemetry.queue_changed(candidate.depth, 1)
+            task.add_done_callback(
+                lambda _: telemetry.queue_changed(candidate.depth, -1)
+            )
+        return task
+
+    async def _research(
+        self, candidate: Candidate, buffer: list[str]
+    ) -> list[Candidate]:
+        query = f"{candidate.number} {candidate.question}"
+        started = time.monotonic()
+        try:
+            recall = (
+                self.knowledge.recall(candidate.question)
+                if self.knowledge is not None
+                else Recall()
+            )
+            if recall.reuse is not None:
+                results, dossier = "", recall.reuse.dossier
+                self.storage.append_journal(
+                    "dossier_reused",
+                    number=candidate.number,
+                    source=recall.reuse.source,
+                    similarity=round(recall.reuse.similarity, 4),
+                )
+            else:
+                search_prompt = self.prompts.render(
+                    STAGE_SEARCH, HIERARCHICAL_QUERY=query
+                )
+                results = await self.executor.search(candidate.number, search_prompt)
+                dossier = await self.synthesizer.synthesize(
+                    query,
+                    [results, *(_prior_context(hit) for hit in recall.context)],
+                    sink=buffer.append,
+                )
+        except DeadlineExceededError as e:
+            self.storage.save_partial(candidate.number, e.partial or "".join(buffer))
+            self.storage.append_journal("branch_deadline", number=candidate.number)
+            return []
+        except Exception as e:
+            logger.exception("Branch %s failed", candidate.number)
+            self.storage.append_journal(
+                "branch_failed", number=candidate.number, error=str(e)
+            )
+            return []
+
+        self._durations.append(time.monotonic() - started)
+        path = self.storage.save_dossier(candidate.number, dossier)
+        source = f"{self.storage.output_dir}:{candidate.number}"
+        if self.knowledge is not None and recall.reuse is None:
+            self.knowledge.add(candidate.question, dossier, source)
+        if self.citations is not None:
+            self.citations.add(source, dossier)
+        sources = self.segments.put(results)
+        stored = self.segments.put(dossier)
+        body, next_level = split_next_level_section(dossier)
+        # The proposed follow-ups are scored against what was researched, so
+        # they must not count as covered by the dossier that proposes them.
+        self.planner.observe(f"{candidate.question}\n{body}")
+        self.planner.record_cost(
+            candidate.number, estimate_tokens(results) + estimate_tokens(dossier)
+        )
+        self.results.append(
+            BranchResult(
+                candidate.number,
+                candidate.question,
+                candidate.depth,
+                path,
+                candidate.parent,
+                stored,
+                sources,
+            )
+        )
+        self.storage.append_journal(
+            "dossier_saved", number=candidate.number, question=candidate.question
+        )
+        proposed = await self._questions("next_level", next_level)
+        return [
+            Candidate(
+                child_number(candidate.number, q.number, index),
+                q.text,
+                candidate.depth + 1,
+                candidate.number,
+            )
+            for index, q in enumerate(proposed, 1)
+        ]
+
+    async def update(
+        self, number: str, results: str, question: str | None = None
+    ) -> DossierUpdate:
+        """Patch a saved dossier with new search results.
+
+        The question defaults to the one the session journal recorded for
+        the dossier.
+        """
+        dossier = self.storage.load_dossier(number)
+        if dossier is None:
+            raise ValueError(f"No dossier {number} in {self.storage.output_dir}")
+        if question is None:
+            question = next(
+                (
+                    event.get("question")
+                    for event in self.storage.read_journal()
+                    if event["event"] == "dossier_saved" and event["number"] == number
+                ),
+                None,
+            )
+        query = f"{number} {question}" if question else number
+        patch = await self.synthesizer.update(query, dossier, [results])
+        updated, sections = apply_section_patch(dossier, patch)
+        path = self.storage.dossier_dir / f"{number}.md"
+        if not sections:
+            self.storage.append_journal("dossier_unchanged", number=number)
+            return DossierUpdate(number, self.storage.dossier_version(number), [], path)
+        version = self.storage.update_dossier(number, updated)
+        if self.citations is not None:
+            self.citations.add(f"{self.storage.output_dir}:{number}", updated)
+        self.storage.append_journal(
+            "dossier_updated", number=number, version=version, sections=sections
+        )
+        return DossierUpdate(number, version, sections, path)
+
+    def load_text(self, handle: TextHandle) -> str:
+        """Read a stored dossier or search result back from the segment file."""
+        return self.segments.get(handle)
+
+    def close(self) -> None:
+        """Release the segment file."""
+        self.segments.close()
+
+    def _branch_estimate(self) -> float:
+        # Until a branch has finished, assume it needs at least one LLM call.
+        if not self._durations:
+            return float(self.config.llm.timeout)
+        return sum(self._durations) / len(self._durations)
+
+    def _schema(self) -> dict[str, Any] | None:
+        return QUESTION_LIST_SCHEMA if self.config.llm.structured_output else None
+
+    async def _questions(self, stage: str, text: str) -> list[Question]:
+        """Parse a question list, re-asking once for JSON if parsing fails."""
+        if not text.strip():
+            return []
+        telemetry = self.client.telemetry
+        questions, outcome = parse_questions(text)
+        if telemetry is not None:
+            telemetry.parse_finished(stage, outcome)
+        if outcome != PARSE_FAILED:
+            return questions
+        logger.warning("No questions parsed from %s output; re-asking", stage)
+        if telemetry is not None:
+            telemetry.reask(stage)
+        request = LLMRequest(
+            prompt=text,
+            stage=STAGE_REPAIR,
+            system=REPAIR_SYSTEM,
+            response_schema=QUESTION_LIST_SCHEMA,
+        )
+        try:
+            repaired = await self._call(request)
+        except (LLMError, TimeoutError) as e:
+            logger.warning("Repair of %s output failed: %s", stage, e)
+            return []
+        questions, outcome = parse_questions(repaired)
+        if telemetry is not None:
+            telemetry.parse_finished(STAGE_REPAIR, outcome)
+        return questions
+
+    async def _generate(
+        self,
+        prompt_name: str,
+        stage: str,
+        content: str,
+        schema: dict[str, Any] | None = None,
+    ) -> str:
+        system = self.prompts.render(prompt_name)
+        key = cache_key(
+            self.client.config.model,
+            system,
+            content,
+            json.dumps(schema, sort_keys=True) if schema is not None else "",
+        )
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        request = LLMRequest(
+            prompt=content, stage=stage, system=system, response_schema=schema
+        )
+        text = await self._call(request)
+        if self.cache is not None and text.strip():
+            self.cache.set(key, text)
+        return text
+
+    async def _call(self, request: LLMRequest) -> str:
+        deadline = self.scheduler.deadline
+        response = await self.scheduler.run_llm(
+            lambda: self.client.generate(request, deadline=deadline)
+        )
+        return response.text
@@ -0,0 +1,129 @@
+"""Beam-search planning of recursive research expansion."""
+
+import re
+from dataclasses import dataclass
+
+from src.core.llm_client import estimate_tokens
+from src.utils.profiling import profiled
+
+_WORD_PATTERN = re.compile(r"\w{3,}")
+
+
+def keywords(text: str) -> frozenset[str]:
+    """Lowercased content words used for overlap scoring."""
+    return frozenset(word.lower() for word in _WORD_PATTERN.findall(text))
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """A question proposed for expansion at a given recursion depth."""
+
+    number: str
+    question: str
+    depth: int
+    parent: str | None = None
+
+
+@dataclass(frozen=True)
+class ScoredCandidate:
+    """A candidate with the planner's scoring breakdown."""
+
+    candidate: Candidate
+    score: float
+    novelty: float
+    cost: int
+
+
+class BeamPlanner:
+    """Keeps only the ``beam_width`` most promising candidates per level.
+
+    Candidates are scored by novelty against everything researched so far
+    (share of the question's keywords not yet covered by a dossier), minus
+    penalties for depth and estimated token cost. The cost of a candidate is
+    estimated from the tokens its parent branch actually used, so follow-ups
+    of expensive branches rank lower. Siblings are picked greedily so
+    near-duplicate questions do not fill the beam together.
+    """
+
+    def __init__(
+        self,
+        beam_width: int,
+        max_depth: int,
+        depth_weight: float = 0.3,
+        cost_weight: float = 0.2,
+        expected_output_tokens: int = 2000,
+    ) -> None:
+        if beam_width <= 0:
+            raise ValueError("Beam width must be positive")
+        self.beam_width = beam_width
+        self.max_depth = max_depth
+        self.depth_weight = depth_weight
+        self.cost_weight = cost_weight
+        self.expected_output_tokens = expected_output_tokens
+        self._known: list[frozenset[str]] = []
+        self._branch_tokens: dict[str, int] = {}
+
+    def observe(self, text: str) -> None:
+        """Record researched text (a dossier or question) for novelty scoring."""
+        words = keywords(text)
+        if words:
+            self._known.append(words)
+
+    def record_cost(self, number: str, tokens: int) -> None:
+        """Record the tokens a researched branch consumed."""
+        self._branch_tokens[number] = tokens
+
+    def novelty(
+        self, question: str, extra: list[frozenset[str]] | None = None
+    ) -> float:
+        """Share of the question's keywords not covered by known texts."""
+        words = keywords(question)
+        if not words:
+            return 0.0
+        covered = max(
+            (len(words & known) / len(words) for known in self._known + (extra or [])),
+            default=0.0,
+        )
+        return 1.0 - covered
+
+    def estimate_cost(self, candidate: Candidate) -> int:
+        """Estimated tokens to research a candidate (prompt plus dossier)."""
+        branch = self.expected_output_tokens
+        if candidate.parent is not None:
+            branch = self._branch_tokens.get(candidate.parent, branch)
+        return estimate_tokens(candidate.question) + branch
+
+    def score(
+        self, candidate: Candidate, extra: list[frozenset[str]] | None = None
+    ) -> ScoredCandidate:
+        """Score a candidate; higher is more worth expanding."""
+        novelty = self.novelty(candidate.question, extra)
+        cost = self.estimate_cost(candidate)
+        depth_penalty = self.depth_weight * candidate.depth / self.max_depth
+        cost_penalty = self.cost_weight * cost / (2 * self.expected_output_tokens)
+        return ScoredCandidate(
+            candidate, novelty - depth_penalty - cost_penalty, novelty, cost
+        )
+
+    @profiled("plan")
+    def select(
+        self, candidates: list[Candidate]
+    ) -> tuple[list[ScoredCandidate], list[ScoredCandidate]]:
+        """Split candidates into the kept beam and the pruned remainder."""
+        remaining = list(candidates)
+        picked: list[frozenset[str]] = []
+        kept: list[ScoredCandidate] = []
+        while remaining and len(kept) < self.beam_width:
+            best = max(
+                (self.score(c, picked) for c in remaining), key=lambda s: s.score
+            )
+            kept.append(best)
+            picked.append(keywords(best.candidate.question))
+            remaining.remove(best.candidate)
+
+        pruned = sorted(
+            (self.score(c, picked) for c in remaining),
+            key=lambda s: s.score,
+            reverse=True,
+        )
+        return kept, pruned
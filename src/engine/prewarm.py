@@ -0,0 +1,63 @@
+"""Offline pre-warming of Stage 0/1 responses for mindmap branches."""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+
+from src.core.llm_client import LLMError
+from src.engine.orchestrator import ResearchOrchestrator
+from src.engine.prompts import DEFAULT_STRATEGIST
+
+logger = logging.getLogger(__name__)
+
+PREWARM_LEVELS = (2, 4)
+DEFAULT_PREWARM_CONCURRENCY = 2
+
+
+@dataclass
+class PrewarmReport:
+    """Outcome of a pre-warm run."""
+
+    topics: int = 0
+    questions: int = 0
+    failed: list[str] = field(default_factory=list)
+
+    @property
+    def warmed(self) -> int:
+        """Topics whose strategy and key questions are now cached."""
+        return self.topics - len(self.failed)
+
+
+async def prewarm_topics(
+    orchestrator: ResearchOrchestrator,
+    topics: list[str],
+    *,
+    strategist: str = DEFAULT_STRATEGIST,
+    concurrency: int = DEFAULT_PREWARM_CONCURRENCY,
+) -> PrewarmReport:
+    """Run Stage 0 and Stage 1 for every topic, filling the response cache.
+
+    Topics run ``concurrency`` at a time, so a bulk run leaves most of the
+    provider's rate limit to interactive sessions. Topics already in the
+    cache cost no calls; a failed topic is logged and skipped.
+    """
+    if concurrency <= 0:
+        raise ValueError("Pre-warm concurrency must be positive")
+    if orchestrator.cache is None:
+        raise ValueError("Pre-warming needs a response cache")
+    report = PrewarmReport(topics=len(topics))
+    slots = asyncio.Semaphore(concurrency)
+
+    async def warm(topic: str) -> None:
+        async with slots:
+            try:
+                questions = await orchestrator.decompose(topic, strategist)
+            except (LLMError, TimeoutError) as e:
+                logger.warning("Pre-warming %s failed: %s", topic, e)
+                report.failed.append(topic)
+                return
+        report.questions += len(questions)
+        logger.info("Pre-warmed %s (%d questions)", topic, len(questions))
+
+    await asyncio.gather(*(warm(topic) for topic in topics))
+    return report
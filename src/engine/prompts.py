@@ -0,0 +1,203 @@
+"""Prompt template management for research stages."""
+
+import re
+from pathlib import Path
+
+from src.core.config import DataConfig
+from src.core.llm_client import estimate_tokens
+from src.utils.profiling import profiled
+
+STAGE_STRATEGY = "strategy"
+STAGE_DECOMPOSITION = "decomposition"
+STAGE_DOSSIER = "dossier"
+STAGE_SEARCH = "search"
+STAGE_REPAIR = "repair"
+
+# Built-in system prompt for re-asking when questions could not be parsed.
+REPAIR_SYSTEM = (
+    "Extract every hierarchically numbered research question (such as 1.0, "
+    "1.1 or 1.2.3) from the user's text, keeping numbers and wording as they "
+    "are. Respond only with JSON."
+)
+
+DEFAULT_STRATEGIST = "product"
+
+PROMPT_FILES = {
+    f"{STAGE_STRATEGY}:product": "0 - en Digital Product & Workflow Analyst.md",
+    f"{STAGE_STRATEGY}:market": "0 - Market Intelligence Catalyst (industries and markets).md",
+    f"{STAGE_STRATEGY}:domain": "0 - Professional Domain Analyst.md",
+    STAGE_DECOMPOSITION: "1 - Hierarchical Query Decomposer.md",
+    STAGE_DOSSIER: "2 - Targeted Research Dossier Engine.md",
+    STAGE_SEARCH: "3 - Perplexity Research Dossier Engine.md",
+}
+
+VARIANT_FULL = "full"
+VARIANT_COMPACT = "compact"
+VARIANT_MINIMAL = "minimal"
+PROMPT_VARIANTS = (VARIANT_FULL, VARIANT_COMPACT, VARIANT_MINIMAL)
+
+# Variant sent for each stage, by profile. Stages not listed get the full
+# prompt. Stage 1 keeps its examples in every profile: they define the
+# numbering the question parser relies on.
+PROMPT_PROFILES: dict[str, dict[str, str]] = {
+    VARIANT_FULL: {},
+    VARIANT_COMPACT: {
+        STAGE_STRATEGY: VARIANT_COMPACT,
+        STAGE_DECOMPOSITION: VARIANT_COMPACT,
+        STAGE_DOSSIER: VARIANT_COMPACT,
+        STAGE_SEARCH: VARIANT_COMPACT,
+    },
+    VARIANT_MINIMAL: {
+        STAGE_STRATEGY: VARIANT_MINIMAL,
+        STAGE_DECOMPOSITION: VARIANT_COMPACT,
+        STAGE_DOSSIER: VARIANT_MINIMAL,
+        STAGE_SEARCH: VARIANT_MINIMAL,
+    },
+}
+
+_FENCE = "```"
+_RULE_PATTERN = re.compile(r"-{3,}|\*{3,}")
+# Bold markers, except the opening one of the Perplexity query slot.
+_BOLD_PATTERN = re.compile(r"(?<!\[)\*\*")
+_SPACES_PATTERN = re.compile(r"(?<=\S) {2,}")
+_EXAMPLE_LINE_PATTERN = re.compile(r"[-*\d.\s]*[*_(]*(?:example|пример)", re.IGNORECASE)
+_EXAMPLES_BLOCK_PATTERN = re.compile(r"<Examples>.*?</Examples>\s*", re.DOTALL)
+# Lines shorter than this (tags, headings, list stubs) are never deduplicated.
+_MIN_DEDUP_CHARS = 40
+_XML_VAR_PATTERN = re.compile(r'<var n="(?P<name>\w+)" v="[^"]*"\s*/>')
+_BRACE_VAR_PATTERN = re.compile(r"\{(?P<name>[A-Z_]+)\}")
+# The Perplexity prompt marks its query slot in Russian ("insert here").
+_SEARCH_QUERY_SLOT = "СЮДА ВСТАВЬТЕ"  # noqa: RUF001
+_SEARCH_QUERY_PATTERN = re.compile(rf"\[\*\*{_SEARCH_QUERY_SLOT}[^\]]*\]")
+
+
+def compact_prompt(text: str, *, strip_examples: bool = False) -> str:
+    """A prompt with the same instructions in fewer tokens.
+
+    Blank lines, horizontal rules and bold markers are dropped, indentation
+    is halved and runs of spaces collapse; a long line repeated verbatim is
+    kept only the first time. Headings, table rows and fenced blocks are
+    left alone, since they spell out the expected output format. With
+    ``strip_examples``, ``<Examples>`` blocks and lines that start with
+    "Example" are removed as well.
+    """
+    if strip_examples:
+        text = _EXAMPLES_BLOCK_PATTERN.sub("", text)
+    lines: list[str] = []
+    seen: set[str] = set()
+    fenced = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith(_FENCE):
+            fenced = not fenced
+        if fenced or stripped.startswith(_FENCE):
+            lines.append(line.rstrip())
+            continue
+        if not stripped or _RULE_PATTERN.fullmatch(stripped):
+            continue
+        if strip_examples and _EXAMPLE_LINE_PATTERN.match(stripped):
+            continue
+        # Headings and table rows are kept exactly, unindented.
+        verbatim = stripped.startswith(("#", "|"))
+        body = (
+            stripped
+            if verbatim
+            else _SPACES_PATTERN.sub(" ", _BOLD_PATTERN.sub("", stripped))
+        )
+        key = body.casefold()
+        if len(key) >= _MIN_DEDUP_CHARS:
+            if key in seen:
+                continue
+            seen.add(key)
+        indent = 0 if verbatim else (len(line) - len(line.lstrip())) // 2
+        lines.append(" " * indent + body)
+    return "\n".join(lines) + "\n"
+
+
+class PromptManager:
+    """Loads the stage prompt library and fills in its variables.
+
+    The prompts use two placeholder styles: ``<var n="NAME" v="..."/>`` in
+    the XML-structured prompts and ``{NAME}`` in the markdown ones. The
+    Perplexity prompt's bracketed query slot is filled from
+    ``HIERARCHICAL_QUERY``.
+
+    Every prompt has a full variant (the file as written), a compact one
+    (see :func:`compact_prompt`) and a minimal one without examples. The
+    ``profile`` picks the variant rendered for each stage; derived variants
+    are computed once and cached alongside the templates.
+    """
+
+    def __init__(self, prompts_dir: str | Path, profile: str = VARIANT_FULL) -> None:
+        if profile not in PROMPT_PROFILES:
+            raise ValueError(f"Unknown prompt profile: {profile}")
+        self.prompts_dir = Path(prompts_dir)
+        self.profile = profile
+        self._templates: dict[str, str] = {}
+        self._variants: dict[tuple[str, str], str] = {}
+
+    @classmethod
+    def from_config(cls, config: DataConfig) -> "PromptManager":
+        """Prompt library and profile from the data settings."""
+        return cls(config.prompts_dir, config.prompt_profile)
+
+    def template(self, name: str, variant: str = VARIANT_FULL) -> str:
+        """Return a stage template, loading or deriving it on first use."""
+        if variant != VARIANT_FULL:
+            key = (name, variant)
+            if key not in self._variants:
+                if variant not in PROMPT_VARIANTS:
+                    raise ValueError(f"Unknown prompt variant: {variant}")
+                self._variants[key] = compact_prompt(
+                    self.template(name), strip_examples=variant == VARIANT_MINIMAL
+                )
+            return self._variants[key]
+        if name not in self._templates:
+            filename = PROMPT_FILES.get(name)
+            if filename is None:
+                raise ValueError(f"Unknown prompt: {name}")
+            path = self.prompts_dir / filename
+            if not path.exists():
+                raise ValueError(f"Prompt file not found: {path}")
+            self._templates[name] = path.read_text(encoding="utf-8")
+        return self._templates[name]
+
+    def variant(self, name: str) -> str:
+        """Variant of a prompt that the profile sends."""
+        stage = name.partition(":")[0]
+        return PROMPT_PROFILES[self.profile].get(stage, VARIANT_FULL)
+
+    def token_count(self, name: str, variant: str = VARIANT_FULL) -> int:
+        """Estimated input tokens of a prompt variant, before substitution."""
+        return estimate_tokens(self.template(name, variant))
+
+    def preload(self) -> None:
+        """Load every template up front (for long-running processes)."""
+        for name in PROMPT_FILES:
+            self.template(name, self.variant(name))
+
+    @profiled("prompt_render")
+    def render(self, name: str, **variables: str) -> str:
+        """Render a stage template, in the profile's variant, with variables."""
+        text = self.template(name, self.variant(name))
+
+        def xml_var(match: re.Match[str]) -> str:
+            var = match.group("name")
+            if var not in variables:
+                return match.group(0)
+            value = variables[var].replace('"', "'")
+            return f'<var n="{var}" v="{value}" />'
+
+        def brace_var(match: re.Match[str]) -> str:
+            return variables.get(match.group("name"), match.group(0))
+
+        text = _XML_VAR_PATTERN.sub(xml_var, text)
+        if "HIERARCHICAL_QUERY" in variables:
+            query = variables["HIERARCHICAL_QUERY"]
+            text = _SEARCH_QUERY_PATTERN.sub(lambda _: query, text)
+        return _BRACE_VAR_PATTERN.sub(brace_var, text)
+
+    @staticmethod
+    def strategy_name(strategist: str = DEFAULT_STRATEGIST) -> str:
+        """Prompt name for a Stage 0 strategist persona."""
+        return f"{STAGE_STRATEGY}:{strategist}"
@@ -0,0 +1,406 @@
+"""Task scheduling for research sessions."""
+
+import asyncio
+import contextlib
+import itertools
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Coroutine
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from src.core.config import EngineConfig, LLMConfig
+from src.core.deadline import Deadline, DeadlineExceededError
+from src.core.telemetry import Telemetry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_PROVIDER_CONCURRENCY = 8
+
+
+@dataclass
+class _SessionState:
+    name: str
+    weight: float
+    quota: int | None
+    order: int
+    vtime: float = 0.0
+    in_flight: int = 0
+    waiters: deque[asyncio.Future[None]] = field(default_factory=deque)
+
+    def can_run(self) -> bool:
+        return self.quota is None or self.in_flight < self.quota
+
+
+class ProviderPool:
+    """Concurrency (and optional request rate) budget of one provider.
+
+    Slots are granted by weighted fair queuing: every grant advances the
+    session's virtual time by ``1 / weight`` and a freed slot goes to the
+    waiting session with the lowest virtual time, so a session with weight 2
+    gets twice the calls of a session with weight 1 while both are busy.
+    A session's ``quota`` caps the slots it may hold at once. Sessions that
+    were idle rejoin at the current virtual time instead of cashing in
+    credit, so a long-idle session cannot starve the others either.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        concurrency: int,
+        requests_per_minute: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if concurrency <= 0:
+            raise ValueError("Provider concurrency must be positive")
+        if requests_per_minute is not None and requests_per_minute <= 0:
+            raise ValueError("Requests per minute must be positive")
+        self.provider = provider
+        self.concurrency = concurrency
+        self.requests_per_minute = requests_per_minute
+        self.clock = clock
+        self.in_flight = 0
+        self._sessions: dict[str, _SessionState] = {}
+        self._order = itertools.count()
+        self._vclock = 0.0
+        self._next_start = 0.0
+
+    def register(
+        self, name: str, weight: float = 1.0, quota: int | None = None
+    ) -> None:
+        """Add a session that will draw slots from this pool."""
+        if weight <= 0:
+            raise ValueError("Session weight must be positive")
+        if quota is not None and quota <= 0:
+            raise ValueError("Session quota must be positive")
+        if name in self._sessions:
+            raise ValueError(f"Session already registered: {name}")
+        self._sessions[name] = _SessionState(
+            name, weight, quota, next(self._order), self._vclock
+        )
+
+    def unregister(self, name: str) -> None:
+        """Remove a session; its queued waiters are cancelled."""
+        state = self._sessions.pop(name, None)
+        if state is not None:
+            for waiter in state.waiters:
+                waiter.cancel()
+
+    @property
+    def sessions(self) -> list[str]:
+        """Names of the registered sessions."""
+        return list(self._sessions)
+
+    def waiting(self, name: str) -> int:
+        """Number of calls of a session queued for a slot."""
+        return len(self._sessions[name].waiters)
+
+    async def acquire(self, name: str) -> None:
+        """Wait for a slot on behalf of a session."""
+        state = self._sessions[name]
+        if not state.in_flight and not state.waiters:
+            state.vtime = max(state.vtime, self._vclock)
+        if self.in_flight < self.concurrency and state.can_run() and not state.waiters:
+            self._grant(state)
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            state.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self.release(name)
+                else:
+                    with contextlib.suppress(ValueError):
+                        state.waiters.remove(waiter)
+                raise
+        delay = self._reserve_start()
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.release(name)
+                raise
+
+    def release(self, name: str) -> None:
+        """Return a slot and hand it to the next session in fair order."""
+        self.in_flight -= 1
+        state = self._sessions.get(name)
+        if state is not None:
+            state.in_flight -= 1
+        self._dispatch()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, name: str) -> AsyncIterator[None]:
+        """Hold one slot for the duration of the block."""
+        await self.acquire(name)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    def _grant(self, state: _SessionState) -> None:
+        state.in_flight += 1
+        self.in_flight += 1
+        self._vclock = state.vtime
+        state.vtime += 1.0 / state.weight
+
+    def _dispatch(self) -> None:
+        while self.in_flight < self.concurrency:
+            ready = [s for s in self._sessions.values() if s.waiters and s.can_run()]
+            if not ready:
+                return
+            state = min(ready, key=lambda s: (s.vtime, s.order))
+            waiter = state.waiters.popleft()
+            if waiter.done():
+                continue
+            self._grant(state)
+            waiter.set_result(None)
+
+    def _reserve_start(self) -> float:
+        # Spread call starts evenly to stay under the provider's rate limit.
+        if self.requests_per_minute is None:
+            return 0.0
+        now = self.clock()
+        start = max(now, self._next_start)
+        self._next_start = start + 60.0 / self.requests_per_minute
+        return start - now
+
+
+class SessionShare:
+    """One session's handle on a shared :class:`ProviderPool`."""
+
+    def __init__(self, pool: ProviderPool, name: str) -> None:
+        self.pool = pool
+        self.name = name
+
+    def slot(self) -> contextlib.AbstractAsyncContextManager[None]:
+        """Hold one of the provider's slots for the duration of the block."""
+        return self.pool.slot(self.name)
+
+    def close(self) -> None:
+        """Leave the pool."""
+        self.pool.unregister(self.name)
+
+
+class FairShareScheduler:
+    """Process-wide LLM budgets shared fairly by concurrent sessions.
+
+    Each provider gets one :class:`ProviderPool`; sessions join the pool of
+    the provider they use with a weight (priority) and a quota, and their
+    :class:`ResearchScheduler` then draws slots from it instead of from its
+    own semaphore.
+    """
+
+    def __init__(
+        self,
+        concurrency: dict[str, int] | None = None,
+        requests_per_minute: dict[str, int] | None = None,
+        default_concurrency: int = DEFAULT_PROVIDER_CONCURRENCY,
+    ) -> None:
+        self.concurrency = dict(concurrency or {})
+        self.requests_per_minute = dict(requests_per_minute or {})
+        self.default_concurrency = default_concurrency
+        self.pools: dict[str, ProviderPool] = {}
+
+    @classmethod
+    def from_config(cls, config: LLMConfig) -> "FairShareScheduler":
+        """Scheduler using the configured provider's limits."""
+        rates = {}
+        if config.requests_per_minute is not None:
+            rates[config.provider] = config.requests_per_minute
+        return cls({config.provider: config.max_concurrent}, rates)
+
+    def pool(self, provider: str) -> ProviderPool:
+        """The pool of a provider, created on first use."""
+        pool = self.pools.get(provider)
+        if pool is None:
+            pool = ProviderPool(
+                provider,
+                self.concurrency.get(provider, self.default_concurrency),
+                self.requests_per_minute.get(provider),
+            )
+            self.pools[provider] = pool
+        return pool
+
+    def session(
+        self,
+        name: str,
+        provider: str,
+        *,
+        weight: float = 1.0,
+        quota: int | None = None,
+    ) -> SessionShare:
+        """Register a session with a provider's pool."""
+        pool = self.pool(provider)
+        pool.register(name, weight, quota)
+        return SessionShare(pool, name)
+
+
+class ResearchScheduler:
+    """Runs LLM-bound work under the concurrent query limit.
+
+    Work that waits on a human (manual searches) is parked as a future instead
+    of holding a slot, so automated branches keep running in the meantime.
+    When a session deadline is given, work that cannot finish in time is
+    skipped and whatever is still running at the deadline is cancelled.
+
+    Given a ``share`` of a :class:`FairShareScheduler`, LLM calls take their
+    slots from the shared provider pool instead of the local semaphore.
+    """
+
+    def __init__(
+        self,
+        concurrent_queries: int,
+        deadline: Deadline | None = None,
+        telemetry: Telemetry | None = None,
+        share: SessionShare | None = None,
+    ) -> None:
+        if concurrent_queries <= 0:
+            raise ValueError("Concurrent queries must be positive")
+        self.concurrent_queries = concurrent_queries
+        self.deadline = deadline
+        self.telemetry = telemetry
+        self.share = share
+        self.skipped = 0
+        self._slots = asyncio.Semaphore(concurrent_queries)
+        self._parked: dict[str, asyncio.Future[str]] = {}
+        self._tasks: set[asyncio.Task[Any]] = set()
+        self.in_flight = 0
+
+    @classmethod
+    def from_config(
+        cls,
+        config: EngineConfig,
+        telemetry: Telemetry | None = None,
+        share: SessionShare | None = None,
+    ) -> "ResearchScheduler":
+        """Scheduler for one session, bounded by the configured session timeout."""
+        return cls(
+            config.concurrent_queries, Deadline.from_config(config), telemetry, share
+        )
+
+    async def run_llm(self, fn: Callable[[], Awaitable[T]], estimate: float = 0.0) -> T:
+        """Run an LLM-bound callable once a concurrency slot is free."""
+        self._check_deadline(estimate)
+        waited = time.monotonic()
+        slot = self.share.slot() if self.share is not None else self._slots
+        async with slot:
+            if self.telemetry is not None:
+                self.telemetry.record_wait("slots", time.monotonic() - waited)
+            self._check_deadline(estimate)
+            self.in_flight += 1
+            try:
+                return await fn()
+            finally:
+                self.in_flight -= 1
+
+    def spawn(
+        self,
+        coro: Coroutine[Any, Any, T],
+        *,
+        estimate: float = 0.0,
+        on_cancel: Callable[[], None] | None = None,
+    ) -> "asyncio.Task[T] | None":
+        """Start a branch task and track it until completion.
+
+        Returns None without starting the branch when it is not expected to
+        finish before the deadline. ``on_cancel`` runs if the task is cancelled,
+        so the caller can persist partial output.
+        """
+        if self.deadline is not None and not self.deadline.can_finish(estimate):
+            coro.close()
+            self.skipped += 1
+            if self.telemetry is not None:
+                self.telemetry.branch_skipped()
+            logger.info("Skipping branch that cannot finish before the deadline")
+            return None
+
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if on_cancel is not None:
+            task.add_done_callback(lambda t: on_cancel() if t.cancelled() else None)
+        return task
+
+    def park(self, key: str) -> "asyncio.Future[str]":
+        """Return the future a manual task waits on, creating it if needed."""
+        future = self._parked.get(key)
+        if future is None or future.done():
+            future = asyncio.get_running_loop().create_future()
+            self._parked[key] = future
+            future.add_done_callback(lambda f: self._unpark(key, f))
+        return future
+
+    def _unpark(self, key: str, future: "asyncio.Future[str]") -> None:
+        # Cancelled waiters must not keep their key listed as pending.
+        if self._parked.get(key) is future:
+            del self._parked[key]
+
+    def resolve(self, key: str, result: str) -> bool:
+        """Deliver a manual result to a parked future."""
+        future = self._parked.pop(key, None)
+        if future is None or future.done():
+            return False
+        future.set_result(result)
+        return True
+
+    @property
+    def parked(self) -> list[str]:
+        """Keys of manual tasks still awaiting an answer."""
+        return list(self._parked)
+
+    @property
+    def pending_tasks(self) -> int:
+        """Number of spawned branch tasks that have not finished."""
+        return len(self._running())
+
+    def _running(self) -> set[asyncio.Task[Any]]:
+        # Done callbacks run on a later loop iteration, so drop finished tasks
+        # here rather than waiting on them again.
+        self._tasks.difference_update([t for t in self._tasks if t.done()])
+        return set(self._tasks)
+
+    async def join(self) -> None:
+        """Wait until every spawned task, including newly spawned ones, is done."""
+        while running := self._running():
+            await asyncio.wait(running)
+
+    async def run_until_deadline(self) -> bool:
+        """Join all tasks, cancelling those still running at the deadline.
+
+        Returns True when every task finished on its own.
+        """
+        if self.deadline is None:
+            await self.join()
+            return True
+
+        while running := self._running():
+            remaining = self.deadline.remaining()
+            if remaining <= 0:
+                break
+            await asyncio.wait(running, timeout=remaining)
+        if not self._running():
+            return True
+
+        logger.warning(
+            "Session deadline reached; cancelling %d tasks", len(self._tasks)
+        )
+        self.cancel_all()
+        await self.join()
+        return False
+
+    def cancel_all(self) -> None:
+        """Cancel every running task and any parked manual work."""
+        for task in list(self._tasks):
+            task.cancel()
+        for future in self._parked.values():
+            future.cancel()
+        self._parked.clear()
+
+    def _check_deadline(self, estimate: float) -> None:
+        if self.deadline is not None and not self.deadline.can_finish(estimate):
+            raise DeadlineExceededError("Not enough session time left for this call")
@@ -0,0 +1,436 @@
+"""Long-running research daemon: a job queue behind a small local HTTP API."""
+
+import asyncio
+import contextlib
+import json
+import logging
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any
+
+from src.core.budget import OutputBudget
+from src.core.config import Config, LLMConfig
+from src.core.llm_client import LLMClient
+from src.core.metrics import CONTENT_TYPE, MetricsRegistry
+from src.core.telemetry import Telemetry
+from src.data.cache import ResponseCache
+from src.data.citations import CitationStore
+from src.data.storage import ResearchStorage, StorageWriter
+from src.engine.execution import create_search_executor
+from src.engine.knowledge import KnowledgeIndex
+from src.engine.orchestrator import BranchResult, ResearchOrchestrator
+from src.engine.prompts import DEFAULT_STRATEGIST, PromptManager
+from src.engine.scheduler import FairShareScheduler, ResearchScheduler
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATES = frozenset({"finished", "failed", "cancelled"})
+DEFAULT_MAX_JOBS = 2
+DEFAULT_PORT = 8765
+STREAM_POLL_INTERVAL = 0.2
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+@dataclass
+class ResearchJob:
+    """One submitted research session and its progress."""
+
+    id: str
+    topic: str
+    strategist: str
+    output_dir: Path
+    provider: str
+    model: str
+    priority: float = 1.0
+    state: str = "queued"
+    created: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    dossiers: int = 0
+    error: str | None = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has reached a final state."""
+        return self.state in FINAL_STATES
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-serializable view of the job."""
+        return {
+            "id": self.id,
+            "topic": self.topic,
+            "strategist": self.strategist,
+            "output_dir": str(self.output_dir),
+            "provider": self.provider,
+            "model": self.model,
+            "priority": self.priority,
+            "state": self.state,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "dossiers": self.dossiers,
+            "error": self.error,
+        }
+
+
+class ResearchService:
+    """Runs submitted research jobs with shared, already-warm resources.
+
+    The provider client (and its connection pool), the prompt library, the
+    response cache, the knowledge index, the citation store and the metrics
+    registry are created once and shared by every job. Each job gets its own
+    scheduler and writes into ``<output_dir>/jobs/<id>``; at most
+    ``max_jobs`` run at a time and the rest wait in submission order.
+
+    Running jobs share each provider's call budget through a
+    :class:`FairShareScheduler`: a job's priority is its weight and its
+    ``concurrent_queries`` its quota. Jobs may use another provider or model
+    than the configured one when a ``client_factory`` is given; clients are
+    created once per provider and model.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        client: LLMClient,
+        *,
+        max_jobs: int = DEFAULT_MAX_JOBS,
+        prompts: PromptManager | None = None,
+        metrics: MetricsRegistry | None = None,
+        fair: FairShareScheduler | None = None,
+        client_factory: Callable[[LLMConfig], LLMClient] | None = None,
+    ) -> None:
+        if max_jobs <= 0:
+            raise ValueError("Max jobs must be positive")
+        self.config = config
+        self.client = client
+        self.max_jobs = max_jobs
+        self.prompts = prompts or PromptManager.from_config(config.data)
+        self.metrics = metrics or MetricsRegistry()
+        self.telemetry = Telemetry(metrics=self.metrics)
+        client.telemetry = self.telemetry
+        self.budget = (
+            OutputBudget.from_config(config) if config.llm.adaptive_max_tokens else None
+        )
+        client.budget = self.budget
+        self.writer = StorageWriter.from_config(config, self.metrics)
+        self.cache = ResponseCache(config.data.cache_dir, self.metrics, self.writer)
+        self.knowledge = (
+            KnowledgeIndex.from_config(config, self.metrics)
+            if config.engine.knowledge_cache
+            else None
+        )
+        self.citations = (
+            CitationStore.from_config(config) if config.engine.citation_store else None
+        )
+        self.fair = fair or FairShareScheduler.from_config(config.llm)
+        self.client_factory = client_factory
+        self._clients = {(config.llm.provider, config.llm.model): client}
+        self.jobs_dir = Path(config.data.output_dir) / "jobs"
+        self.jobs: dict[str, ResearchJob] = {}
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._slots = asyncio.Semaphore(max_jobs)
+
+    def submit(
+        self,
+        topic: str,
+        strategist: str = DEFAULT_STRATEGIST,
+        *,
+        priority: float = 1.0,
+        provider: str | None = None,
+        model: str | None = None,
+    ) -> ResearchJob:
+        """Queue a research job; it starts when a slot is free."""
+        if not topic.strip():
+            raise ValueError("Topic must not be empty")
+        if priority <= 0:
+            raise ValueError("Priority must be positive")
+        self.prompts.template(PromptManager.strategy_name(strategist))
+        llm = replace(
+            self.config.llm,
+            provider=provider or self.config.llm.provider,
+            model=model or self.config.llm.model,
+        )
+        self._client(llm)
+        job_id = uuid.uuid4().hex[:12]
+        job = ResearchJob(
+            job_id,
+            topic,
+            strategist,
+            self.jobs_dir / job_id,
+            llm.provider,
+            llm.model,
+            priority,
+        )
+        self.jobs[job_id] = job
+        self._tasks[job_id] = asyncio.create_task(self._run(job))
+        logger.info("Queued job %s: %s", job_id, topic)
+        return job
+
+    def get(self, job_id: str) -> ResearchJob | None:
+        """Look up a job by id."""
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id: str) -> ResearchJob:
+        """Wait for a job to reach a final state."""
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._tasks[job_id]
+        return self.jobs[job_id]
+
+    async def stream(self, job_id: str) -> AsyncIterator[dict[str, Any]]:
+        """Yield a job's journal events as they are written, until it ends."""
+        job = self.jobs[job_id]
+        journal = job.output_dir / "journal.jsonl"
+        offset = 0
+        while True:
+            done = job.done
+            if journal.exists():
+                with journal.open("rb") as f:
+                    f.seek(offset)
+                    data = f.read()
+                # Only consume complete lines; a partial line is re-read later.
+                complete = data[: data.rfind(b"\n") + 1]
+                offset += len(complete)
+                for line in complete.decode("utf-8").splitlines():
+                    if line.strip():
+                        yield json.loads(line)
+            if done:
+                yield {"event": "job_" + job.state, **job.to_dict()}
+                return
+            await asyncio.sleep(STREAM_POLL_INTERVAL)
+
+    async def close(self) -> None:
+        """Cancel running and queued jobs."""
+        for task in self._tasks.values():
+            task.cancel()
+        for task in self._tasks.values():
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        if self.knowledge is not None:
+            self.knowledge.close()
+        if self.citations is not None:
+            self.citations.close()
+        if self.budget is not None:
+            self.budget.save()
+        await asyncio.to_thread(self.writer.close)
+
+    async def _run(self, job: ResearchJob) -> None:
+        try:
+            async with self._slots:
+                job.state = "running"
+                job.started = time.time()
+                results = await self._research(job)
+            job.dossiers = len(results)
+            job.state = "finished"
+        except asyncio.CancelledError:
+            job.state = "cancelled"
+            raise
+        except Exception as e:
+            logger.exception("Job %s failed", job.id)
+            job.state = "failed"
+            job.error = str(e)
+        finally:
+            job.finished = time.time()
+
+    def _client(self, llm: LLMConfig) -> LLMClient:
+        client = self._clients.get((llm.provider, llm.model))
+        if client is None:
+            if self.client_factory is None:
+                raise ValueError(f"No client for {llm.provider}/{llm.model}")
+            client = self.client_factory(llm)
+            client.telemetry = self.telemetry
+            client.budget = self.budget
+            self._clients[llm.provider, llm.model] = client
+        return client
+
+    async def _research(self, job: ResearchJob) -> list[BranchResult]:
+        config = self.config.override(
+            llm={"provider": job.provider, "model": job.model},
+            data={
+                "output_dir": str(job.output_dir),
+                "inbox_dir": str(job.output_dir / "inbox"),
+            },
+        )
+        client = self._client(config.llm)
+        share = self.fair.session(
+            job.id,
+            job.provider,
+            weight=job.priority,
+            quota=config.engine.concurrent_queries,
+        )
+        scheduler = ResearchScheduler.from_config(config.engine, self.telemetry, share)
+        executor, inbox = create_search_executor(config, client, scheduler)
+        watcher = asyncio.create_task(inbox.watch()) if inbox is not None else None
+        orchestrator = ResearchOrchestrator(
+            config,
+            client,
+            executor,
+            scheduler=scheduler,
+            storage=ResearchStorage(job.output_dir, self.metrics, self.writer),
+            prompts=self.prompts,
+            cache=self.cache,
+            knowledge=self.knowledge,
+            citations=self.citations,
+        )
+        try:
+            return await orchestrator.run(job.topic, job.strategist)
+        finally:
+            orchestrator.close()
+            share.close()
+            # A job is only reported done once its files are on disk.
+            await asyncio.to_thread(self.writer.flush)
+            if self.budget is not None:
+                self.budget.save()
+            if watcher is not None:
+                watcher.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await watcher
+
+
+class ServiceAPI:
+    """HTTP/1.1 front end of a :class:`ResearchService`.
+
+    Routes: ``POST /jobs`` (JSON with ``topic`` and optional ``strategist``,
+    ``priority``, ``provider`` and ``model``),
+    ``GET /jobs``, ``GET /jobs/<id>``, ``GET /jobs/<id>/stream`` (NDJSON
+    journal events until the job ends) and ``GET /metrics``. Responses close
+    the connection. Listens on a Unix socket or a localhost port.
+    """
+
+    def __init__(self, service: ResearchService) -> None:
+        self.service = service
+
+    async def serve_unix(self, path: str | Path) -> asyncio.Server:
+        """Listen on a Unix domain socket."""
+        socket_path = Path(path)
+        socket_path.unlink(missing_ok=True)
+        server = await asyncio.start_unix_server(self.handle, socket_path)
+        logger.info("Serving research jobs on unix:%s", socket_path)
+        return server
+
+    async def serve_tcp(self, port: int, host: str = "127.0.0.1") -> asyncio.Server:
+        """Listen on a TCP port (localhost by default)."""
+        server = await asyncio.start_server(self.handle, host, port)
+        logger.info("Serving research jobs on http://%s:%d", host, port)
+        return server
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve one request on a connection."""
+        try:
+            method, path, body = await self._read_request(reader)
+            await self._route(writer, method, path, body)
+        except (TypeError, ValueError) as e:
+            self._respond(writer, "400 Bad Request", {"error": str(e)})
+        except ConnectionError:
+            return
+        finally:
+            with contextlib.suppress(ConnectionError):
+                await writer.drain()
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _route(
+        self, writer: asyncio.StreamWriter, method: str, path: str, body: bytes
+    ) -> None:
+        parts = [p for p in path.split("?", maxsplit=1)[0].split("/") if p]
+        match method, parts:
+            case "GET", ["metrics"]:
+                self._write_head(writer, "200 OK", CONTENT_TYPE)
+                writer.write(self.service.metrics.render().encode("utf-8"))
+            case "POST", ["jobs"]:
+                payload = json.loads(body or b"{}")
+                if not isinstance(payload, dict) or not isinstance(
+                    payload.get("topic"), str
+                ):
+                    raise TypeError("Request body must be a JSON object with a topic")
+                job = self.service.submit(
+                    payload["topic"],
+                    payload.get("strategist", DEFAULT_STRATEGIST),
+                    priority=float(payload.get("priority", 1.0)),
+                    provider=payload.get("provider"),
+                    model=payload.get("model"),
+                )
+                self._respond(writer, "202 Accepted", job.to_dict())
+            case "GET", ["jobs"]:
+                jobs = [job.to_dict() for job in self.service.jobs.values()]
+                self._respond(writer, "200 OK", {"jobs": jobs})
+            case "GET", ["jobs", job_id] if job_id in self.service.jobs:
+                self._respond(writer, "200 OK", self.service.jobs[job_id].to_dict())
+            case "GET", ["jobs", job_id, "stream"] if job_id in self.service.jobs:
+                self._write_head(writer, "200 OK", NDJSON_CONTENT_TYPE)
+                async for event in self.service.stream(job_id):
+                    line = json.dumps(event, ensure_ascii=False) + "\n"
+                    writer.write(line.encode("utf-8"))
+                    await writer.drain()
+            case _:
+                self._respond(writer, "404 Not Found", {"error": "not found"})
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> tuple[str, str, bytes]:
+        try:
+            method, target, _ = (await reader.readline()).decode("latin-1").split()
+        except ValueError as e:
+            raise ValueError("Malformed request line") from e
+        length = 0
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value.strip())
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, body
+
+    @staticmethod
+    def _write_head(
+        writer: asyncio.StreamWriter, status: str, content_type: str
+    ) -> None:
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            "Connection: close\r\n\r\n".encode()
+        )
+
+    @staticmethod
+    def _respond(writer: asyncio.StreamWriter, status: str, payload: Any) -> None:
+        body = (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+            + body
+        )
+
+
+async def run_service(
+    service: ResearchService,
+    *,
+    socket_path: str | Path | None = None,
+    port: int = DEFAULT_PORT,
+    host: str = "127.0.0.1",
+) -> None:
+    """Serve the job API until cancelled, then cancel outstanding jobs.
+
+    The provider connection is warmed up while the listener starts.
+    """
+    warm_up = (
+        asyncio.create_task(service.client.warm_up())
+        if service.config.llm.warm_up
+        else None
+    )
+    api = ServiceAPI(service)
+    if socket_path is not None:
+        server = await api.serve_unix(socket_path)
+    else:
+        server = await api.serve_tcp(port, host)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if warm_up is not None:
+            warm_up.cancel()
+        await service.close()
+        if socket_path is not None:
+            Path(socket_path).unlink(missing_ok=True)
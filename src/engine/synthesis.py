@@ -0,0 +1,204 @@
+"""Dossier synthesis (Stage 2/3 LLM side) over search results."""
+
+import asyncio
+import logging
+
+from src.core.llm_client import ChunkSink, LLMClient, LLMRequest
+from src.data.cache import ResponseCache, cache_key
+from src.data.citations import CitationStore
+from src.engine.prompts import STAGE_DOSSIER, PromptManager
+from src.engine.scheduler import ResearchScheduler
+from src.utils.parsers import next_level_end
+from src.utils.profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+STAGE_DOSSIER_MAP = f"{STAGE_DOSSIER}_map"
+STAGE_DOSSIER_UPDATE = f"{STAGE_DOSSIER}_update"
+
+MAP_INSTRUCTIONS = (
+    "You are condensing search results for a research dossier. Extract every "
+    "fact, figure, definition and stakeholder view relevant to the research "
+    "question below. Keep each source citation (URL or title) next to the fact "
+    "it supports. Output a terse bullet list; no introduction or conclusion."
+)
+
+UPDATE_INSTRUCTIONS = (
+    "You are updating a research dossier with new search findings. Output "
+    "only the sections whose content the findings change or extend, each in "
+    "full and starting with its heading line exactly as in the dossier. Add a "
+    "section under a new heading only for findings no section covers. Keep "
+    "each source citation next to the fact it supports. If nothing changes, "
+    "output NO CHANGES."
+)
+
+SOURCES_HEADING = "Sources (cite them by their [S<id>] reference):"
+
+
+@profiled("chunk")
+def chunk_results(results: list[str], chunk_chars: int) -> list[str]:
+    """Pack search results, in order, into chunks of at most ``chunk_chars``.
+
+    Results are split on paragraph boundaries and packed greedily, so
+    appending new results only changes the trailing chunks and earlier chunk
+    summaries stay valid in the cache.
+    """
+    if chunk_chars <= 0:
+        raise ValueError("Chunk size must be positive")
+
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for result in results:
+        for raw_paragraph in result.split("\n\n"):
+            paragraph = raw_paragraph.strip()
+            if not paragraph:
+                continue
+            pieces = [
+                paragraph[i : i + chunk_chars]
+                for i in range(0, len(paragraph), chunk_chars)
+            ]
+            for piece in pieces:
+                if current and size + len(piece) + 2 > chunk_chars:
+                    chunks.append("\n\n".join(current))
+                    current, size = [], 0
+                current.append(piece)
+                size += len(piece) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+class MapReduceSynthesizer:
+    """Builds dossiers from search results too large for a single prompt.
+
+    Result chunks are summarized in parallel under the scheduler's
+    concurrency limit (map), then the summaries are written up following the
+    Targeted Research Dossier Engine structure (reduce). Chunk summaries are
+    cached, so re-synthesis after new results only summarizes new chunks.
+
+    With a citation store the reduce prompt cites sources by ``[S<id>]``
+    reference and lists each URL once; references in the dossier are turned
+    back into links.
+    """
+
+    def __init__(
+        self,
+        client: LLMClient,
+        prompts: PromptManager,
+        scheduler: ResearchScheduler,
+        cache: ResponseCache | None = None,
+        chunk_chars: int = 12000,
+        *,
+        citations: CitationStore | None = None,
+    ) -> None:
+        self.client = client
+        self.prompts = prompts
+        self.scheduler = scheduler
+        self.cache = cache
+        self.chunk_chars = chunk_chars
+        self.citations = citations
+
+    async def synthesize(
+        self,
+        query: str,
+        results: list[str],
+        sink: ChunkSink | None = None,
+        **variables: str,
+    ) -> str:
+        """Write the dossier for a hierarchical query from its search results.
+
+        ``sink`` receives the streamed dossier text as it is generated.
+        """
+        findings = await self._condense(query, results)
+        system = self.prompts.render(
+            STAGE_DOSSIER, HIERARCHICAL_QUERY=query, **variables
+        )
+        request = LLMRequest(
+            prompt=self._with_sources(f"Search findings:\n\n{findings}"),
+            stage=STAGE_DOSSIER,
+            system=system,
+            complete_at=next_level_end,
+        )
+        return self._expand(await self._call(request, sink))
+
+    async def update(
+        self,
+        query: str,
+        dossier: str,
+        results: list[str],
+        sink: ChunkSink | None = None,
+    ) -> str:
+        """Sections of an existing dossier rewritten for new search results.
+
+        Only the new results are condensed and sent with the dossier, and
+        the model answers with the changed sections alone, for
+        :func:`~src.utils.parsers.apply_section_patch` to apply.
+        """
+        findings = await self._condense(query, results)
+        request = LLMRequest(
+            prompt=self._with_sources(
+                f"Research question: {query}\n\nCurrent dossier:\n\n{dossier}"
+                f"\n\nNew search findings:\n\n{findings}"
+            ),
+            stage=STAGE_DOSSIER_UPDATE,
+            system=UPDATE_INSTRUCTIONS,
+        )
+        return self._expand(await self._call(request, sink))
+
+    async def _condense(self, query: str, results: list[str]) -> str:
+        """Map-reduce results until they fit one chunk."""
+        findings = chunk_results(results, self.chunk_chars)
+        while len(findings) > 1:
+            logger.info("Summarizing %d result chunks for %s", len(findings), query)
+            summaries = await asyncio.gather(
+                *(self._summarize(query, chunk) for chunk in findings)
+            )
+            reduced = chunk_results(summaries, self.chunk_chars)
+            if len(reduced) >= len(findings):
+                # Summaries are not shrinking; trim each one to an equal share
+                # of a single chunk so the reduce prompt stays bounded.
+                logger.warning(
+                    "Chunk summaries for %s are not shrinking; truncating %d "
+                    "summaries to fit one chunk",
+                    query,
+                    len(summaries),
+                )
+                share = max(self.chunk_chars // len(summaries) - 2, 1)
+                return "\n\n".join(summary[:share] for summary in summaries)
+            findings = reduced
+        return findings[0] if findings else ""
+
+    def _with_sources(self, prompt: str) -> str:
+        """Cite sources in a prompt by reference, listing their URLs once."""
+        if self.citations is None:
+            return prompt
+        compacted, legend = self.citations.compact(prompt)
+        return f"{compacted}\n\n{SOURCES_HEADING}\n{legend}" if legend else compacted
+
+    def _expand(self, text: str) -> str:
+        return self.citations.expand(text) if self.citations is not None else text
+
+    async def _summarize(self, query: str, chunk: str) -> str:
+        key = cache_key(self.client.config.model, MAP_INSTRUCTIONS, query, chunk)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        request = LLMRequest(
+            prompt=f"Research question: {query}\n\nSearch results:\n\n{chunk}",
+            stage=STAGE_DOSSIER_MAP,
+            system=MAP_INSTRUCTIONS,
+        )
+        summary = await self._call(request)
+        if self.cache is not None:
+            self.cache.set(key, summary)
+        return summary
+
+    async def _call(self, request: LLMRequest, sink: ChunkSink | None = None) -> str:
+        deadline = self.scheduler.deadline
+        response = await self.scheduler.run_llm(
+            lambda: self.client.generate(request, deadline=deadline, sink=sink)
+        )
+        return response.text
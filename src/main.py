@@ -0,0 +1,634 @@
+"""Command line interface for AI Researcher."""
+
+import asyncio
+import contextlib
+import logging
+from dataclasses import replace
+from typing import TextIO
+
+import click
+from rich.console import Console
+
+from src.core.budget import OutputBudget
+from src.core.cassette import REPLAY_LATENCIES, RecordingLLMClient, ReplayLLMClient
+from src.core.config import Config, ConfigManager
+from src.core.llm_client import LLMClient, create_llm_client
+from src.core.metrics import MetricsRegistry
+from src.core.telemetry import Telemetry
+from src.data.cache import ResponseCache
+from src.data.citations import CitationStore
+from src.data.coverage import COVERAGE_STAGES
+from src.data.kb_loader import load_mindmap, nodes_at_levels
+from src.data.storage import ResearchStorage, StorageWriter
+from src.engine.execution import LLMSearchExecutor, create_search_executor
+from src.engine.incremental import (
+    load_coverage,
+    mark_prewarmed,
+    plan_mindmap,
+    rebuild_coverage,
+    research_mindmap,
+)
+from src.engine.knowledge import KnowledgeIndex
+from src.engine.orchestrator import BranchResult, DossierUpdate, ResearchOrchestrator
+from src.engine.prewarm import (
+    DEFAULT_PREWARM_CONCURRENCY,
+    PREWARM_LEVELS,
+    PrewarmReport,
+    prewarm_topics,
+)
+from src.engine.prompts import (
+    DEFAULT_STRATEGIST,
+    PROMPT_FILES,
+    PROMPT_PROFILES,
+    PROMPT_VARIANTS,
+    VARIANT_FULL,
+    PromptManager,
+)
+from src.engine.scheduler import ResearchScheduler
+from src.engine.service import (
+    DEFAULT_MAX_JOBS,
+    DEFAULT_PORT,
+    ResearchService,
+    run_service,
+)
+from src.ui.dashboard import SessionDashboard
+from src.utils.profiling import PROFILE_MODES, StageProfiler
+
+STRATEGISTS = ("product", "market", "domain")
+METRICS_TEXTFILE_INTERVAL = 15.0
+
+
+async def write_metrics_textfile(
+    metrics: MetricsRegistry, path: str, interval: float = METRICS_TEXTFILE_INTERVAL
+) -> None:
+    """Rewrite the node_exporter textfile periodically until cancelled."""
+    while True:
+        await asyncio.to_thread(metrics.write_textfile, path)
+        await asyncio.sleep(interval)
+
+
+async def cancel_tasks(tasks: list[asyncio.Task[None]]) -> None:
+    """Cancel background tasks and wait until they have stopped."""
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+def close_stores(*stores: KnowledgeIndex | CitationStore | None) -> None:
+    """Close the SQLite stores a session opened."""
+    for store in stores:
+        if store is not None:
+            store.close()
+
+
+async def run_session(
+    config: Config,
+    client: LLMClient,
+    topic: str,
+    *,
+    strategist: str = DEFAULT_STRATEGIST,
+    dashboard: bool = False,
+    profile: str | None = None,
+    console: Console | None = None,
+) -> list[BranchResult]:
+    """Run one research session with its background helpers.
+
+    The provider connection is warmed up while the rest of the session is
+    set up, so the first Stage 0 call does not pay for connection setup.
+    """
+    warm_up = asyncio.create_task(client.warm_up()) if config.llm.warm_up else None
+    profiler = None
+    if profile is not None:
+        profiler = StageProfiler(profile, config.data.output_dir)
+        profiler.start()
+    metrics = MetricsRegistry()
+    telemetry = Telemetry(metrics=metrics)
+    client.telemetry = telemetry
+    # Learned limits would change the requests a cassette records or matches.
+    budget = (
+        OutputBudget.from_config(config)
+        if config.llm.adaptive_max_tokens
+        and not isinstance(client, RecordingLLMClient | ReplayLLMClient)
+        else None
+    )
+    client.budget = budget
+    scheduler = ResearchScheduler.from_config(config.engine, telemetry)
+    # Dossier, journal and cache writes leave the event loop for this thread.
+    writer = StorageWriter.from_config(config, metrics)
+    cache = ResponseCache(config.data.cache_dir, metrics, writer)
+    storage = ResearchStorage(config.data.output_dir, metrics, writer)
+    background: list[asyncio.Task[None]] = []
+    server = None
+    if config.engine.metrics_port is not None:
+        server = await metrics.serve_http(config.engine.metrics_port)
+    if config.data.metrics_textfile:
+        background.append(
+            asyncio.create_task(
+                write_metrics_textfile(metrics, config.data.metrics_textfile)
+            )
+        )
+
+    executor, inbox = create_search_executor(config, client, scheduler)
+    if inbox is not None:
+        background.append(asyncio.create_task(inbox.watch()))
+
+    if dashboard:
+        view = SessionDashboard(telemetry, scheduler, cache, console=console)
+        background.append(asyncio.create_task(view.run()))
+
+    knowledge = (
+        KnowledgeIndex.from_config(config, metrics)
+        if config.engine.knowledge_cache
+        else None
+    )
+    citations = (
+        CitationStore.from_config(config) if config.engine.citation_store else None
+    )
+    prompts = PromptManager.from_config(config.data)
+    await asyncio.to_thread(prompts.preload)
+    orchestrator = ResearchOrchestrator(
+        config,
+        client,
+        executor,
+        scheduler=scheduler,
+        storage=storage,
+        prompts=prompts,
+        cache=cache,
+        knowledge=knowledge,
+        citations=citations,
+    )
+    if warm_up is not None:
+        await warm_up
+    try:
+        return await orchestrator.run(topic, strategist)
+    finally:
+        orchestrator.close()
+        await asyncio.to_thread(writer.close)
+        close_stores(knowledge, citations)
+        if budget is not None:
+            budget.save()
+        await cancel_tasks(background)
+        if config.data.metrics_textfile:
+            metrics.write_textfile(config.data.metrics_textfile)
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+        if profiler is not None:
+            profiler.stop()
+
+
+async def run_prewarm(
+    config: Config,
+    client: LLMClient,
+    topics: list[str],
+    *,
+    strategist: str = DEFAULT_STRATEGIST,
+    concurrency: int = DEFAULT_PREWARM_CONCURRENCY,
+) -> PrewarmReport:
+    """Cache Stage 0/1 responses for topics under a low concurrency limit."""
+    scheduler = ResearchScheduler(concurrency)
+    writer = StorageWriter.from_config(config)
+    # Pre-warming stops before Stage 2, so the executor is never called.
+    orchestrator = ResearchOrchestrator(
+        config,
+        client,
+        LLMSearchExecutor(client, scheduler),
+        scheduler=scheduler,
+        cache=ResponseCache(config.data.cache_dir, writer=writer),
+    )
+    try:
+        return await prewarm_topics(
+            orchestrator, topics, strategist=strategist, concurrency=concurrency
+        )
+    finally:
+        orchestrator.close()
+        await asyncio.to_thread(writer.close)
+
+
+async def run_update(
+    config: Config,
+    client: LLMClient,
+    number: str,
+    results: str,
+    question: str | None = None,
+) -> DossierUpdate:
+    """Patch a saved dossier of the output directory with new search results."""
+    scheduler = ResearchScheduler.from_config(config.engine)
+    writer = StorageWriter.from_config(config)
+    citations = (
+        CitationStore.from_config(config) if config.engine.citation_store else None
+    )
+    # The new results are given, so the executor is never called.
+    orchestrator = ResearchOrchestrator(
+        config,
+        client,
+        LLMSearchExecutor(client, scheduler),
+        scheduler=scheduler,
+        storage=ResearchStorage(config.data.output_dir, writer=writer),
+        cache=ResponseCache(config.data.cache_dir, writer=writer),
+        citations=citations,
+    )
+    try:
+        return await orchestrator.update(number, results, question)
+    finally:
+        orchestrator.close()
+        await asyncio.to_thread(writer.close)
+        close_stores(citations)
+
+
+def build_client(
+    manager: ConfigManager,
+    record: str | None = None,
+    replay: str | None = None,
+    replay_latency: str = "recorded",
+) -> LLMClient:
+    """Provider client for the session, optionally recording or replaying."""
+    client: LLMClient
+    if replay is not None:
+        client = ReplayLLMClient(replay, replay_latency)
+    else:
+        client = create_llm_client(manager.get_llm_config())
+    if record is not None:
+        client = RecordingLLMClient(client, record)
+    return client
+
+
+@click.group()
+@click.option(
+    "--config",
+    "config_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Path to the YAML configuration file.",
+)
+@click.pass_context
+def main(ctx: click.Context, config_path: str | None) -> None:
+    """AI Researcher: recursive research dossiers from a mindmap topic."""
+    manager = ConfigManager(config_path)
+    logging.basicConfig(level=manager.config.log_level)
+    ctx.obj = manager
+
+
+@main.command()
+@click.argument("topic")
+@click.option(
+    "--strategist",
+    type=click.Choice(STRATEGISTS),
+    default=DEFAULT_STRATEGIST,
+    show_default=True,
+    help="Stage 0 strategist persona.",
+)
+@click.option("--dashboard", is_flag=True, help="Show a live progress dashboard.")
+@click.option(
+    "--metrics-port",
+    type=click.IntRange(1, 65535),
+    default=None,
+    help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics.",
+)
+@click.option(
+    "--metrics-textfile",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Write Prometheus metrics to a node_exporter textfile.",
+)
+@click.option(
+    "--profile",
+    type=click.Choice(PROFILE_MODES),
+    default=None,
+    help="Write per-stage CPU or memory profiles to OUTPUT_DIR/profiles.",
+)
+@click.option(
+    "--record",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Record all LLM traffic to a cassette file (.jsonl or .jsonl.gz).",
+)
+@click.option(
+    "--replay",
+    type=click.Path(dir_okay=False, exists=True),
+    default=None,
+    help="Serve LLM responses from a recorded cassette instead of a provider.",
+)
+@click.option(
+    "--replay-latency",
+    type=click.Choice(REPLAY_LATENCIES),
+    default="recorded",
+    show_default=True,
+    help="Replay chunks at their recorded timing or immediately.",
+)
+@click.pass_obj
+def run(  # noqa: PLR0917
+    manager: ConfigManager,
+    topic: str,
+    strategist: str,
+    dashboard: bool,
+    metrics_port: int | None,
+    metrics_textfile: str | None,
+    profile: str | None,
+    record: str | None,
+    replay: str | None,
+    replay_latency: str,
+) -> None:
+    """Research TOPIC from strategy down to recursive dossiers."""
+    if metrics_port is not None:
+        manager.apply_overrides(engine={"metrics_port": metrics_port})
+    if metrics_textfile is not None:
+        manager.apply_overrides(data={"metrics_textfile": metrics_textfile})
+    manager.ensure_directories()
+    client = build_client(manager, record, replay, replay_latency)
+    try:
+        results = asyncio.run(
+            run_session(
+                manager.config,
+                client,
+                topic,
+                strategist=strategist,
+                dashboard=dashboard,
+                profile=profile,
+            )
+        )
+    finally:
+        if isinstance(client, RecordingLLMClient):
+            client.close()
+    click.echo(f"Saved {len(results)} dossiers to {manager.config.data.output_dir}")
+
+
+@main.command()
+@click.option(
+    "--mindmap",
+    type=click.Path(dir_okay=False, exists=True),
+    default=None,
+    help="Mindmap CSV to walk (defaults to data.mindmap_csv_path).",
+)
+@click.option(
+    "--strategist",
+    type=click.Choice(STRATEGISTS),
+    default=DEFAULT_STRATEGIST,
+    show_default=True,
+    help="Stage 0 strategist persona.",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=DEFAULT_PREWARM_CONCURRENCY,
+    show_default=True,
+    help="Topics warmed at the same time.",
+)
+@click.pass_obj
+def prewarm(
+    manager: ConfigManager, mindmap: str | None, strategist: str, concurrency: int
+) -> None:
+    """Cache Stage 0/1 for every Level 2-4 mindmap branch ahead of sessions."""
+    nodes = load_mindmap(mindmap or manager.config.data.mindmap_csv_path)
+    manager.ensure_directories()
+    client = build_client(manager)
+    report = asyncio.run(
+        run_prewarm(
+            manager.config,
+            client,
+            [node.topic for node in nodes_at_levels(nodes, *PREWARM_LEVELS)],
+            strategist=strategist,
+            concurrency=concurrency,
+        )
+    )
+    mark_prewarmed(manager.config, nodes, report.failed)
+    click.echo(
+        f"Pre-warmed {report.warmed} of {report.topics} topics "
+        f"({report.questions} key questions)"
+    )
+    if report.failed:
+        raise click.ClickException(
+            f"{len(report.failed)} topics failed; run prewarm again to retry them"
+        )
+
+
+@main.command()
+@click.option(
+    "--mindmap",
+    "mindmap_path",
+    type=click.Path(dir_okay=False, exists=True),
+    default=None,
+    help="Mindmap CSV to research (defaults to data.mindmap_csv_path).",
+)
+@click.option(
+    "--strategist",
+    type=click.Choice(STRATEGISTS),
+    default=DEFAULT_STRATEGIST,
+    show_default=True,
+    help="Stage 0 strategist persona.",
+)
+@click.option(
+    "--dry-run", is_flag=True, help="Only show what changed since the last run."
+)
+@click.pass_obj
+def mindmap(
+    manager: ConfigManager, mindmap_path: str | None, strategist: str, dry_run: bool
+) -> None:
+    """Research every Level 2-4 node, redoing only what changed since last run."""
+    nodes = load_mindmap(mindmap_path or manager.config.data.mindmap_csv_path)
+    _, _, diff = plan_mindmap(manager.config, nodes)
+    click.echo(
+        f"{len(diff.added)} added, {len(diff.removed)} removed, "
+        f"{len(diff.changed)} changed, {len(diff.unchanged)} unchanged"
+    )
+    if dry_run:
+        return
+    manager.ensure_directories()
+    client = build_client(manager)
+    outcome = asyncio.run(
+        research_mindmap(
+            manager.config,
+            nodes,
+            lambda config, topic: run_session(
+                config, client, topic, strategist=strategist
+            ),
+        )
+    )
+    click.echo(f"Researched {len(outcome.researched)} topics")
+    if outcome.failed:
+        raise click.ClickException(
+            f"{len(outcome.failed)} topics failed; run mindmap again to retry them"
+        )
+
+
+@main.command()
+@click.option(
+    "--mindmap",
+    "mindmap_path",
+    type=click.Path(dir_okay=False, exists=True),
+    default=None,
+    help="Mindmap CSV to report on (defaults to data.mindmap_csv_path).",
+)
+@click.option(
+    "--stage",
+    type=click.Choice(list(COVERAGE_STAGES)),
+    default="dossier",
+    show_default=True,
+    help="Research stage to report.",
+)
+@click.option(
+    "--level",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="Mindmap level to report per node.",
+)
+@click.option(
+    "--missing", is_flag=True, help="List the nodes of the level lacking the stage."
+)
+@click.option(
+    "--rebuild", is_flag=True, help="Rebuild the index from the node journals first."
+)
+@click.pass_obj
+def status(  # noqa: PLR0917
+    manager: ConfigManager,
+    mindmap_path: str | None,
+    stage: str,
+    level: int,
+    missing: bool,
+    rebuild: bool,
+) -> None:
+    """Show mindmap research progress from the coverage index."""
+    nodes = load_mindmap(mindmap_path or manager.config.data.mindmap_csv_path)
+    coverage = (rebuild_coverage if rebuild else load_coverage)(manager.config, nodes)
+    flag = COVERAGE_STAGES[stage]
+    if missing:
+        lacking = coverage.missing(flag, level)
+        for node in lacking:
+            click.echo(node.topic)
+        click.echo(f"{len(lacking)} Level {level} nodes lack stage {stage}")
+        return
+    for branch in coverage.progress(flag, level, tracked=PREWARM_LEVELS):
+        click.echo(
+            f"{branch.fraction:>5.0%} {branch.done:>7}/{branch.total:<7} "
+            f"{branch.node.topic}"
+        )
+
+
+@main.command()
+@click.argument("number")
+@click.argument("results", type=click.File(encoding="utf-8"))
+@click.option(
+    "--question",
+    default=None,
+    help="Question of the dossier (defaults to the one in the session journal).",
+)
+@click.pass_obj
+def update(
+    manager: ConfigManager, number: str, results: TextIO, question: str | None
+) -> None:
+    """Patch dossier NUMBER with new search RESULTS (a file, or - for stdin)."""
+    client = build_client(manager)
+    try:
+        outcome = asyncio.run(
+            run_update(manager.config, client, number, results.read(), question)
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+    if not outcome.sections:
+        click.echo(f"Dossier {number} is unchanged (version {outcome.version})")
+        return
+    click.echo(
+        f"Updated dossier {number} to version {outcome.version}: "
+        + ", ".join(outcome.sections)
+    )
+
+
+@main.command("cited-by")
+@click.argument("url")
+@click.pass_obj
+def cited_by(manager: ConfigManager, url: str) -> None:
+    """List the dossiers citing a source URL."""
+    citations = CitationStore.from_config(manager.config)
+    try:
+        dossiers = citations.cited_by(url)
+    finally:
+        citations.close()
+    for dossier in dossiers:
+        click.echo(dossier)
+    click.echo(f"{len(dossiers)} dossiers cite {url}")
+
+
+@main.command()
+@click.option(
+    "--profile",
+    type=click.Choice(list(PROMPT_PROFILES)),
+    default=None,
+    help="Prompt profile to mark as sent (defaults to data.prompt_profile).",
+)
+@click.pass_obj
+def prompts(manager: ConfigManager, profile: str | None) -> None:
+    """Show estimated input tokens of every prompt variant."""
+    library = PromptManager(
+        manager.config.data.prompts_dir, profile or manager.config.data.prompt_profile
+    )
+    click.echo(f"{'prompt':<20}" + "".join(f"{v:>10}" for v in PROMPT_VARIANTS))
+    full = sent = 0
+    for name in PROMPT_FILES:
+        chosen = library.variant(name)
+        row = f"{name:<20}"
+        for variant in PROMPT_VARIANTS:
+            count = library.token_count(name, variant)
+            row += f"{count}{'*' if variant == chosen else ''}".rjust(10)
+        click.echo(row)
+        full += library.token_count(name, VARIANT_FULL)
+        sent += library.token_count(name, chosen)
+    click.echo(
+        f"Profile {library.profile} sends {sent} of {full} tokens "
+        f"({1 - sent / full:.0%} saved); * marks the variant sent"
+    )
+
+
+@main.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Listen on a Unix domain socket instead of a TCP port.",
+)
+@click.option("--host", default="127.0.0.1", show_default=True, help="TCP host.")
+@click.option(
+    "--port",
+    type=click.IntRange(1, 65535),
+    default=DEFAULT_PORT,
+    show_default=True,
+    help="TCP port.",
+)
+@click.option(
+    "--max-jobs",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MAX_JOBS,
+    show_default=True,
+    help="Research jobs run at the same time; the rest are queued.",
+)
+@click.pass_obj
+def serve(
+    manager: ConfigManager,
+    socket_path: str | None,
+    host: str,
+    port: int,
+    max_jobs: int,
+) -> None:
+    """Run a daemon that accepts research jobs over a local HTTP API."""
+    manager.ensure_directories()
+    client = build_client(manager)
+    prompts = PromptManager.from_config(manager.config.data)
+    prompts.preload()
+    service = ResearchService(
+        manager.config,
+        client,
+        max_jobs=max_jobs,
+        prompts=prompts,
+        client_factory=lambda llm: create_llm_client(
+            replace(llm, api_key=manager.get_api_key(llm.provider))
+        ),
+    )
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(run_service(service, socket_path=socket_path, port=port, host=host))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""User interface module for AI Researcher."""
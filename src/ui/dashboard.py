@@ -0,0 +1,99 @@
+"""Live terminal dashboard for a running research session."""
+
+import asyncio
+
+from rich.console import Console, Group
+from rich.live import Live
+from rich.table import Table
+
+from src.core.telemetry import Telemetry
+from src.data.cache import ResponseCache
+from src.engine.scheduler import ResearchScheduler
+
+DEFAULT_REFRESH_INTERVAL = 0.5
+
+
+class SessionDashboard:
+    """Renders session telemetry with rich, refreshed from its own task.
+
+    The dashboard only reads :class:`Telemetry` snapshots on a fixed
+    interval, so the research tasks never wait on terminal output.
+    """
+
+    def __init__(
+        self,
+        telemetry: Telemetry,
+        scheduler: ResearchScheduler,
+        cache: ResponseCache | None = None,
+        refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+        console: Console | None = None,
+    ) -> None:
+        if refresh_interval <= 0:
+            raise ValueError("Refresh interval must be positive")
+        self.telemetry = telemetry
+        self.scheduler = scheduler
+        self.cache = cache
+        self.refresh_interval = refresh_interval
+        self.console = console or Console()
+
+    def render(self) -> Group:
+        """Build the dashboard from the current telemetry snapshot."""
+        snap = self.telemetry.snapshot()
+        limit = self.scheduler.concurrent_queries
+
+        overview = Table(title="Session", show_header=False)
+        overview.add_column("Metric")
+        overview.add_column("Value", justify="right")
+        in_flight = ", ".join(
+            f"{provider} {count}/{limit}"
+            for provider, count in sorted(snap.in_flight.items())
+        )
+        overview.add_row("In flight", in_flight or f"0/{limit}")
+        overview.add_row("Tokens/s in", f"{snap.tokens_in_per_sec:.1f}")
+        overview.add_row("Tokens/s out", f"{snap.tokens_out_per_sec:.1f}")
+        for kind, seconds in sorted(snap.waits.items()):
+            overview.add_row(f"Wait: {kind}", f"{seconds:.1f}s")
+        if snap.errors:
+            overview.add_row("Errors", str(sum(snap.errors.values())))
+        if snap.parses:
+            overview.add_row("Parse failures", f"{snap.parse_failure_rate:.0%}")
+            overview.add_row("Re-asks", str(snap.reasks))
+        if self.cache is not None:
+            overview.add_row("Cache hit rate", f"{self.cache.hit_rate:.0%}")
+        deadline = self.scheduler.deadline
+        if deadline is not None:
+            overview.add_row("Deadline in", f"{deadline.remaining():.0f}s")
+        overview.add_row("Skipped branches", str(self.scheduler.skipped))
+
+        queue = Table(title="Queue by depth")
+        queue.add_column("Depth", justify="right")
+        queue.add_column("Branches", justify="right")
+        for depth, count in snap.queue_by_depth.items():
+            queue.add_row(str(depth), str(count))
+        queue.add_row("manual", str(len(self.scheduler.parked)))
+
+        latency = Table(title="Latency by stage")
+        latency.add_column("Stage")
+        latency.add_column("Calls", justify="right")
+        latency.add_column("p50", justify="right")
+        latency.add_column("p95", justify="right")
+        latency.add_column("TTFT p50", justify="right")
+        for stage, stats in snap.latency.items():
+            latency.add_row(
+                stage,
+                str(stats.calls),
+                f"{stats.p50:.2f}s",
+                f"{stats.p95:.2f}s",
+                f"{stats.ttft_p50:.2f}s",
+            )
+
+        return Group(overview, queue, latency)
+
+    async def run(self) -> None:
+        """Refresh the dashboard until the task is cancelled."""
+        with Live(
+            self.render(), console=self.console, auto_refresh=False, transient=False
+        ) as live:
+            while True:
+                await asyncio.sleep(self.refresh_interval)
+                live.update(self.render(), refresh=True)
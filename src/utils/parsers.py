@@ -0,0 +1,322 @@
+"""Parsing of LLM responses (hierarchical questions and cited sources)."""
+
+import re
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from pydantic import BaseModel, ValidationError
+
+from src.utils.profiling import profiled
+
+PARSE_STRUCTURED = "structured"
+PARSE_MARKDOWN = "markdown"
+PARSE_FAILED = "failed"
+
+_NUMBER_PATTERN = re.compile(r"^\d+(?:\.\d+)+$")
+_FENCE_PATTERN = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+_QUESTION_PATTERN = re.compile(
+    r"^\s*(?:[-*+]\s+)?(?:\*\*)?\[?(?P<number>\d+(?:\.\d+)+)\.?\]?(?:\*\*)?"
+    r"\s*[:.)\-]?\s+(?P<text>\S.*?)\s*$"
+)
+_HEADING_PATTERN = re.compile(r"^\s*(?P<level>#{1,6})\s+(?P<title>.*)$")
+# A section starts at a markdown heading or an unindented bold label line
+# ("- **Key facts:**", "**Summary**"), as the dossier templates write them.
+_SECTION_PATTERN = re.compile(
+    r"^(?:#{1,6}\s+(?P<heading>\S.*?)\s*$"
+    r"|(?:[-*+]\s+)?\*\*(?P<label>[^*\n]+?)(?::\*\*|\*\*:|\*\*\s*$))"
+)
+# A markdown link to a web page, or a bare URL.
+_CITATION_PATTERN = re.compile(
+    r"\[(?P<title>[^\]\n]+)\]\((?P<link>https?://[^\s)]+)\)"
+    r"|(?P<url>https?://[^\s<>()\[\]\"']+)"
+)
+_URL_TRAILING = ".,;:!?"
+_TRACKING_PREFIX = "utm_"
+_NEXT_LEVEL_PATTERN = re.compile(
+    r"next[- ]level|вопросы следующего уровня", re.IGNORECASE
+)
+_MARKUP_PATTERN = re.compile(r"\*\*|__|`")
+_SOURCES_PATTERN = re.compile(
+    r"sources|references|citations|источники|ссылки", re.IGNORECASE
+)
+
+
+@dataclass(frozen=True)
+class Question:
+    """A hierarchically numbered research question."""
+
+    number: str
+    text: str
+
+    @property
+    def depth(self) -> int:
+        """Hierarchy depth implied by the number ("1.0" -> 1, "1.2.3" -> 3)."""
+        parts = self.number.split(".")
+        if parts[-1] == "0":
+            parts = parts[:-1]
+        return len(parts)
+
+
+@dataclass(frozen=True)
+class Citation:
+    """A source cited in a text: its normalized URL and link title, if any."""
+
+    url: str
+    title: str | None = None
+
+
+class QuestionItem(BaseModel):
+    """One question of a structured response."""
+
+    number: str
+    text: str
+
+
+class QuestionList(BaseModel):
+    """Structured response listing hierarchically numbered questions."""
+
+    questions: list[QuestionItem]
+
+
+QUESTION_LIST_SCHEMA: dict[str, Any] = QuestionList.model_json_schema()
+
+
+@profiled("parse")
+def parse_structured_questions(text: str) -> list[Question] | None:
+    """Questions from a JSON response matching :class:`QuestionList`.
+
+    Returns None when the text is not such a response. Items with a
+    malformed number or an empty question are dropped.
+    """
+    try:
+        parsed = QuestionList.model_validate_json(_FENCE_PATTERN.sub("", text))
+    except ValidationError:
+        return None
+    questions: list[Question] = []
+    seen: set[str] = set()
+    for item in parsed.questions:
+        number = item.number.strip().strip("[]").rstrip(".")
+        question = item.text.strip()
+        if _NUMBER_PATTERN.match(number) and question and number not in seen:
+            seen.add(number)
+            questions.append(Question(number, question))
+    return questions
+
+
+def parse_questions(text: str) -> tuple[list[Question], str]:
+    """Parse questions from a structured response, else from markdown.
+
+    Returns the questions and how they were obtained: ``structured``,
+    ``markdown``, or ``failed`` when neither form yielded any.
+    """
+    structured = parse_structured_questions(text)
+    if structured:
+        return structured, PARSE_STRUCTURED
+    questions = parse_numbered_questions(text)
+    return questions, PARSE_MARKDOWN if questions else PARSE_FAILED
+
+
+@profiled("parse")
+def parse_numbered_questions(text: str) -> list[Question]:
+    """Extract numbered questions such as ``1.0 ...`` or ``**[1.1.2]** ...``."""
+    questions: list[Question] = []
+    seen: set[str] = set()
+    for line in text.splitlines():
+        match = _QUESTION_PATTERN.match(line)
+        if not match:
+            continue
+        number = match.group("number")
+        question = _MARKUP_PATTERN.sub("", match.group("text")).strip()
+        if question and number not in seen:
+            seen.add(number)
+            questions.append(Question(number, question))
+    return questions
+
+
+def split_next_level_section(dossier: str) -> tuple[str, str]:
+    """Split a dossier into its Next-Level Questions section and the rest.
+
+    Returns ``(body, section)`` where ``section`` is the text under the
+    Next-Level heading and ``body`` is everything else, heading excluded.
+    """
+    lines = dossier.splitlines()
+    start = None
+    level = 0
+    for i, line in enumerate(lines):
+        heading = _HEADING_PATTERN.match(line)
+        if start is None:
+            if _NEXT_LEVEL_PATTERN.search(line):
+                start = i
+                level = len(heading.group("level")) if heading else 0
+            continue
+        if heading and level and len(heading.group("level")) <= level:
+            body = lines[:start] + lines[i:]
+            return "\n".join(body), "\n".join(lines[start + 1 : i])
+    if start is None:
+        return dossier, ""
+    return "\n".join(lines[:start]), "\n".join(lines[start + 1 :])
+
+
+def section_key(line: str) -> str | None:
+    """Identity of the section a line starts, or None if it starts none.
+
+    Markup, numbering punctuation and case are ignored, so a heading the
+    model rewrites as ``**Key facts**:`` still matches ``- **Key facts:**``.
+    """
+    match = _SECTION_PATTERN.match(line)
+    if not match:
+        return None
+    title = _MARKUP_PATTERN.sub("", match["heading"] or match["label"])
+    return " ".join(title.strip(" :").split()).casefold()
+
+
+def split_sections(text: str) -> list[tuple[str | None, str]]:
+    """Split markdown into ``(key, text)`` sections, heading line included.
+
+    Text before the first section comes first with a key of None; joining
+    the texts gives back the input.
+    """
+    sections: list[tuple[str | None, str]] = []
+    key: str | None = None
+    lines: list[str] = []
+    for line in text.splitlines(keepends=True):
+        start = section_key(line)
+        if start is not None:
+            if lines:
+                sections.append((key, "".join(lines)))
+            key, lines = start, []
+        lines.append(line)
+    if lines:
+        sections.append((key, "".join(lines)))
+    return sections
+
+
+def apply_section_patch(dossier: str, patch: str) -> tuple[str, list[str]]:
+    """Apply the sections of a patch to a dossier.
+
+    A patch section replaces the dossier section with the same key; other
+    sections are added before the Next-Level Questions (or at the end).
+    Text before the first patch section is ignored. Returns the patched
+    dossier and the heading lines of the sections that changed.
+    """
+    sections = split_sections(dossier)
+    positions = {key: i for i, (key, _) in enumerate(sections) if key is not None}
+    added: list[tuple[str | None, str]] = []
+    changed: list[str] = []
+    for key, text in split_sections(patch):
+        if key is None:
+            continue
+        section = text if text.endswith("\n") else text + "\n"
+        if key in positions:
+            if sections[positions[key]][1].strip() == section.strip():
+                continue
+            sections[positions[key]] = (key, section)
+        else:
+            added.append((key, section))
+        changed.append(text.splitlines()[0].strip())
+    end = next(
+        (
+            i
+            for i, (key, _) in enumerate(sections)
+            if key is not None and _NEXT_LEVEL_PATTERN.search(key)
+        ),
+        len(sections),
+    )
+    if added and end == len(sections) and not sections[-1][1].endswith("\n"):
+        sections[-1] = (sections[-1][0], sections[-1][1] + "\n")
+    sections[end:end] = added
+    return "".join(text for _, text in sections), changed
+
+
+def next_level_end(text: str) -> int | None:
+    """Offset at which a streamed dossier is complete, if it already is.
+
+    The dossier ends with its Next-Level Questions section. Once that
+    section has questions, the next heading of its level or above, or the
+    first other line after a blank one (a closing remark, a rule), ends the
+    dossier at the start of that line. Only complete lines are considered,
+    and a sources section after the questions is never cut off.
+    """
+    offset = 0
+    level: int | None = None
+    questions = blank = False
+    for line in text.splitlines(keepends=True):
+        if not line.endswith("\n"):
+            break
+        start, offset = offset, offset + len(line)
+        heading = _HEADING_PATTERN.match(line)
+        if level is None:
+            if _NEXT_LEVEL_PATTERN.search(line):
+                level = len(heading.group("level")) if heading else 0
+            continue
+        if not line.strip():
+            blank = questions
+        elif _QUESTION_PATTERN.match(line):
+            questions, blank = True, False
+        elif questions and _SOURCES_PATTERN.search(line):
+            return None
+        elif blank or (questions and heading and len(heading.group("level")) <= level):
+            return start
+    return None
+
+
+def extract_next_level_section(dossier: str) -> str:
+    """Return the text of the dossier's Next-Level Questions section."""
+    return split_next_level_section(dossier)[1]
+
+
+def extract_next_level_questions(dossier: str) -> list[Question]:
+    """Extract the follow-up questions proposed at the end of a dossier."""
+    return parse_numbered_questions(extract_next_level_section(dossier))
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL, so that one source is interned once.
+
+    Lowercases the scheme and host, drops ``www.``, tracking (``utm_*``)
+    parameters, the fragment and a trailing slash.
+    """
+    parts = urlsplit(url.rstrip(_URL_TRAILING))
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.startswith(_TRACKING_PREFIX)
+    ]
+    return urlunsplit(
+        (
+            parts.scheme.lower(),
+            parts.netloc.lower().removeprefix("www."),
+            parts.path.rstrip("/"),
+            urlencode(query),
+            "",
+        )
+    )
+
+
+def citation_spans(text: str) -> list[tuple[int, int, Citation]]:
+    """Every markdown link and bare URL in a text, with its position."""
+    spans = []
+    for match in _CITATION_PATTERN.finditer(text):
+        if match["link"] is not None:
+            citation = Citation(normalize_url(match["link"]), match["title"].strip())
+            end = match.end()
+        else:
+            url = match["url"].rstrip(_URL_TRAILING)
+            citation = Citation(normalize_url(url))
+            end = match.start() + len(url)
+        spans.append((match.start(), end, citation))
+    return spans
+
+
+def extract_citations(text: str) -> list[Citation]:
+    """Sources cited in a text, once each, in order of first citation.
+
+    A source linked with a title keeps the first title it was given.
+    """
+    citations: dict[str, Citation] = {}
+    for _, _, citation in citation_spans(text):
+        known = citations.get(citation.url)
+        if known is None or (known.title is None and citation.title is not None):
+            citations[citation.url] = citation
+    return list(citations.values())
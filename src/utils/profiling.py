@@ -0,0 +1,245 @@
+"""Opt-in per-stage CPU and memory profiling of a research session.
+
+Scopes are cheap no-ops unless a :class:`StageProfiler` is active in the
+current context. Scopes must wrap synchronous code (rendering, parsing,
+chunking, storage writes): profiler hooks are process-wide, so a scope that
+awaited would also measure whatever other tasks ran in the meantime. The
+CPU sampler covers the asynchronous parts by tagging each sampled stack with
+the innermost open scope.
+"""
+
+import contextlib
+import cProfile
+import functools
+import logging
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar, Token
+from pathlib import Path
+from types import FrameType
+from typing import ParamSpec, TypeVar
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cpu", "mem")
+DEFAULT_SAMPLE_INTERVAL = 0.005
+TRACEBACK_DEPTH = 25
+TOP_ALLOCATIONS = 25
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+_active: ContextVar["StageProfiler | None"] = ContextVar("profiler", default=None)
+
+
+class StageProfiler:
+    """Collects per-stage profiles and writes them to ``<output_dir>/profiles``.
+
+    In ``cpu`` mode each stage gets its own cProfile (``<stage>.pstats``) and a
+    sampling thread records collapsed stacks (``cpu.collapsed``) for
+    flamegraph tools. In ``mem`` mode tracemalloc tracks net allocations per
+    stage (``memory.txt``) and :meth:`snapshot` writes top-allocation reports.
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        output_dir: str | Path,
+        sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+    ) -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Invalid profile mode: {mode}")
+        self.mode = mode
+        self.profile_dir = Path(output_dir) / "profiles"
+        self.sample_interval = sample_interval
+        self._stack: list[str] = []
+        self._profiles: dict[str, cProfile.Profile] = {}
+        self._wall: defaultdict[str, float] = defaultdict(float)
+        self._calls: Counter[str] = Counter()
+        self._allocated: defaultdict[str, int] = defaultdict(int)
+        self._samples: Counter[str] = Counter()
+        self._sampler: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._thread_id = threading.get_ident()
+        self._token: Token[StageProfiler | None] | None = None
+
+    def start(self) -> None:
+        """Activate the profiler for the current context and start collectors."""
+        self._token = _active.set(self)
+        self._thread_id = threading.get_ident()
+        if self.mode == "mem":
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACEBACK_DEPTH)
+        else:
+            self._stop.clear()
+            self._sampler = threading.Thread(
+                target=self._sample_loop, name="stage-profiler", daemon=True
+            )
+            self._sampler.start()
+
+    def stop(self) -> list[Path]:
+        """Stop collecting and write all reports; return the written paths."""
+        if self._token is not None:
+            _active.reset(self._token)
+            self._token = None
+        written: list[Path] = []
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        if self.mode == "cpu":
+            self._stop.set()
+            if self._sampler is not None:
+                self._sampler.join()
+            written.extend(self._write_cpu())
+        else:
+            written.append(self.snapshot("final"))
+            written.append(self._write_memory_summary())
+            tracemalloc.stop()
+        logger.info("Wrote %d profile files to %s", len(written), self.profile_dir)
+        return written
+
+    @contextlib.contextmanager
+    def scope(self, stage: str) -> Iterator[None]:
+        """Attribute the enclosed synchronous work to ``stage``."""
+        started = time.perf_counter()
+        if self.mode == "cpu":
+            outer = self._profiles[self._stack[-1]] if self._stack else None
+            if outer is not None:
+                outer.disable()
+            profile = self._profiles.setdefault(stage, cProfile.Profile())
+            self._stack.append(stage)
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                self._stack.pop()
+                if outer is not None:
+                    outer.enable()
+                self._record(stage, started)
+        else:
+            before = tracemalloc.get_traced_memory()[0]
+            self._stack.append(stage)
+            try:
+                yield
+            finally:
+                self._stack.pop()
+                self._allocated[stage] += tracemalloc.get_traced_memory()[0] - before
+                self._record(stage, started)
+
+    def snapshot(self, label: str) -> Path:
+        """Write the top live allocations, by line and by file (``mem`` mode)."""
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        path = self.profile_dir / f"{label}.top.txt"
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(
+                    inclusive=False, filename_pattern=tracemalloc.__file__
+                ),
+            )
+        )
+        lines = [f"# Top allocations at {label}", "", "## By line"]
+        lines.extend(str(s) for s in snapshot.statistics("lineno")[:TOP_ALLOCATIONS])
+        lines.extend(["", "## By file"])
+        lines.extend(str(s) for s in snapshot.statistics("filename")[:TOP_ALLOCATIONS])
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+    def _record(self, stage: str, started: float) -> None:
+        self._wall[stage] += time.perf_counter() - started
+        self._calls[stage] += 1
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self.sample_interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            stage = self._stack[-1] if self._stack else "session"
+            self._samples[";".join([stage, *_frame_names(frame)])] += 1
+
+    def _write_cpu(self) -> list[Path]:
+        written = []
+        for stage, profile in self._profiles.items():
+            path = self.profile_dir / f"{_safe(stage)}.pstats"
+            pstats.Stats(profile).dump_stats(path)
+            written.append(path)
+        collapsed = self.profile_dir / "cpu.collapsed"
+        collapsed.write_text(
+            "".join(f"{stack} {count}\n" for stack, count in self._samples.items()),
+            encoding="utf-8",
+        )
+        written.append(collapsed)
+        written.append(self._write_summary("cpu.txt", {}))
+        return written
+
+    def _write_memory_summary(self) -> Path:
+        return self._write_summary("memory.txt", self._allocated)
+
+    def _write_summary(self, name: str, allocated: dict[str, int]) -> Path:
+        path = self.profile_dir / name
+        header = "stage\tcalls\twall_s" + ("\tnet_alloc_bytes" if allocated else "")
+        rows = [header]
+        for stage in sorted(self._calls):
+            row = f"{stage}\t{self._calls[stage]}\t{self._wall[stage]:.6f}"
+            if allocated:
+                row += f"\t{allocated.get(stage, 0)}"
+            rows.append(row)
+        path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+        return path
+
+
+def _frame_names(frame: FrameType | None) -> list[str]:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", Path(code.co_filename).stem)
+        names.append(f"{module}:{code.co_name}")
+        frame = frame.f_back
+    return names[::-1]
+
+
+def _safe(stage: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in stage)
+
+
+def active_profiler() -> StageProfiler | None:
+    """The profiler active in the current context, if any."""
+    return _active.get()
+
+
+@contextlib.contextmanager
+def profile_scope(stage: str) -> Iterator[None]:
+    """Profile the enclosed synchronous block when profiling is on."""
+    profiler = _active.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.scope(stage):
+        yield
+
+
+def profiled(stage: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Decorator form of :func:`profile_scope` for synchronous functions."""
+
+    def decorator(fn: Callable[P, R]) -> Callable[P, R]:
+        @functools.wraps(fn)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            profiler = _active.get()
+            if profiler is None:
+                return fn(*args, **kwargs)
+            with profiler.scope(stage):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def profile_snapshot(label: str) -> None:
+    """Write a top-allocation report if a memory profiler is active."""
+    profiler = _active.get()
+    if profiler is not None and profiler.mode == "mem":
+        profiler.snapshot(label)
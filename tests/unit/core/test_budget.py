@@ -0,0 +1,53 @@
+"""Tests for learned output token budgets."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.core.budget import MIN_MAX_TOKENS, OutputBudget
+
+
+class TestOutputBudget:
+    """Test cases for OutputBudget class."""
+
+    def test_limit_needs_enough_samples(self):
+        """Test that no limit is set while a stage is still being learned."""
+        budget = OutputBudget(min_samples=3)
+        budget.record("dossier", 1000)
+        budget.record("dossier", 1000)
+
+        assert budget.limit("dossier", 8192) is None
+        assert budget.limit("other", 8192) is None
+        budget.record("dossier", 1000)
+        assert budget.limit("dossier", 8192) == 2000
+
+    def test_limit_uses_percentile_within_bounds(self):
+        """Test the percentile with headroom, floor and ceiling."""
+        budget = OutputBudget(percentile=0.9, min_samples=1)
+        for tokens in range(100, 1100, 100):
+            budget.record("dossier", tokens)
+        budget.record("decomposition", 40)
+
+        assert budget.limit("dossier", 8192) == 1800
+        assert budget.limit("dossier", 1000) == 1000
+        assert budget.limit("decomposition", 8192) == MIN_MAX_TOKENS
+
+    def test_samples_persist_across_sessions(self):
+        """Test that saved samples are loaded by the next budget."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "cache" / "lengths.json"
+            first = OutputBudget(path, min_samples=1, max_samples=2)
+            for tokens in (300, 600, 900):
+                first.record("strategy", tokens)
+            first.save()
+
+            second = OutputBudget(path, percentile=0.5, min_samples=2)
+
+            assert second.limit("strategy", 8192) == 1200
+            OutputBudget().save()
+
+    def test_invalid_percentile(self):
+        """Test that the percentile must be a fraction."""
+        with pytest.raises(ValueError, match="Percentile"):
+            OutputBudget(percentile=95)
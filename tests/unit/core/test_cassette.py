@@ -0,0 +1,149 @@
+"""Tests for LLM traffic record and replay."""
+
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from src.core.cassette import RecordingLLMClient, ReplayLLMClient, request_key
+from src.core.config import LLMConfig
+from src.core.llm_client import LLMError, LLMRequest, MockLLMClient, TransientLLMError
+from src.core.retry import RetryPolicy
+
+
+def record(path, requests, client=None):
+    """Record the given requests through a mock client."""
+    recorder = RecordingLLMClient(
+        client
+        or MockLLMClient(responses={"a": "alpha answer", "b": "beta"}, chunk_size=4),
+        path,
+    )
+
+    async def scenario():
+        return [(await recorder.generate(r)).text for r in requests]
+
+    texts = asyncio.run(scenario())
+    recorder.close()
+    return texts
+
+
+class TestCassette:
+    """Test cases for cassette record and replay."""
+
+    @pytest.mark.parametrize("name", ["session.jsonl", "session.jsonl.gz"])
+    def test_replay_reproduces_recorded_session(self, name):
+        """Test that replayed responses match, matched by request content."""
+        requests = [LLMRequest("q1", stage="a"), LLMRequest("q2", stage="b")]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / name
+            recorded = record(path, requests)
+            replay = ReplayLLMClient(path, latency="zero")
+
+            async def scenario():
+                return [(await replay.generate(r)).text for r in reversed(requests)]
+
+            replayed = asyncio.run(scenario())
+
+        assert recorded == ["alpha answer", "beta"]
+        assert replayed == ["beta", "alpha answer"]
+        assert replay.provider == "mock"
+        assert replay.remaining == 0
+
+    def test_identical_requests_replay_in_order(self):
+        """Test that repeated identical requests get successive recordings."""
+        client = MockLLMClient(default="first")
+        request = LLMRequest("same", stage="a")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "c.jsonl"
+            recorder = RecordingLLMClient(client, path)
+
+            async def scenario():
+                await recorder.generate(request)
+                client.default = "second"
+                await recorder.generate(request)
+
+            asyncio.run(scenario())
+            recorder.close()
+            replay = ReplayLLMClient(path, latency="zero")
+
+            async def replay_all():
+                return [(await replay.generate(request)).text for _ in range(2)]
+
+            texts = asyncio.run(replay_all())
+
+            with pytest.raises(LLMError, match="No recorded response"):
+                asyncio.run(replay.generate(request))
+
+        assert texts == ["first", "second"]
+
+    def test_recorded_latency_is_reproduced(self):
+        """Test that recorded timing is replayed unless zero latency is asked."""
+        slow = MockLLMClient(default="abcdef", chunk_size=2, delay=0.03)
+        request = LLMRequest("q", stage="a")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "c.jsonl"
+            record(path, [request], slow)
+
+            def timed(latency):
+                client = ReplayLLMClient(path, latency=latency)
+                start = time.monotonic()
+                asyncio.run(client.generate(request))
+                return time.monotonic() - start
+
+            recorded, zero = timed("recorded"), timed("zero")
+
+        assert recorded >= 0.08
+        assert zero < 0.05
+
+    def test_incomplete_calls_and_bad_files(self):
+        """Test replay of a call cut short, and rejection of non-cassettes."""
+        slow = MockLLMClient(
+            LLMConfig(provider="mock", model="mock", timeout=0.12, max_retries=0),
+            default="x" * 40,
+            chunk_size=4,
+            delay=0.05,
+        )
+        request = LLMRequest("q", stage="a")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "c.jsonl"
+            recorder = RecordingLLMClient(slow, path)
+            with pytest.raises(TimeoutError):
+                asyncio.run(recorder.generate(request))
+            recorder.close()
+            replay = ReplayLLMClient(path, latency="zero")
+            replay.retry = RetryPolicy(max_retries=0)
+            with pytest.raises(TransientLLMError, match="did not complete"):
+                asyncio.run(replay.generate(request))
+
+            bogus = Path(temp_dir) / "bogus.jsonl"
+            bogus.write_text('{"x": 1}\n', encoding="utf-8")
+            with pytest.raises(ValueError, match="Not a cassette"):
+                ReplayLLMClient(bogus)
+            with pytest.raises(ValueError, match="Invalid replay latency"):
+                ReplayLLMClient(path, latency="fast")
+
+    def test_early_stopped_calls_replay(self):
+        """Test that a call ended early is recorded complete and replays."""
+        client = MockLLMClient(default="done\ntrailing text\n", chunk_size=5)
+        request = LLMRequest("q", complete_at=lambda t: 5 if "\n" in t else None)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "session.jsonl"
+            recorded = record(path, [request], client)
+            replay = ReplayLLMClient(path, latency="zero")
+            replayed = asyncio.run(replay.generate(request)).text
+
+        assert recorded == ["done\n"]
+        assert replayed == "done\n"
+
+    def test_request_key_covers_parameters(self):
+        """Test that sampling parameters change the request key."""
+        assert request_key(LLMRequest("q")) != request_key(
+            LLMRequest("q", temperature=0.1)
+        )
@@ -8,7 +8,15 @@ from unittest.mock import patch
 import pytest  # type: ignore[import-not-found]
 import yaml
 
-from src.core.config import Config, ConfigManager, DataConfig, EngineConfig, LLMConfig
+from src.core.config import (
+    Config,
+    ConfigManager,
+    DataConfig,
+    EngineConfig,
+    LLMConfig,
+    config_hash,
+    environment_layer,
+)
 
 
 class TestConfigManager:
@@ -77,6 +85,22 @@ class TestConfigManager:
         finally:
             Path(temp_path).unlink()
 
+    def test_invalid_requests_per_minute(self):
+        """Test validation of the provider rate budget."""
+        config_data = {"llm": {"requests_per_minute": 0}}
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
+            yaml.dump(config_data, f)
+            temp_path = f.name
+
+        try:
+            with pytest.raises(
+                ValueError, match="requests_per_minute must be positive"
+            ):
+                ConfigManager(temp_path)
+        finally:
+            Path(temp_path).unlink()
+
     def test_invalid_temperature_range(self):
         """Test validation of temperature range."""
         config_data = {"llm": {"temperature": 3.0}}
@@ -91,6 +115,53 @@ class TestConfigManager:
         finally:
             Path(temp_path).unlink()
 
+    def test_knowledge_thresholds_out_of_order(self):
+        """Test that the context threshold may not exceed the reuse threshold."""
+        config_data = {
+            "engine": {
+                "knowledge_reuse_threshold": 0.4,
+                "knowledge_context_threshold": 0.6,
+            }
+        }
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
+            yaml.dump(config_data, f)
+            temp_path = f.name
+
+        try:
+            with pytest.raises(ValueError, match="Knowledge thresholds must satisfy"):
+                ConfigManager(temp_path)
+        finally:
+            Path(temp_path).unlink()
+
+    def test_negative_resident_text_cap(self):
+        """Test validation of the resident text cap."""
+        config_data = {"engine": {"resident_text_mb": -1}}
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
+            yaml.dump(config_data, f)
+            temp_path = f.name
+
+        try:
+            with pytest.raises(ValueError, match="Resident text cap must not be"):
+                ConfigManager(temp_path)
+        finally:
+            Path(temp_path).unlink()
+
+    def test_invalid_metrics_port(self):
+        """Test validation of the metrics port range."""
+        config_data = {"engine": {"metrics_port": 70000}}
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
+            yaml.dump(config_data, f)
+            temp_path = f.name
+
+        try:
+            with pytest.raises(ValueError, match="Metrics port must be between"):
+                ConfigManager(temp_path)
+        finally:
+            Path(temp_path).unlink()
+
     def test_invalid_mode(self):
         """Test validation of invalid mode."""
         config_data = {"mode": "invalid_mode"}
@@ -123,6 +194,9 @@ class TestConfigManager:
             assert config_manager.get_api_key("perplexity") is None
             assert config_manager.get_api_key("invalid") is None
 
+        with patch.dict(os.environ, {"GROQ_API_KEY": "test_groq_key"}):
+            assert config_manager.get_api_key("groq") == "test_groq_key"
+
     def test_get_llm_config(self):
         """Test getting LLM configuration."""
         config_manager = ConfigManager()
@@ -140,23 +214,26 @@ class TestConfigManager:
         config_manager = ConfigManager()
 
         with tempfile.TemporaryDirectory() as temp_dir:
-            config_manager.config.data.output_dir = str(Path(temp_dir) / "output")
-            config_manager.config.data.cache_dir = str(Path(temp_dir) / "cache")
-            config_manager.config.data.mindmap_csv_path = str(
-                Path(temp_dir) / "data" / "test.csv"
+            config_manager.apply_overrides(
+                data={
+                    "output_dir": str(Path(temp_dir) / "output"),
+                    "cache_dir": str(Path(temp_dir) / "cache"),
+                    "inbox_dir": str(Path(temp_dir) / "inbox"),
+                    "mindmap_csv_path": str(Path(temp_dir) / "data" / "test.csv"),
+                }
             )
 
             config_manager.ensure_directories()
 
             assert Path(config_manager.config.data.output_dir).exists()
             assert Path(config_manager.config.data.cache_dir).exists()
+            assert Path(config_manager.config.data.inbox_dir).exists()
             assert Path(config_manager.config.data.mindmap_csv_path).parent.exists()
 
     def test_save_config(self):
         """Test saving configuration to file."""
         config_manager = ConfigManager()
-        config_manager.config.mode = "automatic"
-        config_manager.config.debug = True
+        config_manager.apply_overrides(mode="automatic", debug=True)
 
         with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
             temp_path = f.name
@@ -176,6 +253,110 @@ class TestConfigManager:
             Path(temp_path).unlink()
 
 
+class TestConfigLayers:
+    """Test cases for layered, cached loading."""
+
+    def test_environment_overrides_yaml(self):
+        """Test that environment variables win over the YAML file."""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
+            yaml.dump({"llm": {"model": "from-yaml"}, "engine": {"beam_width": 2}}, f)
+            temp_path = f.name
+
+        environ = {
+            "AI_RESEARCHER_LLM_MODEL": "1.5",
+            "AI_RESEARCHER_ENGINE_BEAM_WIDTH": "5",
+            "AI_RESEARCHER_DEBUG": "true",
+            "DEFAULT_LLM_PROVIDER": "openai",
+        }
+        try:
+            with patch.dict(os.environ, environ):
+                config = ConfigManager(temp_path).config
+        finally:
+            Path(temp_path).unlink()
+
+        assert config.llm.model == "1.5"
+        assert config.llm.provider == "openai"
+        assert config.engine.beam_width == 5
+        assert config.debug is True
+
+    def test_environment_layer_ignores_unrelated_variables(self):
+        """Test that only prefixed variables and aliases are read."""
+        layer = environment_layer(
+            {"PATH": "/bin", "AI_RESEARCHER_COLOR": "x", "DEFAULT_MODEL": "m"}
+        )
+
+        assert layer == {"llm": {"model": "m"}}
+
+    def test_loading_is_cached_by_mtime(self):
+        """Test that unchanged sources are not re-read and edits are picked up."""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
+            yaml.dump({"mode": "manual"}, f)
+            temp_path = f.name
+
+        try:
+            first = ConfigManager(temp_path).config
+            second = ConfigManager(temp_path).config
+            Path(temp_path).write_text("mode: automatic\n", encoding="utf-8")
+            stat = Path(temp_path).stat()
+            os.utime(temp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            edited = ConfigManager(temp_path).config
+        finally:
+            Path(temp_path).unlink()
+
+        assert second is first
+        assert edited.mode == "automatic"
+
+    def test_apply_overrides_revalidates(self):
+        """Test that CLI overrides apply last and are validated."""
+        config_manager = ConfigManager()
+        default = config_manager.config
+
+        config_manager.apply_overrides(engine={"metrics_port": 9100})
+        assert config_manager.config.engine.metrics_port == 9100
+        assert default.engine.metrics_port is None
+        with pytest.raises(ValueError, match="Beam width must be positive"):
+            config_manager.apply_overrides(engine={"beam_width": 0})
+
+
+class TestConfigSnapshot:
+    """Test cases for the frozen config and its hash."""
+
+    def test_config_is_frozen_slotted_and_hashable(self):
+        """Test that configs cannot be mutated and can be dict keys."""
+        config = Config()
+
+        with pytest.raises(AttributeError):
+            config.llm.model = "other"  # type: ignore[misc]
+        assert not hasattr(config, "__dict__")
+        assert {config: 1}[Config()] == 1
+
+    def test_override(self):
+        """Test that override copies with section and top-level changes."""
+        config = Config()
+        changed = config.override(
+            llm={"model": "gpt-4o", "unknown": 1}, mode="automatic", other=True
+        )
+
+        assert changed.llm.model == "gpt-4o"
+        assert changed.mode == "automatic"
+        assert changed.data is config.data
+        assert config.llm.model == "gemini-1.5-flash"
+        assert config.override() is config
+        with pytest.raises(TypeError, match="must be a mapping"):
+            config.override(llm="gpt-4o")
+
+    def test_config_hash(self):
+        """Test that the hash is stable, value-sensitive and ignores secrets."""
+        config = Config()
+
+        assert config_hash(config) == config_hash(Config())
+        assert config_hash(config) != config_hash(config.override(mode="manual"))
+        assert config_hash(config) == config_hash(
+            config.override(llm={"api_key": "secret"})
+        )
+        assert len(config_hash(config.llm)) == 16
+
+
 class TestConfigDataclasses:
     """Test cases for configuration dataclasses."""
 
@@ -189,6 +370,14 @@ class TestConfigDataclasses:
         assert config.max_tokens == 8192
         assert config.temperature == 0.7
         assert config.timeout == 30
+        assert config.max_concurrent == 8
+        assert config.requests_per_minute is None
+        assert config.max_retries == 3
+        assert config.circuit_breaker_threshold == 5
+        assert config.structured_output is True
+        assert config.adaptive_max_tokens is True
+        assert config.max_tokens_percentile == 0.95
+        assert config.warm_up is True
 
     def test_data_config_defaults(self):
         """Test DataConfig default values."""
@@ -197,6 +386,10 @@ class TestConfigDataclasses:
         assert config.mindmap_csv_path == "data/mindmap.csv"
         assert config.output_dir == "output"
         assert config.cache_dir == ".cache"
+        assert config.inbox_dir == "inbox"
+        assert config.prompts_dir == ".taskmaster/docs/prompts"
+        assert config.prompt_profile == "full"
+        assert config.metrics_textfile is None
         assert config.max_file_size_mb == 100
 
     def test_engine_config_defaults(self):
@@ -204,6 +397,15 @@ class TestConfigDataclasses:
         config = EngineConfig()
 
         assert config.max_recursion_depth == 5
+        assert config.beam_width == 3
         assert config.concurrent_queries == 3
         assert config.session_timeout == 3600
         assert config.auto_save_interval == 300
+        assert config.inbox_poll_interval == 1.0
+        assert config.synthesis_chunk_chars == 12000
+        assert config.resident_text_mb == 64
+        assert config.knowledge_cache is True
+        assert config.knowledge_reuse_threshold == 0.85
+        assert config.knowledge_context_threshold == 0.5
+        assert config.citation_store is True
+        assert config.metrics_port is None
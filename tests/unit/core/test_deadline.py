@@ -0,0 +1,69 @@
+"""Tests for session deadline tracking."""
+
+import pytest
+
+from src.core.config import EngineConfig
+from src.core.deadline import Deadline, DeadlineExceededError
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDeadline:
+    """Test cases for Deadline class."""
+
+    def test_from_config_uses_session_timeout(self):
+        """Test that the deadline budget comes from EngineConfig."""
+        deadline = Deadline.from_config(EngineConfig(session_timeout=60))
+
+        assert deadline.timeout == 60
+        assert 0 < deadline.remaining() <= 60
+
+    def test_invalid_timeout(self):
+        """Test that a non-positive timeout is rejected."""
+        with pytest.raises(ValueError, match="must be positive"):
+            Deadline(0)
+
+    def test_remaining_and_expiry(self):
+        """Test remaining time tracks the clock and never goes negative."""
+        clock = FakeClock()
+        deadline = Deadline(10, clock=clock)
+
+        clock.now += 4
+        assert deadline.remaining() == 6
+        assert deadline.expired is False
+
+        clock.now += 20
+        assert deadline.remaining() == 0
+        assert deadline.expired is True
+
+    def test_timeout_for_shrinks_to_remaining(self):
+        """Test per-call timeouts are clamped to the remaining budget."""
+        clock = FakeClock()
+        deadline = Deadline(10, clock=clock)
+
+        assert deadline.timeout_for(30) == 10
+        clock.now += 8
+        assert deadline.timeout_for(30) == 2
+        assert deadline.timeout_for(1) == 1
+
+        clock.now += 2
+        with pytest.raises(DeadlineExceededError):
+            deadline.timeout_for(30)
+
+    def test_can_finish(self):
+        """Test estimates are compared against the remaining budget."""
+        clock = FakeClock()
+        deadline = Deadline(10, clock=clock)
+
+        assert deadline.can_finish(10) is True
+        assert deadline.can_finish(11) is False
+        clock.now += 10
+        assert deadline.can_finish(0) is False
@@ -0,0 +1,376 @@
+"""Tests for the unified LLM client."""
+
+import asyncio
+import sys
+from types import ModuleType, SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from src.core.budget import OutputBudget
+from src.core.config import LLMConfig
+from src.core.deadline import Deadline, DeadlineExceededError
+from src.core.llm_client import (
+    CircuitOpenError,
+    LLMError,
+    LLMRequest,
+    LLMTimeoutError,
+    MockLLMClient,
+    OpenAIClient,
+    PerplexityClient,
+    TransientLLMError,
+    create_llm_client,
+    estimate_tokens,
+)
+from src.core.retry import RetryPolicy
+from src.core.telemetry import Telemetry
+
+
+class FakeCompletions:
+    """Records chat completion calls and streams canned deltas."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+
+        async def events():
+            for text in ("Hel", None, "lo"):
+                delta = SimpleNamespace(content=text)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+        return events()
+
+
+def fake_openai_module(completions):
+    """Build a stand-in for the openai package."""
+    module = ModuleType("openai")
+
+    class AsyncOpenAI:
+        def __init__(self, **kwargs):
+            self.base_url = kwargs.get("base_url")
+            self.api_key = kwargs.get("api_key")
+            self.chat = SimpleNamespace(completions=completions)
+            self.models = SimpleNamespace(retrieve=self.retrieve)
+            self.retrieved = []
+
+        async def retrieve(self, model):
+            self.retrieved.append(model)
+
+    module.AsyncOpenAI = AsyncOpenAI
+    return module
+
+
+class TestLLMClient:
+    """Test cases for LLMClient.generate."""
+
+    def test_generate_collects_chunks(self):
+        """Test that streamed chunks are joined and forwarded to the sink."""
+        client = MockLLMClient(responses={"stage0": "abcdefgh"}, chunk_size=3)
+        received = []
+
+        response = asyncio.run(
+            client.generate(LLMRequest("prompt", stage="stage0"), sink=received.append)
+        )
+
+        assert response.text == "abcdefgh"
+        assert received == ["abc", "def", "gh"]
+        assert response.stage == "stage0"
+        assert response.provider == "mock"
+        assert response.output_tokens == estimate_tokens("abcdefgh")
+
+    def test_call_timeout_keeps_partial_output(self):
+        """Test that a per-call timeout raises with the partial text."""
+        config = LLMConfig(provider="mock", model="mock", timeout=0.05, max_retries=0)
+        client = MockLLMClient(config, default="x" * 10, delay=0.02, chunk_size=1)
+
+        with pytest.raises(LLMTimeoutError) as exc_info:
+            asyncio.run(client.generate(LLMRequest("prompt")))
+
+        assert 0 < len(exc_info.value.partial) < 10
+
+    def test_deadline_shrinks_call_timeout(self):
+        """Test that the session deadline cuts a call short."""
+        config = LLMConfig(provider="mock", model="mock", timeout=30)
+        client = MockLLMClient(config, default="y" * 10, delay=0.02, chunk_size=1)
+
+        async def scenario():
+            deadline = Deadline(0.05)
+            return await client.generate(LLMRequest("prompt"), deadline=deadline)
+
+        with pytest.raises(DeadlineExceededError) as exc_info:
+            asyncio.run(scenario())
+
+        assert exc_info.value.partial.startswith("y")
+
+    def test_expired_deadline_skips_call(self):
+        """Test that no request is sent once the deadline has passed."""
+        client = MockLLMClient(default="text")
+        clock_value = [0.0]
+        deadline = Deadline(1, clock=lambda: clock_value[0])
+        clock_value[0] = 5.0
+
+        with pytest.raises(DeadlineExceededError):
+            asyncio.run(client.generate(LLMRequest("prompt"), deadline=deadline))
+
+        assert client.requests == []
+
+    def test_complete_output_stops_the_stream(self):
+        """Test that a complete output ends the call and is cut to length."""
+        client = MockLLMClient(default="a\nb\nextra\nmore\n", chunk_size=2)
+        client.telemetry = Telemetry()
+        received = []
+
+        response = asyncio.run(
+            client.generate(
+                LLMRequest("prompt", complete_at=lambda t: 4 if "b\n" in t else None),
+                sink=received.append,
+            )
+        )
+
+        assert response.text == "a\nb\n"
+        assert received == ["a\n", "b\n"]
+        assert client.telemetry.early_stops == 1
+
+    def test_budget_sets_learned_max_tokens(self):
+        """Test that the output budget caps requests and learns from responses."""
+        client = MockLLMClient(default="x" * 400)
+        client.budget = OutputBudget(min_samples=2)
+
+        async def scenario():
+            for _ in range(3):
+                await client.generate(LLMRequest("prompt", stage="s"))
+            await client.generate(LLMRequest("prompt", stage="s", max_tokens=50))
+
+        asyncio.run(scenario())
+
+        assert [r.max_tokens for r in client.requests] == [None, None, 512, 50]
+        assert client.budget.limit("s", 8192) == 512
+
+    def test_response_reports_time_to_first_token(self):
+        """Test that the delay before the first chunk is measured."""
+        client = MockLLMClient(default="abc", delay=0.02, chunk_size=1)
+
+        response = asyncio.run(client.generate(LLMRequest("prompt")))
+
+        assert response.ttft is not None
+        assert 0.01 < response.ttft < response.latency
+
+    def test_estimate_tokens(self):
+        """Test the rough token estimate."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("ab") == 1
+        assert estimate_tokens("a" * 40) == 10
+
+
+class FlakyClient(MockLLMClient):
+    """Mock client that raises the queued errors before answering."""
+
+    def __init__(self, errors, chunks_before_error=0, **kwargs):
+        super().__init__(default="answer", chunk_size=2, **kwargs)
+        self.errors = list(errors)
+        self.chunks_before_error = chunks_before_error
+        self.retry = RetryPolicy(max_retries=3, base_delay=0.001)
+
+    async def stream(self, request, timeout):  # noqa: ARG002
+        self.requests.append(request)
+        if self.errors:
+            for _ in range(self.chunks_before_error):
+                yield "xx"
+            raise self.errors.pop(0)
+        yield self.default
+
+
+class TestRetries:
+    """Test cases for retries and the circuit breaker in LLMClient.generate."""
+
+    def test_transient_errors_are_retried(self):
+        """Test that transient failures are retried until the call succeeds."""
+        client = FlakyClient([TransientLLMError("503"), ConnectionError("reset")])
+        client.telemetry = Telemetry()
+
+        response = asyncio.run(client.generate(LLMRequest("prompt")))
+
+        assert response.text == "answer"
+        assert len(client.requests) == 3
+        assert client.breaker.state == "closed"
+        assert client.telemetry.snapshot().waits["retry"] > 0
+
+    def test_fatal_errors_are_not_retried(self):
+        """Test that non-transient errors surface immediately."""
+        client = FlakyClient([LLMError("bad request")])
+
+        with pytest.raises(LLMError, match="bad request"):
+            asyncio.run(client.generate(LLMRequest("prompt")))
+
+        assert len(client.requests) == 1
+
+    def test_retries_are_bounded(self):
+        """Test that the last transient error surfaces after max_retries."""
+        client = FlakyClient([TransientLLMError(str(i)) for i in range(10)])
+
+        with pytest.raises(TransientLLMError, match="3"):
+            asyncio.run(client.generate(LLMRequest("prompt")))
+
+        assert len(client.requests) == 4
+
+    def test_streamed_attempt_is_not_retried(self):
+        """Test that chunks already sent to a sink are not sent twice."""
+        client = FlakyClient([TransientLLMError("cut")], chunks_before_error=1)
+        received = []
+
+        with pytest.raises(TransientLLMError):
+            asyncio.run(client.generate(LLMRequest("p"), sink=received.append))
+
+        assert received == ["xx"]
+        assert len(client.requests) == 1
+
+    def test_retry_does_not_outlive_deadline(self):
+        """Test that no retry is scheduled past the session deadline."""
+        busy = TransientLLMError("busy")
+        busy.response = SimpleNamespace(headers={"retry-after": "5"})
+        client = FlakyClient([busy] * 2)
+
+        async def scenario():
+            with pytest.raises(TransientLLMError):
+                await client.generate(LLMRequest("p"), deadline=Deadline(1))
+
+        asyncio.run(scenario())
+
+        assert len(client.requests) == 1
+
+    def test_circuit_opens_and_probes(self):
+        """Test that the breaker fails fast, then lets one probe through."""
+        now = [0.0]
+        client = FlakyClient([TransientLLMError("down")] * 4)
+        client.retry = RetryPolicy(max_retries=0)
+        client.breaker.failure_threshold = 2
+        client.breaker.clock = lambda: now[0]
+
+        async def call():
+            return await client.generate(LLMRequest("p"))
+
+        for _ in range(2):
+            with pytest.raises(TransientLLMError):
+                asyncio.run(call())
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(call())
+        calls_while_open = len(client.requests)
+        now[0] = client.breaker.reset_timeout + 1
+        with pytest.raises(TransientLLMError):
+            asyncio.run(call())
+        state_after_failed_probe = client.breaker.state
+        client.errors.clear()
+        now[0] += client.breaker.reset_timeout + 1
+
+        assert asyncio.run(call()).text == "answer"
+        assert calls_while_open == 2
+        assert state_after_failed_probe == "open"
+        assert client.breaker.state == "closed"
+
+
+class ConnectingClient(MockLLMClient):
+    """Mock client whose connection setup can fail or hang."""
+
+    def __init__(self, error=None, delay=0.0):
+        super().__init__()
+        self.error = error
+        self.connect_delay = delay
+        self.connected = 0
+
+    async def connect(self):
+        await asyncio.sleep(self.connect_delay)
+        if self.error is not None:
+            raise self.error
+        self.connected += 1
+
+
+class TestWarmUp:
+    """Test cases for connection warm-up."""
+
+    def test_warm_up_connects(self):
+        """Test that warm-up connects and reports its duration."""
+        client = ConnectingClient()
+
+        elapsed = asyncio.run(client.warm_up())
+
+        assert client.connected == 1
+        assert elapsed is not None
+        assert asyncio.run(MockLLMClient().warm_up()) is not None
+
+    def test_failed_or_slow_warm_up_is_ignored(self):
+        """Test that warm-up failures and timeouts are not raised."""
+        with patch("src.core.llm_client.WARM_UP_TIMEOUT", 0.01):
+            slow = asyncio.run(ConnectingClient(delay=1).warm_up())
+        failed = asyncio.run(ConnectingClient(error=OSError("no route")).warm_up())
+
+        assert slow is None
+        assert failed is None
+
+
+class TestProviderAdapters:
+    """Test cases for provider adapters and the client factory."""
+
+    def test_openai_adapter_streams_and_passes_timeout(self):
+        """Test that the OpenAI adapter forwards the shrunk timeout."""
+        completions = FakeCompletions()
+        config = LLMConfig(provider="openai", model="gpt-4", max_tokens=100)
+
+        with patch.dict(sys.modules, {"openai": fake_openai_module(completions)}):
+            client = create_llm_client(config)
+            response = asyncio.run(
+                client.generate(LLMRequest("question", system="be brief"))
+            )
+
+        assert isinstance(client, OpenAIClient)
+        assert response.text == "Hello"
+        assert asyncio.run(client.warm_up()) is not None
+        assert client._client.retrieved == ["gpt-4"]
+        call = completions.calls[0]
+        assert call["timeout"] == config.timeout
+        assert call["max_tokens"] == 100
+        assert call["messages"][0] == {"role": "system", "content": "be brief"}
+
+    def test_openai_adapter_requests_json_schema(self):
+        """Test that a response schema becomes a json_schema response format."""
+        completions = FakeCompletions()
+        schema = {"title": "QuestionList", "type": "object"}
+
+        with patch.dict(sys.modules, {"openai": fake_openai_module(completions)}):
+            client = create_llm_client(LLMConfig(provider="openai"))
+            asyncio.run(client.generate(LLMRequest("q", response_schema=schema)))
+
+        response_format = completions.calls[0]["response_format"]
+        assert response_format["type"] == "json_schema"
+        assert response_format["json_schema"]["name"] == "QuestionList"
+        assert response_format["json_schema"]["schema"] is schema
+
+    def test_perplexity_uses_default_base_url(self):
+        """Test that Perplexity reuses the OpenAI adapter with its base URL."""
+        module = fake_openai_module(FakeCompletions())
+
+        with patch.dict(sys.modules, {"openai": module}):
+            client = create_llm_client(LLMConfig(provider="perplexity"))
+
+        assert isinstance(client, PerplexityClient)
+        assert client._client.base_url == "https://api.perplexity.ai"
+
+    def test_openai_compatible_providers(self):
+        """Test that OpenAI-compatible providers get their URL, key and name."""
+        module = fake_openai_module(FakeCompletions())
+
+        with patch.dict(sys.modules, {"openai": module}):
+            mistral = create_llm_client(LLMConfig(provider="mistral", api_key="k"))
+            ollama = create_llm_client(LLMConfig(provider="ollama"))
+
+        assert isinstance(mistral, OpenAIClient)
+        assert mistral.provider == "mistral"
+        assert mistral._client.base_url == "https://api.mistral.ai/v1"
+        assert ollama._client.base_url == "http://localhost:11434/v1"
+        assert ollama._client.api_key == "ollama"
+
+    def test_unsupported_provider(self):
+        """Test that unknown providers are rejected."""
+        with pytest.raises(ValueError, match="Unsupported LLM provider"):
+            create_llm_client(LLMConfig(provider="unknown"))
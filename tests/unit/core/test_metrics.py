@@ -0,0 +1,154 @@
+"""Tests for the Prometheus metrics registry."""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.core.metrics import MetricsRegistry
+from src.core.telemetry import Telemetry
+from src.data.cache import ResponseCache, cache_key
+from src.data.storage import ResearchStorage
+
+
+class TestMetricsRegistry:
+    """Test cases for MetricsRegistry class."""
+
+    def test_counter_and_gauge_exposition(self):
+        """Test text format of counters and gauges with escaped labels."""
+        metrics = MetricsRegistry()
+        requests = metrics.counter("requests_total", "Requests.", ("provider",))
+        requests.inc(provider="openai")
+        requests.inc(2, provider='we"ird')
+        metrics.gauge("in_flight", "In flight.").set(3)
+
+        text = metrics.render()
+
+        assert "# TYPE airesearcher_requests_total counter" in text
+        assert 'airesearcher_requests_total{provider="openai"} 1.0' in text
+        assert 'airesearcher_requests_total{provider="we\\"ird"} 2.0' in text
+        assert "# TYPE airesearcher_in_flight gauge" in text
+        assert "airesearcher_in_flight 3.0" in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram bucket, sum and count lines."""
+        metrics = MetricsRegistry()
+        latency = metrics.histogram(
+            "latency_seconds", "Latency.", ("stage",), buckets=(1.0, 5.0)
+        )
+        for value in (0.5, 2.0, 10.0):
+            latency.observe(value, stage="dossier")
+
+        text = metrics.render()
+
+        assert 'airesearcher_latency_seconds_bucket{stage="dossier",le="1.0"} 1' in text
+        assert 'airesearcher_latency_seconds_bucket{stage="dossier",le="5.0"} 2' in text
+        assert (
+            'airesearcher_latency_seconds_bucket{stage="dossier",le="+Inf"} 3' in text
+        )
+        assert 'airesearcher_latency_seconds_sum{stage="dossier"} 12.5' in text
+        assert 'airesearcher_latency_seconds_count{stage="dossier"} 3' in text
+        assert latency.count(stage="dossier") == 3
+
+    def test_families_are_shared_and_validated(self):
+        """Test get-or-create semantics, type conflicts and label checks."""
+        metrics = MetricsRegistry()
+        counter = metrics.counter("x_total", "X.", ("a",))
+
+        assert metrics.counter("x_total", "X.", ("a",)) is counter
+        with pytest.raises(ValueError, match="already a counter"):
+            metrics.gauge("x_total", "X.")
+        with pytest.raises(ValueError, match="expects labels"):
+            counter.inc(b="1")
+        with pytest.raises(ValueError, match="only increase"):
+            counter.inc(-1, a="1")
+
+    def test_write_textfile(self):
+        """Test that the textfile is written atomically with the exposition."""
+        metrics = MetricsRegistry()
+        metrics.counter("done_total", "Done.").inc()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = metrics.write_textfile(Path(temp_dir) / "prom" / "ai.prom")
+            text = path.read_text(encoding="utf-8")
+            leftovers = list(path.parent.glob("*.tmp"))
+
+        assert "airesearcher_done_total 1.0" in text
+        assert leftovers == []
+
+    def test_serve_http(self):
+        """Test the /metrics endpoint and 404 for other paths."""
+
+        async def fetch(port, path):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response.decode()
+
+        async def scenario():
+            metrics = MetricsRegistry()
+            metrics.counter("up_total", "Up.").inc()
+            server = await metrics.serve_http(0)
+            port = server.sockets[0].getsockname()[1]
+            responses = [await fetch(port, "/metrics"), await fetch(port, "/")]
+            server.close()
+            await server.wait_closed()
+            return responses
+
+        ok, missing = asyncio.run(scenario())
+
+        assert ok.startswith("HTTP/1.1 200 OK")
+        assert "text/plain; version=0.0.4" in ok
+        assert "airesearcher_up_total 1.0" in ok
+        assert missing.startswith("HTTP/1.1 404")
+
+
+class TestInstrumentation:
+    """Test cases for components reporting into the registry."""
+
+    def test_telemetry_mirrors_into_registry(self):
+        """Test per-provider counters and per-stage histograms from telemetry."""
+        metrics = MetricsRegistry()
+        telemetry = Telemetry(metrics=metrics)
+        telemetry.call_started("openai")
+        telemetry.call_finished(
+            "openai", "dossier", 0.3, input_tokens=10, output_tokens=4
+        )
+        telemetry.call_started("openai")
+        telemetry.call_finished("openai", "search", 0.0, error="LLMTimeoutError")
+        telemetry.queue_changed(2, 1)
+        telemetry.branch_skipped()
+
+        text = metrics.render()
+
+        assert 'llm_requests_total{provider="openai",stage="dossier"} 1.0' in text
+        assert 'llm_errors_total{provider="openai",error="LLMTimeoutError"} 1.0' in text
+        assert 'llm_tokens_total{provider="openai",direction="in"} 10.0' in text
+        assert 'llm_latency_seconds_count{stage="dossier"} 1' in text
+        assert 'llm_in_flight{provider="openai"} 0.0' in text
+        assert 'branches_queued{depth="2"} 1.0' in text
+        assert "branches_skipped_total 1.0" in text
+
+    def test_cache_and_storage_counters(self):
+        """Test cache lookup and storage write counters."""
+        metrics = MetricsRegistry()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ResponseCache(temp_dir, metrics)
+            cache.get(cache_key("a"))
+            cache.set(cache_key("a"), "x")
+            cache.get(cache_key("a"))
+            storage = ResearchStorage(temp_dir, metrics)
+            storage.save_dossier("1.0", "dossier")
+            storage.append_journal("event")
+
+        text = metrics.render()
+
+        assert 'cache_lookups_total{result="hit"} 1.0' in text
+        assert 'cache_lookups_total{result="miss"} 1.0' in text
+        assert 'storage_writes_total{kind="dossiers"} 1.0' in text
+        assert 'storage_bytes_written_total{kind="dossiers"} 7.0' in text
+        assert 'storage_writes_total{kind="journal"} 1.0' in text
@@ -0,0 +1,73 @@
+"""Tests for the provider registry."""
+
+from importlib.metadata import EntryPoint
+from unittest.mock import patch
+
+import pytest
+
+from src.core import providers
+from src.core.config import LLMConfig
+from src.core.llm_client import MockLLMClient, create_llm_client
+from src.core.providers import (
+    ENTRY_POINT_GROUP,
+    ProviderSpec,
+    get_provider,
+    is_known_provider,
+    provider_names,
+    register_provider,
+)
+
+
+def plugin_entry_points(**adapters):
+    """Stand-in for installed plugins exposing the given adapters."""
+    return {
+        name: EntryPoint(name, value, ENTRY_POINT_GROUP)
+        for name, value in adapters.items()
+    }
+
+
+class TestProviderRegistry:
+    """Test cases for the provider registry."""
+
+    def test_builtin_providers(self):
+        """Test that built-in and OpenAI-compatible providers are registered."""
+        names = provider_names()
+
+        assert {"gemini", "openai", "anthropic", "perplexity"} <= set(names)
+        assert {"mistral", "groq", "openrouter", "ollama", "xai"} <= set(names)
+        assert get_provider("anthropic").api_key_env == "ANTHROPIC_API_KEY"
+        assert get_provider("groq").base_url == "https://api.groq.com/openai/v1"
+
+    def test_register_provider_at_runtime(self):
+        """Test that a registered provider can be selected and built."""
+        spec = ProviderSpec("echo", "src.core.llm_client:MockLLMClient")
+
+        with patch.dict(providers._registry):
+            register_provider(spec)
+            client = create_llm_client(LLMConfig(provider="echo"))
+
+        assert isinstance(client, MockLLMClient)
+        assert client.provider == "echo"
+        assert not is_known_provider("echo")
+
+    def test_entry_point_plugins_load_on_selection(self):
+        """Test that plugin providers are found by name and loaded lazily."""
+        plugins = plugin_entry_points(
+            acme="src.core.llm_client:MockLLMClient", broken="src.core.config:Config"
+        )
+
+        with patch.object(providers, "_entry_points", lambda: plugins):
+            known = is_known_provider("acme")
+            spec = get_provider("acme")
+            client = create_llm_client(LLMConfig(provider="acme"))
+            with pytest.raises(TypeError, match="is not an LLMClient"):
+                create_llm_client(LLMConfig(provider="broken"))
+
+        assert known
+        assert spec.api_key_env == "ACME_API_KEY"
+        assert isinstance(client, MockLLMClient)
+
+    def test_unknown_provider(self):
+        """Test that unknown providers are rejected."""
+        with pytest.raises(ValueError, match="Unsupported LLM provider"):
+            get_provider("nonexistent")
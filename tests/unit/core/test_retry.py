@@ -0,0 +1,126 @@
+"""Tests for retry classification, backoff and the circuit breaker."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.config import LLMConfig
+from src.core.deadline import DeadlineExceededError
+from src.core.llm_client import LLMError, LLMTimeoutError
+from src.core.retry import (
+    CircuitBreaker,
+    RetryPolicy,
+    is_retryable,
+    retry_after,
+    status_code,
+)
+
+
+class StatusError(Exception):
+    """SDK-style error carrying an HTTP status and response headers."""
+
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+class APIConnectionError(Exception):
+    """Stand-in for an SDK network error that does not subclass builtins."""
+
+
+class TestClassification:
+    """Test cases for is_retryable and retry_after."""
+
+    def test_status_codes(self):
+        """Test that rate limits and server errors are retryable, 4xx are not."""
+        assert is_retryable(StatusError(429))
+        assert is_retryable(StatusError(503))
+        assert not is_retryable(StatusError(400))
+        assert not is_retryable(StatusError(401))
+        assert status_code(SimpleNamespace(code=503)) == 503
+
+    def test_error_types(self):
+        """Test classification of errors without a status code."""
+        assert is_retryable(ConnectionResetError())
+        assert is_retryable(APIConnectionError())
+        assert is_retryable(LLMTimeoutError("slow"))
+        assert not is_retryable(DeadlineExceededError("late"))
+        assert not is_retryable(LLMError("no recorded response"))
+        assert not is_retryable(ValueError("bad"))
+
+    def test_retry_after_header(self):
+        """Test parsing of seconds, milliseconds and HTTP-date headers."""
+        assert retry_after(StatusError(429, {"retry-after": "3"})) == 3.0
+        assert retry_after(StatusError(429, {"retry-after-ms": "250"})) == 0.25
+        date = {"retry-after": "Wed, 21 Oct 2015 07:28:10 GMT"}
+        assert retry_after(StatusError(429, date), now=1445412480.0) == 10.0
+        assert retry_after(StatusError(429, {"retry-after": "soon"})) is None
+        assert retry_after(StatusError(429)) is None
+        assert retry_after(ValueError()) is None
+
+
+class TestRetryPolicy:
+    """Test cases for RetryPolicy class."""
+
+    def test_backoff_grows_and_is_capped(self):
+        """Test the exponential upper bound of the jittered delay."""
+        policy = RetryPolicy(max_retries=5, base_delay=1, max_delay=5)
+        upper = lambda _low, high: high  # noqa: E731
+
+        assert [policy.delay(n, rng=upper) for n in range(1, 5)] == [1, 2, 4, 5]
+        assert 0 <= policy.delay(3) <= 4
+
+    def test_requested_delay_is_a_minimum(self):
+        """Test that a Retry-After request is honoured."""
+        policy = RetryPolicy(base_delay=0.1)
+
+        assert policy.delay(1, requested=7.0) == 7.0
+
+    def test_from_config(self):
+        """Test that the policy and breaker follow the provider config."""
+        config = LLMConfig(
+            max_retries=1, retry_base_delay=2, circuit_breaker_threshold=9
+        )
+
+        assert RetryPolicy.from_config(config).max_retries == 1
+        assert RetryPolicy.from_config(config).base_delay == 2
+        assert CircuitBreaker.from_config(config).failure_threshold == 9
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker class."""
+
+    def test_opens_after_threshold(self):
+        """Test that consecutive failures open the breaker until the reset."""
+        now = [0.0]
+        breaker = CircuitBreaker(2, reset_timeout=10, clock=lambda: now[0])
+
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        assert not breaker.allow()
+        assert breaker.retry_in() == 10
+
+    def test_single_probe_when_half_open(self):
+        """Test that only one probe runs and its outcome decides the state."""
+        now = [0.0]
+        breaker = CircuitBreaker(1, reset_timeout=10, clock=lambda: now[0])
+        breaker.record_failure()
+        now[0] = 10
+
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.release()
+        assert breaker.allow()
+        breaker.record_success()
+
+        assert breaker.state == "closed"
+        assert breaker.failures == 0
+
+    def test_invalid_threshold(self):
+        """Test that a non-positive threshold is rejected."""
+        with pytest.raises(ValueError, match="Failure threshold must be positive"):
+            CircuitBreaker(0)
@@ -0,0 +1,124 @@
+"""Tests for session telemetry."""
+
+import asyncio
+
+import pytest
+
+from src.core.llm_client import LLMRequest, MockLLMClient
+from src.core.metrics import MetricsRegistry
+from src.core.telemetry import Telemetry, percentile
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTelemetry:
+    """Test cases for Telemetry class."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        samples = [float(i) for i in range(1, 101)]
+
+        assert percentile(samples, 0.5) == 50.0
+        assert percentile(samples, 0.95) == 95.0
+        assert percentile([], 0.5) == 0.0
+
+    def test_latency_and_token_rates(self):
+        """Test that finished calls feed latency percentiles and token rates."""
+        clock = FakeClock()
+        telemetry = Telemetry(rate_window=10, clock=clock)
+        clock.now = 10.0
+        for latency in (1.0, 2.0, 3.0, 4.0):
+            telemetry.call_started("openai")
+            telemetry.call_finished(
+                "openai", "dossier", latency, input_tokens=100, output_tokens=50
+            )
+
+        snap = telemetry.snapshot()
+
+        assert snap.latency["dossier"].calls == 4
+        assert snap.latency["dossier"].p50 == 2.0
+        assert snap.latency["dossier"].p95 == 4.0
+        assert snap.tokens_in_per_sec == pytest.approx(40.0)
+        assert snap.tokens_out_per_sec == pytest.approx(20.0)
+        assert snap.in_flight == {}
+
+        clock.now = 25.0
+        assert telemetry.snapshot().tokens_in_per_sec == 0.0
+
+    def test_queue_waits_and_errors(self):
+        """Test queue depth accounting, throttle waits and error counts."""
+        telemetry = Telemetry()
+        telemetry.queue_changed(1, 2)
+        telemetry.queue_changed(2, 1)
+        telemetry.queue_changed(2, -1)
+        telemetry.record_wait("slots", 0.5)
+        telemetry.record_wait("slots", 0.25)
+        telemetry.call_started("gemini")
+        telemetry.call_started("gemini")
+        telemetry.call_finished("gemini", "search", 0.0, error="LLMTimeoutError")
+
+        snap = telemetry.snapshot()
+
+        assert snap.queue_by_depth == {1: 2}
+        assert snap.waits == {"slots": 0.75}
+        assert snap.in_flight == {"gemini": 1}
+        assert snap.errors == {"LLMTimeoutError": 1}
+        assert snap.latency == {}
+
+    def test_parse_outcomes_and_reasks(self):
+        """Test parse outcome counts, the failure rate and re-ask metrics."""
+        registry = MetricsRegistry()
+        telemetry = Telemetry(metrics=registry)
+        telemetry.parse_finished("decomposition", "structured")
+        telemetry.parse_finished("next_level", "markdown")
+        telemetry.parse_finished("next_level", "failed")
+        telemetry.parse_finished("repair", "structured")
+        telemetry.reask("next_level")
+
+        snap = telemetry.snapshot()
+        text = registry.render()
+
+        assert snap.parses == {"structured": 2, "markdown": 1, "failed": 1}
+        assert snap.reasks == 1
+        assert snap.parse_failure_rate == pytest.approx(0.25)
+        assert Telemetry().snapshot().parse_failure_rate == 0.0
+        assert 'llm_reasks_total{stage="next_level"} 1' in text
+        assert 'parse_results_total{stage="next_level",outcome="failed"} 1' in text
+
+    def test_time_to_first_token(self):
+        """Test per-stage TTFT and the session's first-call TTFT."""
+        metrics = MetricsRegistry()
+        telemetry = Telemetry(metrics=metrics)
+        for stage, ttft in (("strategy", 0.4), ("dossier", 0.1), ("dossier", 0.3)):
+            telemetry.call_started("openai")
+            telemetry.call_finished("openai", stage, 1.0, ttft=ttft)
+        telemetry.call_started("openai")
+        telemetry.call_finished("openai", "search", 1.0)
+
+        snap = telemetry.snapshot()
+        text = metrics.render()
+
+        assert telemetry.first_ttft == 0.4
+        assert snap.latency["dossier"].ttft_p50 == 0.1
+        assert snap.latency["search"].ttft_p50 == 0.0
+        assert "llm_first_call_ttft_seconds 0.4" in text
+        assert 'llm_ttft_seconds_count{stage="dossier"} 2' in text
+
+    def test_client_reports_calls(self):
+        """Test that LLMClient.generate records calls when telemetry is attached."""
+        client = MockLLMClient(default="answer text")
+        client.telemetry = Telemetry()
+
+        asyncio.run(client.generate(LLMRequest(prompt="q", stage="strategy")))
+        snap = client.telemetry.snapshot()
+
+        assert snap.latency["strategy"].calls == 1
+        assert snap.in_flight == {}
@@ -0,0 +1,69 @@
+"""Tests for the LLM response cache."""
+
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.data.cache import ResponseCache, cache_key
+from src.data.storage import StorageWriter
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache class."""
+
+    def test_set_and_get(self):
+        """Test that stored responses are returned and counted as hits."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ResponseCache(temp_dir)
+            key = cache_key("model", "prompt")
+
+            assert cache.get(key) is None
+            cache.set(key, "Ответ")
+
+            assert key in cache
+            assert cache.get(key) == "Ответ"
+            assert cache.hits == 1
+            assert cache.misses == 1
+            assert cache.hit_rate == 0.5
+
+    def test_pending_writes_are_served_from_memory(self):
+        """Test that entries queued on a writer are hits before they land."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            writer = StorageWriter()
+            cache = ResponseCache(temp_dir, writer=writer)
+            key = cache_key("model", "prompt")
+            cache.set(key, "Ответ")
+
+            assert key in cache
+            assert cache.get(key) == "Ответ"
+            writer.close()
+
+            assert ResponseCache(temp_dir).get(key) == "Ответ"
+            assert not cache._pending
+
+    def test_persists_across_instances(self):
+        """Test that entries survive a new cache instance."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            key = cache_key("a")
+            ResponseCache(temp_dir).set(key, "kept")
+
+            assert ResponseCache(temp_dir).get(key) == "kept"
+
+    def test_concurrent_writers_do_not_collide(self):
+        """Test that parallel writes of one key leave a valid entry behind."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ResponseCache(temp_dir)
+            key = cache_key("shared")
+            texts = [f"text {i}" * 200 for i in range(16)]
+
+            with ThreadPoolExecutor(8) as pool:
+                list(pool.map(lambda text: cache.set(key, text), texts))
+
+            assert cache.get(key) in texts
+            assert not list(Path(temp_dir).rglob("*.tmp"))
+
+    def test_cache_key_separates_parts(self):
+        """Test that part boundaries affect the key."""
+        assert cache_key("ab", "c") != cache_key("a", "bc")
+        assert cache_key("x") == cache_key("x")
+        assert ResponseCache(".").hit_rate == 0.0
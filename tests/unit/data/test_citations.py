@@ -0,0 +1,69 @@
+"""Tests for the citation store."""
+
+import tempfile
+from pathlib import Path
+
+from src.data.citations import CitationStore
+from src.utils.parsers import Citation
+
+DOSSIER = """Adoption grew 40% ([Survey](https://www.example.com/survey/)).
+Latency fell by half (https://arxiv.org/abs/2309.11495).
+"""
+
+
+class TestCitationStore:
+    """Test cases for CitationStore class."""
+
+    def test_sources_are_interned_once(self):
+        """Test that a URL keeps one id and its first title across dossiers."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = CitationStore(Path(temp_dir) / "citations.sqlite3")
+            first = store.add("run:1.1", DOSSIER)
+            second = store.add("run:2.1", "See [Other](https://example.com/survey).")
+            sources = store.sources("run:2.1")
+            size = len(store)
+            store.close()
+
+        assert [s.id for s in first] == [1, 2]
+        assert second == [first[0]]
+        assert sources[0].title == "Survey"
+        assert sources[0].url == "https://example.com/survey"
+        assert size == 2
+
+    def test_cited_by_finds_dossiers(self):
+        """Test that dossiers are found by any spelling of a cited URL."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "citations.sqlite3"
+            store = CitationStore(path)
+            store.add("run:1.1", DOSSIER)
+            store.add("run:1.2", DOSSIER)
+            store.add("run:1.2", DOSSIER)
+            store.close()
+            reopened = CitationStore(path)
+            citing = reopened.cited_by("https://Example.com/survey?utm_source=mail")
+            missing = reopened.cited_by("https://unknown.org")
+            reopened.close()
+
+        assert citing == ["run:1.1", "run:1.2"]
+        assert missing == []
+
+    def test_compact_and_expand(self):
+        """Test that URLs become references and references become links."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = CitationStore(Path(temp_dir) / "citations.sqlite3")
+            text, legend = store.compact(DOSSIER)
+            source = store.intern(Citation("https://arxiv.org/abs/2309.11495"))
+            expanded = store.expand("Grew [S1], fell [S2], odd [S9], [S1](x)")
+            store.close()
+
+        assert "Adoption grew 40% (Survey [S1])." in text
+        assert "http" not in text
+        assert legend.splitlines() == [
+            "[S1] https://example.com/survey",
+            "[S2] https://arxiv.org/abs/2309.11495",
+        ]
+        assert source.reference == "[S2]"
+        assert expanded == (
+            "Grew [S1](https://example.com/survey), "
+            "fell [S2](https://arxiv.org/abs/2309.11495), odd [S9], [S1](x)"
+        )
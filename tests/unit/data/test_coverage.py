@@ -0,0 +1,119 @@
+"""Tests for the mindmap coverage index."""
+
+import tempfile
+from pathlib import Path
+
+from src.data.coverage import (
+    STAGE_DECOMPOSED,
+    STAGE_DOSSIER,
+    STAGE_EXPANDED,
+    STAGE_STRATEGIZED,
+    CoverageIndex,
+    journal_stages,
+)
+from src.data.kb_loader import MindmapNode
+
+
+def tree(*paths):
+    """Mindmap nodes for the given paths and all their ancestors."""
+    nodes = {}
+    for path in paths:
+        for level in range(1, len(path) + 1):
+            nodes.setdefault(path[:level], MindmapNode(path[:level]))
+    return list(nodes.values())
+
+
+NODES = tree(
+    ("AI", "RAG", "Index"),
+    ("AI", "CoVe", "Steps"),
+    ("AI", "RAG", "Rerank"),
+    ("AI", "CoVe", "Plan"),
+)
+
+
+def node(*path):
+    """Node with the given path."""
+    return MindmapNode(path)
+
+
+class TestJournalStages:
+    """Test cases for journal_stages."""
+
+    def test_stages_follow_session_events(self):
+        """Test that decomposition and dossiers map to their stage bits."""
+        events = [
+            {"event": "session_started"},
+            {"event": "decomposed", "questions": 2},
+            {"event": "dossier_saved", "number": "1.0"},
+        ]
+
+        follow_up = {"event": "dossier_saved", "number": "1.1"}
+
+        assert journal_stages(events) == (
+            STAGE_STRATEGIZED | STAGE_DECOMPOSED | STAGE_DOSSIER
+        )
+        assert journal_stages([*events, follow_up]) & STAGE_EXPANDED
+        assert journal_stages([]) == 0
+
+
+class TestCoverageIndex:
+    """Test cases for CoverageIndex."""
+
+    def test_missing_lists_level_nodes_without_stage(self):
+        """Test that gap queries return the level's nodes lacking a stage."""
+        coverage = CoverageIndex(NODES)
+        coverage.mark(node("AI", "RAG", "Index").id, STAGE_DOSSIER)
+
+        missing = coverage.missing(STAGE_DOSSIER, 3)
+
+        assert [n.topic for n in missing] == [
+            "AI > CoVe > Plan",
+            "AI > CoVe > Steps",
+            "AI > RAG > Rerank",
+        ]
+        assert coverage.missing(STAGE_DOSSIER, 7) == []
+
+    def test_progress_counts_tracked_subtree(self):
+        """Test that progress counts tracked nodes of each subtree."""
+        coverage = CoverageIndex(NODES)
+        for path in (("AI", "RAG"), ("AI", "RAG", "Index"), ("AI",)):
+            coverage.mark(node(*path).id, STAGE_DOSSIER)
+
+        progress = {
+            branch.node.topic: (branch.done, branch.total)
+            for branch in coverage.progress(STAGE_DOSSIER, 2, tracked=(2, 4))
+        }
+
+        assert progress == {"AI > CoVe": (0, 3), "AI > RAG": (2, 3)}
+
+    def test_stages_survive_save_and_drop_removed_nodes(self):
+        """Test that the index reloads by node id and forgets removed nodes."""
+        plan = node("AI", "CoVe", "Plan")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "coverage.bin"
+            coverage = CoverageIndex(NODES, path)
+            coverage.mark(plan.id, STAGE_STRATEGIZED | STAGE_DECOMPOSED)
+            coverage.mark(node("AI", "RAG").id, STAGE_DOSSIER)
+            coverage.save()
+            edited = CoverageIndex([n for n in NODES if n.topic != "AI > RAG"], path)
+            edited.save()
+            reloaded = CoverageIndex(NODES, path)
+
+        assert edited.stages(plan.id) == STAGE_STRATEGIZED | STAGE_DECOMPOSED
+        assert reloaded.stages(plan.id) == STAGE_STRATEGIZED | STAGE_DECOMPOSED
+        assert reloaded.stages(node("AI", "RAG").id) == 0
+
+    def test_large_mindmap_queries(self):
+        """Test that queries stay correct over many nodes."""
+        nodes = tree(
+            *((f"Root {i // 100}", f"Branch {i}", "Leaf") for i in range(2000))
+        )
+        coverage = CoverageIndex(nodes)
+        for i in range(0, 2000, 2):
+            coverage.mark(node(f"Root {i // 100}", f"Branch {i}").id, STAGE_DOSSIER)
+
+        progress = coverage.progress(STAGE_DOSSIER, 1, tracked=(2, 2))
+
+        assert len(coverage.missing(STAGE_DOSSIER, 2)) == 1000
+        assert all((b.done, b.total) == (50, 100) for b in progress)
+        assert progress[0].fraction == 0.5
@@ -0,0 +1,102 @@
+"""Tests for the mindmap CSV loader."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.data.kb_loader import (
+    MindmapNode,
+    diff_digests,
+    load_manifest,
+    load_mindmap,
+    node_digests,
+    node_id,
+    nodes_at_levels,
+    save_manifest,
+)
+
+MINDMAP = """"Level 1","Level 2","Level 3","Level 4","Level 5"
+"LLMs","CoVe","Core Steps","1. Baseline",""
+"LLMs","CoVe","Core Steps","2. Plan",""
+"LLMs","CoVe","Variants","",""
+"LLMs","RAG","","",""
+"""
+
+
+def write_csv(temp_dir, text):
+    """Write a CSV file into the temporary directory."""
+    path = Path(temp_dir) / "mindmap.csv"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+class TestLoadMindmap:
+    """Test cases for load_mindmap."""
+
+    def test_nodes_in_first_seen_order(self):
+        """Test that shared prefixes are returned once and empty cells end rows."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            nodes = load_mindmap(write_csv(temp_dir, MINDMAP))
+
+        assert [node.topic for node in nodes] == [
+            "LLMs",
+            "LLMs > CoVe",
+            "LLMs > CoVe > Core Steps",
+            "LLMs > CoVe > Core Steps > 1. Baseline",
+            "LLMs > CoVe > Core Steps > 2. Plan",
+            "LLMs > CoVe > Variants",
+            "LLMs > RAG",
+        ]
+        assert nodes[3].level == 4
+
+    def test_nodes_at_levels(self):
+        """Test filtering nodes to a level range."""
+        nodes = [MindmapNode(("a",)), MindmapNode(("a", "b")), MindmapNode(("a",) * 5)]
+
+        assert nodes_at_levels(nodes, 2, 4) == [MindmapNode(("a", "b"))]
+
+    def test_rejects_csv_without_levels(self):
+        """Test that a CSV without Level columns is rejected."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = write_csv(temp_dir, "Topic,Notes\nx,y\n")
+            with pytest.raises(ValueError, match="no Level columns"):
+                load_mindmap(path)
+
+
+class TestNodeDigests:
+    """Test cases for subtree hashes, diffs and the manifest."""
+
+    def test_edit_changes_node_and_ancestors_only(self):
+        """Test that a leaf edit only changes hashes on its path to the root."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            nodes = load_mindmap(write_csv(temp_dir, MINDMAP))
+            before = node_digests(nodes)
+            edited = MINDMAP.replace("2. Plan", "2. Plan verifications")
+            after = node_digests(load_mindmap(write_csv(temp_dir, edited)))
+
+        diff = diff_digests(before, after)
+
+        assert diff.added == ["LLMs > CoVe > Core Steps > 2. Plan verifications"]
+        assert diff.removed == ["LLMs > CoVe > Core Steps > 2. Plan"]
+        assert diff.changed == ["LLMs", "LLMs > CoVe", "LLMs > CoVe > Core Steps"]
+        assert "LLMs > RAG" in diff.unchanged
+        assert node_digests(list(reversed(nodes))) == before
+
+    def test_manifest_round_trip(self):
+        """Test that saved digests load back and a missing manifest is empty."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "mindmap" / "manifest.json"
+            missing = load_manifest(path)
+            save_manifest(path, {"A > B": "abc"})
+            loaded = load_manifest(path)
+
+        assert missing == {}
+        assert loaded == {"A > B": "abc"}
+
+    def test_node_id(self):
+        """Test that node ids are short, stable and derived from the topic."""
+        node = MindmapNode(("A", "B"))
+
+        assert node.id == node_id("A > B")
+        assert len(node.id) == 16
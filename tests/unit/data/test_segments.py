@@ -0,0 +1,92 @@
+"""Tests for the mmap-backed segment store."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.data.segments import SegmentStore, TextHandle
+
+
+class TestSegmentStore:
+    """Test cases for SegmentStore class."""
+
+    def test_put_and_get(self):
+        """Test that texts round-trip through the segment file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = SegmentStore(Path(temp_dir) / "segments.bin")
+            first = store.put("Досье 1.0")
+            second = store.put("results")
+
+            assert first.offset == 0
+            assert second.offset == first.length
+            assert store.get(second) == "results"
+            assert store.get(first) == "Досье 1.0"
+            assert store.get(store.put("")) == ""
+            store.close()
+
+    def test_identical_texts_are_stored_once(self):
+        """Test that duplicate texts share one handle."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "segments.bin"
+            store = SegmentStore(path)
+
+            assert store.put("same") == store.put("same")
+            store.close()
+            assert path.stat().st_size == len("same")
+
+    def test_reads_after_file_grows(self):
+        """Test that handles written after the first read are still readable."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = SegmentStore(Path(temp_dir) / "segments.bin", 0)
+            first = store.put("a" * 10)
+            assert store.get(first) == "a" * 10
+
+            later = store.put("b" * 10_000)
+
+            assert store.get(later) == "b" * 10_000
+            store.close()
+
+    def test_resident_cache_respects_cap(self):
+        """Test that decoded texts are evicted beyond the byte cap."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = SegmentStore(Path(temp_dir) / "segments.bin", 250)
+            handles = [store.put(str(i) * 100) for i in range(5)]
+
+            for handle in handles:
+                store.get(handle)
+            too_big = store.put("x" * 300)
+            store.get(too_big)
+
+            assert store.resident_bytes == 200
+            assert store.get(handles[0]) == "0" * 100
+            store.close()
+            assert store.resident_bytes == 0
+
+    def test_handles_survive_reopening(self):
+        """Test that a new store instance reads existing handles."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "segments.bin"
+            store = SegmentStore(path)
+            handle = store.put("kept")
+            store.close()
+
+            reopened = SegmentStore(path)
+            appended = reopened.put("more")
+
+            assert reopened.get(handle) == "kept"
+            assert appended.offset == handle.length
+            reopened.close()
+
+    def test_invalid_handle_and_cap(self):
+        """Test that out-of-range handles and negative caps are rejected."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = SegmentStore(Path(temp_dir) / "segments.bin")
+            store.put("short")
+
+            with pytest.raises(ValueError, match="beyond end"):
+                store.get(TextHandle(0, 100, "digest"))
+            store.close()
+
+            with pytest.raises(ValueError, match="must not be negative"):
+                SegmentStore(Path(temp_dir) / "other.bin", -1)
@@ -0,0 +1,132 @@
+"""Tests for research result storage."""
+
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.core.metrics import MetricsRegistry
+from src.data.storage import ResearchStorage, StorageWriter, validate_task_id
+
+
+class TestResearchStorage:
+    """Test cases for ResearchStorage class."""
+
+    def test_save_and_load_dossier(self):
+        """Test dossiers round-trip through markdown files."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage = ResearchStorage(temp_dir)
+            path = storage.save_dossier("1.1", "# Dossier")
+
+            assert path == Path(temp_dir) / "dossiers" / "1.1.md"
+            assert storage.load_dossier("1.1") == "# Dossier"
+            assert storage.load_dossier("2.1") is None
+
+    def test_save_partial(self):
+        """Test partial output is written separately from dossiers."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage = ResearchStorage(temp_dir)
+            path = storage.save_partial("1.2", "half a dossier")
+
+            assert path.parent.name == "partial"
+            assert path.read_text(encoding="utf-8") == "half a dossier"
+            assert storage.load_dossier("1.2") is None
+
+    def test_update_dossier_keeps_versions(self):
+        """Test that updating a dossier archives the text it replaces."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage = ResearchStorage(temp_dir)
+            assert storage.update_dossier("1.1", "v1") == 1
+            second = storage.update_dossier("1.1", "v2")
+            third = storage.update_dossier("1.1", "v3")
+
+            assert (second, third) == (2, 3)
+            assert storage.dossier_version("1.1") == 3
+            assert storage.load_dossier("1.1") == "v3"
+            assert storage.load_dossier_version("1.1", 1) == "v1"
+            assert storage.load_dossier_version("1.1", 2) == "v2"
+            assert storage.load_dossier_version("1.1", 3) is None
+            assert storage.dossier_version("1.10") == 1
+
+    def test_journal_appends_events(self):
+        """Test journal events are appended with timestamps."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage = ResearchStorage(temp_dir)
+            assert storage.read_journal() == []
+
+            storage.append_journal("started", topic="RAG")
+            storage.append_journal("deadline", cancelled=2)
+            events = storage.read_journal()
+
+        assert [e["event"] for e in events] == ["started", "deadline"]
+        assert events[0]["topic"] == "RAG"
+        assert events[1]["cancelled"] == 2
+        assert "ts" in events[0]
+
+    def test_validate_task_id(self):
+        """Test that path-like task ids are rejected."""
+        assert validate_task_id("q1.1-a_b") == "q1.1-a_b"
+        with pytest.raises(ValueError, match="Invalid task id"):
+            validate_task_id("../x")
+
+
+class TestStorageWriter:
+    """Test cases for StorageWriter class."""
+
+    def test_storage_writes_through_writer(self):
+        """Test that queued writes are visible to reads and synced on close."""
+        metrics = MetricsRegistry()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            writer = StorageWriter(metrics=metrics)
+            storage = ResearchStorage(temp_dir, writer=writer)
+            path = storage.save_dossier("1.1", "# Dossier")
+            for number in range(3):
+                storage.append_journal("dossier_saved", number=f"1.{number}")
+
+            assert storage.load_dossier("1.1") == "# Dossier"
+            assert len(storage.read_journal()) == 3
+            writer.close()
+
+            assert path.read_text(encoding="utf-8") == "# Dossier"
+            with pytest.raises(RuntimeError, match="closed"):
+                storage.append_journal("late")
+
+        assert metrics.counter("storage_fsyncs_total", "").value() == 2
+
+    def test_full_queue_blocks_until_drained(self):
+        """Test that writers wait once max_pending writes are queued."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "log.txt"
+            released = threading.Event()
+            writer = StorageWriter(max_pending=1)
+            writer.write(path, "", done=released.wait)
+            writer.append(path, "a")
+            blocked = threading.Thread(target=writer.append, args=(path, "b"))
+            blocked.start()
+            blocked.join(0.05)
+
+            assert blocked.is_alive()
+            released.set()
+            blocked.join()
+            writer.close()
+
+            assert path.read_text(encoding="utf-8") == "ab"
+
+    def test_write_errors_surface_on_flush(self):
+        """Test that a failed write is raised by the next flush."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            blocker = Path(temp_dir) / "file"
+            blocker.write_text("", encoding="utf-8")
+            writer = StorageWriter()
+            writer.append(blocker / "journal.jsonl", "line\n")
+
+            with pytest.raises(FileExistsError):
+                writer.flush()
+            writer.flush()
+            writer.close()
+
+    def test_rejects_non_positive_interval(self):
+        """Test that the sync interval must be positive."""
+        with pytest.raises(ValueError, match="Sync interval"):
+            StorageWriter(sync_interval=0)
@@ -0,0 +1,125 @@
+"""Tests for manual and automated search execution."""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.engine.execution import ManualSearchExecutor, ManualSearchInbox
+from src.engine.scheduler import ResearchScheduler
+
+
+class TestManualSearchInbox:
+    """Test cases for ManualSearchInbox class."""
+
+    def test_request_writes_prompt_and_parks(self):
+        """Test that a request publishes the prompt and parks a future."""
+
+        async def scenario(inbox_dir):
+            scheduler = ResearchScheduler(1)
+            inbox = ManualSearchInbox(inbox_dir, scheduler)
+            future = inbox.request("q1.1", "search prompt")
+            return future.done(), scheduler.parked
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            done, parked = asyncio.run(scenario(temp_dir))
+            prompt = (Path(temp_dir) / "q1.1.prompt.md").read_text(encoding="utf-8")
+
+        assert done is False
+        assert parked == ["q1.1"]
+        assert prompt == "search prompt"
+
+    def test_invalid_task_id(self):
+        """Test that task ids that are not safe file names are rejected."""
+
+        async def scenario(inbox_dir):
+            inbox = ManualSearchInbox(inbox_dir, ResearchScheduler(1))
+            inbox.request("../escape", "prompt")
+
+        with (
+            tempfile.TemporaryDirectory() as temp_dir,
+            pytest.raises(ValueError, match="Invalid task id"),
+        ):
+            asyncio.run(scenario(temp_dir))
+
+    def test_poll_resolves_result_files(self):
+        """Test that result files resolve pending searches and are archived."""
+
+        async def scenario(inbox_dir):
+            inbox = ManualSearchInbox(inbox_dir, ResearchScheduler(1))
+            future = inbox.request("q2", "prompt")
+            assert inbox.poll() == 0
+            (Path(inbox_dir) / "q2.result.md").write_text("answer", encoding="utf-8")
+            first = inbox.poll()
+            resolved = inbox.poll()
+            return first, resolved, await future
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first, resolved, result = asyncio.run(scenario(temp_dir))
+            archived = (Path(temp_dir) / "q2.done.md").exists()
+
+        assert first == 0
+        assert resolved == 1
+        assert result == "answer"
+        assert archived is True
+
+    def test_poll_waits_for_growing_file(self):
+        """Test that a result file still being written is not consumed."""
+
+        async def scenario(inbox_dir):
+            inbox = ManualSearchInbox(inbox_dir, ResearchScheduler(1))
+            inbox.request("q5", "prompt")
+            result_path = Path(inbox_dir) / "q5.result.md"
+            result_path.write_text("partial", encoding="utf-8")
+            seen = [inbox.poll()]
+            with result_path.open("a", encoding="utf-8") as f:
+                f.write(" and the rest")
+            seen.append(inbox.poll())
+            seen.append(inbox.poll())
+            return seen
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            assert asyncio.run(scenario(temp_dir)) == [0, 0, 1]
+
+    def test_watch_feeds_executor(self):
+        """Test that the watcher delivers results to a waiting executor."""
+
+        async def scenario(inbox_dir):
+            inbox = ManualSearchInbox(inbox_dir, ResearchScheduler(1), 0.001)
+            executor = ManualSearchExecutor(inbox)
+            watcher = asyncio.create_task(inbox.watch())
+            search = asyncio.create_task(executor.search("q3", "prompt"))
+            await asyncio.sleep(0.01)
+            (Path(inbox_dir) / "q3.result.md").write_text("found", encoding="utf-8")
+            result = await asyncio.wait_for(search, 1)
+            watcher.cancel()
+            return result
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            assert asyncio.run(scenario(temp_dir)) == "found"
+
+    def test_serve_socket_submits_result(self):
+        """Test that results sent over the Unix socket resolve the search."""
+
+        async def scenario(inbox_dir):
+            inbox = ManualSearchInbox(inbox_dir, ResearchScheduler(1))
+            future = inbox.request("q4", "prompt")
+            socket_path = Path(inbox_dir) / "inbox.sock"
+            server = await inbox.serve_socket(socket_path)
+            replies = []
+            for task_id in ("q4", "unknown"):
+                reader, writer = await asyncio.open_unix_connection(str(socket_path))
+                writer.write(f"{task_id}\nsocket answer".encode())
+                writer.write_eof()
+                replies.append(await reader.read())
+                writer.close()
+            server.close()
+            await server.wait_closed()
+            return replies, await future
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            replies, result = asyncio.run(scenario(temp_dir))
+
+        assert replies == [b"ok\n", b"unknown\n"]
+        assert result == "socket answer"
@@ -0,0 +1,136 @@
+"""Tests for incremental mindmap research."""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+from src.core.config import Config
+from src.core.llm_client import LLMError
+from src.data.coverage import STAGE_DECOMPOSED, STAGE_DOSSIER, STAGE_STRATEGIZED
+from src.data.kb_loader import MindmapNode, load_manifest
+from src.data.storage import ResearchStorage
+from src.engine.incremental import (
+    MANIFEST_FILE,
+    load_coverage,
+    mark_prewarmed,
+    mindmap_root,
+    rebuild_coverage,
+    research_mindmap,
+)
+
+
+def tree(*paths):
+    """Mindmap nodes for the given paths and all their ancestors."""
+    nodes = {}
+    for path in paths:
+        for level in range(1, len(path) + 1):
+            nodes.setdefault(path[:level], MindmapNode(path[:level]))
+    return list(nodes.values())
+
+
+class RecordingRunner:
+    """Researches a topic by writing a marker file; can fail on demand."""
+
+    def __init__(self, fail=()):
+        self.topics = []
+        self.fail = set(fail)
+
+    async def __call__(self, config, topic):
+        if topic in self.fail:
+            raise LLMError("provider down")
+        self.topics.append(topic)
+        output = Path(config.data.output_dir)
+        output.mkdir(parents=True)
+        (output / "dossier.md").write_text(topic, encoding="utf-8")
+        storage = ResearchStorage(output)
+        storage.append_journal("decomposed", topic=topic, questions=1)
+        storage.append_journal("dossier_saved", number="1.0")
+
+
+class TestResearchMindmap:
+    """Test cases for research_mindmap."""
+
+    def test_rerun_only_researches_the_edit(self):
+        """Test that a rerun researches added nodes and drops removed ones."""
+        first = tree(("AI", "CoVe", "Steps", "Plan"), ("AI", "RAG", "Index"))
+        second = tree(("AI", "CoVe", "Steps", "Verify"), ("AI", "RAG", "Index"))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = Config().override(data={"output_dir": temp_dir})
+            initial = RecordingRunner()
+            asyncio.run(research_mindmap(config, first, initial))
+            rerun = RecordingRunner()
+            run = asyncio.run(research_mindmap(config, second, rerun))
+            root = mindmap_root(config)
+            removed = root / MindmapNode(("AI", "CoVe", "Steps", "Plan")).id
+            kept = root / MindmapNode(("AI", "CoVe")).id / "dossier.md"
+            manifest = load_manifest(root / MANIFEST_FILE)
+
+            assert not removed.exists()
+            assert kept.read_text(encoding="utf-8") == "AI > CoVe"
+
+        assert len(initial.topics) == 5
+        assert rerun.topics == ["AI > CoVe > Steps > Verify"]
+        assert run.diff.removed == ["AI > CoVe > Steps > Plan"]
+        assert run.diff.changed == ["AI > CoVe", "AI > CoVe > Steps"]
+        assert "AI > CoVe > Steps > Plan" not in manifest
+        assert len(manifest) == 5
+
+    def test_failed_topics_are_retried(self):
+        """Test that a topic that failed is researched on the next run."""
+        nodes = tree(("AI", "CoVe"), ("AI", "RAG"))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = Config().override(data={"output_dir": temp_dir})
+            failing = RecordingRunner(fail={"AI > RAG"})
+            first = asyncio.run(research_mindmap(config, nodes, failing))
+            retry = RecordingRunner()
+            asyncio.run(research_mindmap(config, nodes, retry))
+
+        assert first.failed == ["AI > RAG"]
+        assert first.researched == ["AI > CoVe"]
+        assert retry.topics == ["AI > RAG"]
+
+    def test_finished_nodes_are_marked_in_coverage(self):
+        """Test that researched nodes record their stages in the index."""
+        nodes = tree(("AI", "CoVe"), ("AI", "RAG"))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = Config().override(data={"output_dir": temp_dir})
+            asyncio.run(research_mindmap(config, nodes, RecordingRunner({"AI > RAG"})))
+            coverage = load_coverage(config, nodes)
+
+        assert [node.topic for node in coverage.missing(STAGE_DOSSIER, 2)] == [
+            "AI > RAG"
+        ]
+
+
+class TestCoverageUpdates:
+    """Test cases for rebuild_coverage and mark_prewarmed."""
+
+    def test_rebuild_reads_node_journals(self):
+        """Test that a rebuild recovers stages from existing outputs."""
+        nodes = tree(("AI", "CoVe"), ("AI", "RAG"))
+        cove = MindmapNode(("AI", "CoVe"))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = Config().override(data={"output_dir": temp_dir})
+            journal = ResearchStorage(mindmap_root(config) / cove.id)
+            journal.append_journal("decomposed", topic=cove.topic, questions=3)
+            rebuild_coverage(config, nodes)
+            coverage = load_coverage(config, nodes)
+
+        assert coverage.stages(cove.id) == STAGE_STRATEGIZED | STAGE_DECOMPOSED
+
+    def test_prewarm_marks_warmed_nodes(self):
+        """Test that pre-warmed nodes have Stage 0/1 marked, failed ones not."""
+        nodes = tree(("AI", "CoVe"), ("AI", "RAG"))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = Config().override(data={"output_dir": temp_dir})
+            mark_prewarmed(config, nodes, ["AI > RAG"])
+            coverage = load_coverage(config, nodes)
+
+        assert [node.topic for node in coverage.missing(STAGE_DECOMPOSED, 2)] == [
+            "AI > RAG"
+        ]
@@ -0,0 +1,89 @@
+"""Tests for the cross-session knowledge index."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.core.metrics import MetricsRegistry
+from src.engine.knowledge import KnowledgeIndex, similarity
+
+
+class TestKnowledgeIndex:
+    """Test cases for KnowledgeIndex class."""
+
+    def test_add_skips_duplicate_dossiers(self):
+        """Test that the same dossier text is indexed once."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index = KnowledgeIndex(Path(temp_dir) / "kb.sqlite3")
+            first = index.add("What is CoVe?", "# CoVe dossier", "s1:1.0")
+            again = index.add("What is CoVe exactly?", "# CoVe dossier", "s2:1.0")
+            size = len(index)
+            index.close()
+
+        assert (first, again, size) == (True, False, 1)
+
+    def test_search_ranks_by_question_similarity(self):
+        """Test that hits are ordered by similarity to the new question."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index = KnowledgeIndex(Path(temp_dir) / "kb.sqlite3")
+            index.add("How does retrieval augmented generation work?", "# RAG", "a")
+            index.add("How does chain of verification reduce errors?", "# CoVe", "b")
+            index.add("Unrelated topic", "mentions verification once", "c")
+            hits = index.search("How does chain of verification work?")
+            empty = index.search("?!")
+            index.close()
+
+        assert [hit.source for hit in hits] == ["b", "a", "c"]
+        assert hits[0].similarity > hits[1].similarity > hits[2].similarity
+        assert empty == []
+
+    def test_recall_reuses_or_adds_context(self):
+        """Test reuse above the reuse threshold and context above the other."""
+        registry = MetricsRegistry()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index = KnowledgeIndex(
+                Path(temp_dir) / "kb.sqlite3", 0.9, 0.4, metrics=registry
+            )
+            index.add("Как измерить долю галлюцинаций?", "# Доля", "ru")
+            index.add("Which benchmarks measure hallucination rates?", "# B", "en")
+            reused = index.recall("Как измерить долю галлюцинаций")
+            context = index.recall("Which benchmarks measure hallucination?")
+            missed = index.recall("What is latency?")
+            index.close()
+
+        assert reused.reuse is not None
+        assert reused.reuse.source == "ru"
+        assert context.reuse is None
+        assert [hit.source for hit in context.context] == ["en"]
+        assert missed.reuse is None
+        assert missed.context == []
+        assert 'knowledge_lookups_total{result="context"} 1' in registry.render()
+
+    def test_index_persists_across_sessions(self):
+        """Test that a reopened index still finds earlier dossiers."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "kb.sqlite3"
+            first = KnowledgeIndex(path)
+            first.add("What is CoVe?", "# CoVe", "s1:1.0")
+            first.close()
+            second = KnowledgeIndex(path)
+            recall = second.recall("What is CoVe?")
+            second.close()
+
+        assert recall.reuse is not None
+        assert recall.reuse.dossier == "# CoVe"
+
+    def test_rejects_thresholds_out_of_order(self):
+        """Test threshold validation."""
+        with (
+            tempfile.TemporaryDirectory() as temp_dir,
+            pytest.raises(ValueError, match="Thresholds must satisfy"),
+        ):
+            KnowledgeIndex(Path(temp_dir) / "kb.sqlite3", 0.3, 0.6)
+
+    def test_similarity(self):
+        """Test keyword similarity of questions."""
+        assert similarity("What is CoVe?", "what is cove") == 1.0
+        assert similarity("What is CoVe?", "") == 0.0
+        assert similarity("Why verify answers", "Why verify claims") == 0.5
@@ -0,0 +1,333 @@
+"""Tests for the research orchestrator."""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.core.config import Config
+from src.core.deadline import Deadline
+from src.core.llm_client import MockLLMClient
+from src.core.telemetry import Telemetry
+from src.data.citations import CitationStore
+from src.data.storage import ResearchStorage
+from src.engine.execution import SearchExecutor
+from src.engine.knowledge import KnowledgeIndex
+from src.engine.orchestrator import ResearchOrchestrator, child_number
+from src.engine.planner import Candidate
+from src.engine.prompts import (
+    STAGE_DECOMPOSITION,
+    STAGE_DOSSIER,
+    STAGE_REPAIR,
+    STAGE_STRATEGY,
+    PromptManager,
+)
+from src.engine.scheduler import ResearchScheduler
+from src.engine.synthesis import STAGE_DOSSIER_UPDATE
+
+DOSSIER = """# Dossier
+
+#### **5. Next-Level Questions**
+
+- **[{n}.1]** Deeper question about verification {n} one?
+- **[{n}.2]** Deeper question about latency {n} two?
+- **[{n}.3]** Deeper question about benchmarks {n} three?
+"""
+
+
+class RecordingExecutor(SearchExecutor):
+    """Answers every search immediately and records the prompts."""
+
+    def __init__(self):
+        self.prompts = {}
+
+    async def search(self, task_id, prompt):
+        self.prompts[task_id] = prompt
+        return f"results for {task_id}"
+
+
+class DossierClient(MockLLMClient):
+    """Mock client whose dossiers propose children of the queried number."""
+
+    async def stream(self, request, timeout):
+        if request.stage == STAGE_DOSSIER:
+            self.requests.append(request)
+            number = request.system.split('n="HIERARCHICAL_QUERY" v="')[1].split()[0]
+            yield DOSSIER.format(n=number)
+            return
+        async for chunk in super().stream(request, timeout):
+            yield chunk
+
+
+def make_config(output_dir, depth=3, beam=2):
+    """Config writing into a temporary output directory."""
+    return Config().override(
+        data={"output_dir": output_dir},
+        engine={"max_recursion_depth": depth, "beam_width": beam},
+    )
+
+
+class TestResearchOrchestrator:
+    """Test cases for ResearchOrchestrator class."""
+
+    def test_run_applies_beam_per_level(self):
+        """Test that recursion keeps beam_width candidates per level."""
+        client = DossierClient(
+            responses={
+                STAGE_STRATEGY: "Strategy",
+                STAGE_DECOMPOSITION: "1.0 What is CoVe?\n2.0 Why verify?",
+            }
+        )
+        executor = RecordingExecutor()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            orchestrator = ResearchOrchestrator(make_config(temp_dir), client, executor)
+            results = asyncio.run(orchestrator.run("Hallucination"))
+            storage = ResearchStorage(temp_dir)
+            pruned = storage.read_pruned()
+            events = [e["event"] for e in storage.read_journal()]
+
+        depths = [r.depth for r in results]
+        assert depths.count(1) == 2
+        assert depths.count(2) == 2
+        assert depths.count(3) == 2
+        assert len(pruned) == 4 + 4
+        assert {p["depth"] for p in pruned} == {2, 3}
+        assert events[0] == "session_started"
+        assert events[-1] == "session_finished"
+        assert "1.0 What is CoVe?" in executor.prompts["1.0"]
+
+    def test_minimal_prompts_keep_the_pipeline_working(self):
+        """Test that shorter prompts still carry every placeholder and format."""
+        client = DossierClient(
+            responses={
+                STAGE_STRATEGY: "Strategy",
+                STAGE_DECOMPOSITION: "1.0 What is CoVe?\n2.0 Why verify?",
+            }
+        )
+        executor = RecordingExecutor()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = make_config(temp_dir, depth=2).override(
+                data={"prompt_profile": "minimal"}
+            )
+            orchestrator = ResearchOrchestrator(config, client, executor)
+            results = asyncio.run(orchestrator.run("Hallucination"))
+
+        full = PromptManager(config.data.prompts_dir)
+        systems = {r.stage: r.system for r in client.requests}
+        assert sorted(r.number for r in results) == ["1.0", "1.1", "1.2", "2.0"]
+        assert len(systems[STAGE_STRATEGY]) < len(full.template(full.strategy_name()))
+        assert "**" not in systems[STAGE_DOSSIER]
+        assert (
+            "\n1.1 Deeper question about verification 1.0 one?\n"
+            in (executor.prompts["1.1"])
+        )
+
+    def test_results_hold_handles_to_stored_texts(self):
+        """Test that dossiers and search results are loaded on demand."""
+        client = MockLLMClient(responses={STAGE_DOSSIER: "# Dossier body"})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            orchestrator = ResearchOrchestrator(
+                make_config(temp_dir, depth=1), client, RecordingExecutor()
+            )
+            results = asyncio.run(orchestrator.expand([Candidate("1.0", "Q?", 1)]))
+            orchestrator.close()
+
+            [result] = results
+            assert orchestrator.load_text(result.dossier) == "# Dossier body"
+            assert orchestrator.load_text(result.sources) == "results for 1.0"
+            orchestrator.close()
+
+    def test_saved_dossiers_record_their_sources(self):
+        """Test that each dossier's citations land in the citation store."""
+        client = MockLLMClient(
+            responses={STAGE_DOSSIER: "# Dossier\n\nPer https://example.com/a."}
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            citations = CitationStore(Path(temp_dir) / "citations.sqlite3")
+            orchestrator = ResearchOrchestrator(
+                make_config(temp_dir, depth=1),
+                client,
+                RecordingExecutor(),
+                citations=citations,
+            )
+            asyncio.run(orchestrator.expand([Candidate("1.0", "Q?", 1)]))
+            orchestrator.close()
+            citing = citations.cited_by("https://example.com/a")
+            citations.close()
+
+        assert citing == [f"{temp_dir}:1.0"]
+
+    def test_update_patches_saved_dossier(self):
+        """Test that new results patch sections into a new dossier version."""
+        client = MockLLMClient(
+            responses={
+                STAGE_DOSSIER: "# Dossier\n- **Facts:**\n    - old\n",
+                STAGE_DOSSIER_UPDATE: "- **Facts:**\n    - new\n",
+            }
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            orchestrator = ResearchOrchestrator(
+                make_config(temp_dir, depth=1), client, RecordingExecutor()
+            )
+            asyncio.run(orchestrator.expand([Candidate("1.0", "What is CoVe?", 1)]))
+            first = asyncio.run(orchestrator.update("1.0", "fresh results"))
+            again = asyncio.run(orchestrator.update("1.0", "same results"))
+            dossier = first.dossier_path.read_text(encoding="utf-8")
+            events = [e["event"] for e in orchestrator.storage.read_journal()]
+            orchestrator.close()
+
+        [update, _] = [r for r in client.requests if r.stage == STAGE_DOSSIER_UPDATE]
+        assert (first.version, first.sections) == (2, ["- **Facts:**"])
+        assert (again.version, again.sections) == (2, [])
+        assert dossier == "# Dossier\n- **Facts:**\n    - new\n"
+        assert "1.0 What is CoVe?" in update.prompt
+        assert events[-2:] == ["dossier_updated", "dossier_unchanged"]
+
+    def test_update_without_dossier_fails(self):
+        """Test that only saved dossiers can be updated."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            orchestrator = ResearchOrchestrator(
+                make_config(temp_dir), MockLLMClient(), RecordingExecutor()
+            )
+            with pytest.raises(ValueError, match=r"No dossier 9\.0"):
+                asyncio.run(orchestrator.update("9.0", "results"))
+            orchestrator.close()
+
+    def test_knowledge_index_reuses_and_extends_dossiers(self):
+        """Test that prior dossiers are reused or passed to synthesis."""
+        client = MockLLMClient(responses={STAGE_DOSSIER: "# Fresh dossier"})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            knowledge = KnowledgeIndex(Path(temp_dir) / "kb.sqlite3", 0.9, 0.3)
+            knowledge.add("What is chain of verification?", "# Prior", "old:1.0")
+            executor = RecordingExecutor()
+            orchestrator = ResearchOrchestrator(
+                make_config(temp_dir, depth=1),
+                client,
+                executor,
+                knowledge=knowledge,
+            )
+            results = asyncio.run(
+                orchestrator.expand(
+                    [
+                        Candidate("1.0", "What is chain of verification?", 1),
+                        Candidate("2.0", "Why does chain of verification work?", 1),
+                    ]
+                )
+            )
+            dossiers = {r.number: r.dossier_path.read_text("utf-8") for r in results}
+            events = ResearchStorage(temp_dir).read_journal()
+            indexed = len(knowledge)
+            orchestrator.close()
+            knowledge.close()
+
+        [synthesis] = [r for r in client.requests if r.stage == STAGE_DOSSIER]
+        assert dossiers == {"1.0": "# Prior", "2.0": "# Fresh dossier"}
+        assert list(executor.prompts) == ["2.0"]
+        assert "Prior dossier on a similar question" in synthesis.prompt
+        assert any(e["event"] == "dossier_reused" for e in events)
+        assert indexed == 2
+
+    def test_colliding_child_numbers_get_own_dossiers(self):
+        """Test that follow-ups numbered alike by two parents do not overwrite."""
+        client = MockLLMClient(
+            responses={STAGE_DOSSIER: "# D\n\n## Next-Level Questions\n\n1.1 Same?"}
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            orchestrator = ResearchOrchestrator(
+                make_config(temp_dir, depth=2, beam=4), client, RecordingExecutor()
+            )
+            results = asyncio.run(
+                orchestrator.expand(
+                    [Candidate("1.0", "First?", 1), Candidate("2.0", "Second?", 1)]
+                )
+            )
+            storage = ResearchStorage(temp_dir)
+            dossiers = sorted(p.stem for p in storage.dossier_dir.glob("*.md"))
+            duplicate = orchestrator._spawn_branch(Candidate("1.1", "Again?", 2))
+            events = [e["event"] for e in storage.read_journal()]
+
+        assert sorted(r.number for r in results) == ["1.0", "1.1", "2.0", "2.1"]
+        assert dossiers == ["1.0", "1.1", "2.0", "2.1"]
+        assert duplicate is None
+        assert "candidate_duplicate" in events
+
+    def test_unparseable_decomposition_is_repaired_once(self):
+        """Test that a question list that cannot be parsed gets one repair call."""
+        client = MockLLMClient(
+            responses={
+                STAGE_DECOMPOSITION: "I would research verification first.",
+                STAGE_REPAIR: '{"questions": [{"number": "1.0", "text": "Q?"}]}',
+                STAGE_DOSSIER: "# D",
+            }
+        )
+        client.telemetry = Telemetry()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            orchestrator = ResearchOrchestrator(
+                make_config(temp_dir, depth=1), client, RecordingExecutor()
+            )
+            results = asyncio.run(orchestrator.run("Hallucination"))
+
+        stages = [r.stage for r in client.requests]
+        decomposition = stages.index(STAGE_DECOMPOSITION)
+        snap = client.telemetry.snapshot()
+        assert [r.number for r in results] == ["1.0"]
+        assert stages.count(STAGE_REPAIR) == 1
+        assert client.requests[decomposition].response_schema is not None
+        assert snap.reasks == 1
+        assert snap.parses == {"failed": 1, "structured": 1}
+
+    def test_child_number(self):
+        """Test that follow-up numbers are kept or renumbered under the parent."""
+        assert child_number("1.0", "1.2", 1) == "1.2"
+        assert child_number("1.2", "1.2.3", 1) == "1.2.3"
+        assert child_number("1.2", "1.1.3", 2) == "1.2.2"
+        assert child_number("1.2", "1.2.3.4", 3) == "1.2.3"
+
+    def test_expand_resumes_pruned_candidates(self):
+        """Test that pruned candidates can be expanded later."""
+        client = DossierClient()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            orchestrator = ResearchOrchestrator(
+                make_config(temp_dir, depth=2, beam=1), client, RecordingExecutor()
+            )
+            results = asyncio.run(
+                orchestrator.expand([Candidate("7.1", "Pruned earlier?", 2)])
+            )
+
+        assert [r.number for r in results] == ["7.1"]
+
+    def test_deadline_persists_partial_dossier(self):
+        """Test that a branch cut off by the deadline leaves partial output."""
+        client = MockLLMClient(
+            responses={STAGE_DOSSIER: "partial dossier text " * 20},
+            delay=0.02,
+            chunk_size=8,
+        )
+
+        async def scenario(temp_dir):
+            scheduler = ResearchScheduler(2, Deadline(0.1))
+            orchestrator = ResearchOrchestrator(
+                make_config(temp_dir), client, RecordingExecutor(), scheduler=scheduler
+            )
+            orchestrator.config = orchestrator.config.override(llm={"timeout": 0})
+            return await orchestrator.expand([Candidate("1.0", "Slow?", 1)])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results = asyncio.run(scenario(temp_dir))
+            storage = ResearchStorage(temp_dir)
+            partial = (storage.partial_dir / "1.0.md").read_text(encoding="utf-8")
+            events = [e["event"] for e in storage.read_journal()]
+
+        assert results == []
+        assert partial.startswith("partial dossier")
+        assert "branch_deadline" in events or "branch_cancelled" in events
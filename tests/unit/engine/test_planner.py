@@ -0,0 +1,89 @@
+"""Tests for beam-search recursion planning."""
+
+import pytest
+
+from src.engine.planner import BeamPlanner, Candidate, keywords
+
+
+class TestBeamPlanner:
+    """Test cases for BeamPlanner class."""
+
+    def test_invalid_beam_width(self):
+        """Test that a non-positive beam width is rejected."""
+        with pytest.raises(ValueError, match="Beam width must be positive"):
+            BeamPlanner(0, 5)
+
+    def test_novelty_against_observed_text(self):
+        """Test that covered questions score as less novel."""
+        planner = BeamPlanner(2, 5)
+        planner.observe("Chain-of-Verification reduces hallucination in LLMs")
+
+        assert planner.novelty("How does verification reduce hallucination?") < 1
+        assert planner.novelty("Which retrieval indexes scale best?") == 1.0
+        assert planner.novelty("??") == 0.0
+
+    def test_select_keeps_top_k_and_prunes_rest(self):
+        """Test that only beam_width candidates are kept per level."""
+        planner = BeamPlanner(2, 5)
+        planner.observe("Retrieval augmented generation grounds answers in documents")
+        candidates = [
+            Candidate(
+                "1.1", "How does retrieval augmented generation ground answers?", 2
+            ),
+            Candidate(
+                "1.2", "What does self-consistency sampling cost at inference?", 2
+            ),
+            Candidate("1.3", "Which benchmarks evaluate factual precision?", 2),
+        ]
+
+        kept, pruned = planner.select(candidates)
+
+        assert {s.candidate.number for s in kept} == {"1.2", "1.3"}
+        assert [s.candidate.number for s in pruned] == ["1.1"]
+
+    def test_select_prefers_diverse_siblings(self):
+        """Test that near-duplicate siblings do not both fill the beam."""
+        planner = BeamPlanner(2, 5)
+        candidates = [
+            Candidate("2.1", "How do verification questions detect hallucination?", 3),
+            Candidate(
+                "2.2", "How do verification questions detect hallucination errors?", 3
+            ),
+            Candidate("2.3", "What latency does decoding add?", 3),
+        ]
+
+        kept, pruned = planner.select(candidates)
+
+        kept_numbers = {s.candidate.number for s in kept}
+        assert "2.3" in kept_numbers
+        assert len(pruned) == 1
+        assert pruned[0].candidate.number in {"2.1", "2.2"}
+
+    def test_depth_and_cost_lower_score(self):
+        """Test depth and cost penalties."""
+        planner = BeamPlanner(1, 5)
+        shallow = planner.score(Candidate("1.1", "alpha beta gamma", 1))
+        deep = planner.score(Candidate("1.1.1.1", "alpha beta gamma", 4))
+        verbose = planner.score(Candidate("1.2", "alpha beta gamma " * 500, 1))
+
+        assert shallow.score > deep.score
+        assert shallow.score > verbose.score
+        assert verbose.cost > shallow.cost
+
+    def test_cost_follows_parent_branch_usage(self):
+        """Test that children of expensive branches are estimated as costlier."""
+        planner = BeamPlanner(1, 5)
+        planner.record_cost("1.1", 500)
+        planner.record_cost("1.2", 9000)
+        cheap = Candidate("1.1.1", "Which metrics apply?", 3, parent="1.1")
+        costly = Candidate("1.2.1", "Which metrics apply?", 3, parent="1.2")
+
+        kept, pruned = planner.select([costly, cheap])
+
+        assert planner.estimate_cost(costly) > planner.estimate_cost(cheap)
+        assert kept[0].candidate == cheap
+        assert pruned[0].candidate == costly
+
+    def test_keywords(self):
+        """Test that short words are ignored and case is folded."""
+        assert keywords("An LLM is Big") == frozenset({"llm", "big"})
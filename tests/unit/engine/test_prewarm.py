@@ -0,0 +1,82 @@
+"""Tests for Stage 0/1 pre-warming."""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.core.config import Config
+from src.core.llm_client import LLMError, MockLLMClient
+from src.engine.prompts import STAGE_DECOMPOSITION, STAGE_STRATEGY
+from src.main import run_prewarm, run_session
+
+
+class FailingClient(MockLLMClient):
+    """Mock client that fails the strategy call for one topic."""
+
+    async def stream(self, request, timeout):
+        if "Broken" in request.prompt:
+            raise LLMError("provider rejected the request")
+        async for chunk in super().stream(request, timeout):
+            yield chunk
+
+
+def make_config(temp_dir):
+    """Automatic-mode config writing under a temporary directory."""
+    return Config(mode="automatic").override(
+        llm={"max_retries": 0},
+        data={
+            "output_dir": str(Path(temp_dir) / "output"),
+            "cache_dir": str(Path(temp_dir) / "cache"),
+        },
+        engine={"max_recursion_depth": 1},
+    )
+
+
+class TestPrewarm:
+    """Test cases for pre-warming."""
+
+    def test_session_starts_from_warm_cache(self):
+        """Test that a pre-warmed topic makes no Stage 0/1 calls later."""
+        responses = {STAGE_STRATEGY: "Strategy", STAGE_DECOMPOSITION: "1.0 Q?"}
+        warm_client = MockLLMClient(responses=responses, default="text")
+        session_client = MockLLMClient(responses=responses, default="text")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = make_config(temp_dir)
+            report = asyncio.run(run_prewarm(config, warm_client, ["A > B", "A > C"]))
+            results = asyncio.run(run_session(config, session_client, "A > B"))
+
+        stages = {request.stage for request in session_client.requests}
+        assert report.warmed == 2
+        assert report.questions == 2
+        # Both strategies are identical, so the second decomposition is cached.
+        assert len(warm_client.requests) == 3
+        assert [r.number for r in results] == ["1.0"]
+        assert STAGE_STRATEGY not in stages
+        assert STAGE_DECOMPOSITION not in stages
+
+    def test_failed_topics_are_reported(self):
+        """Test that one failing topic does not stop the others."""
+        client = FailingClient(responses={STAGE_DECOMPOSITION: "1.0 Q?"})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            report = asyncio.run(
+                run_prewarm(make_config(temp_dir), client, ["Broken", "Fine"])
+            )
+
+        assert report.failed == ["Broken"]
+        assert report.warmed == 1
+
+    def test_rejects_non_positive_concurrency(self):
+        """Test that concurrency must be positive."""
+        with (
+            tempfile.TemporaryDirectory() as temp_dir,
+            pytest.raises(ValueError, match="must be positive"),
+        ):
+            asyncio.run(
+                run_prewarm(
+                    make_config(temp_dir), MockLLMClient(), ["A"], concurrency=0
+                )
+            )
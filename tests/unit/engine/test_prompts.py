@@ -0,0 +1,153 @@
+"""Tests for prompt template management."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.core.config import DataConfig
+from src.engine.prompts import (
+    PROMPT_FILES,
+    STAGE_DECOMPOSITION,
+    STAGE_DOSSIER,
+    STAGE_SEARCH,
+    VARIANT_COMPACT,
+    VARIANT_FULL,
+    VARIANT_MINIMAL,
+    PromptManager,
+    compact_prompt,
+)
+
+
+class TestPromptManager:
+    """Test cases for PromptManager class."""
+
+    def test_library_files_exist(self):
+        """Test that every mapped stage prompt ships with the repository."""
+        prompts = PromptManager(DataConfig().prompts_dir)
+
+        for name in PROMPT_FILES:
+            assert prompts.template(name)
+
+    def test_render_xml_variables(self):
+        """Test that XML-style variables are substituted."""
+        prompts = PromptManager(DataConfig().prompts_dir)
+
+        text = prompts.render(
+            STAGE_DOSSIER,
+            HIERARCHICAL_QUERY='1.1 "RAG" basics',
+            OUTPUT_LANGUAGE="English",
+        )
+
+        assert '<var n="HIERARCHICAL_QUERY" v="1.1 \'RAG\' basics" />' in text
+        assert '<var n="OUTPUT_LANGUAGE" v="English" />' in text
+
+    def test_render_brace_variables(self):
+        """Test that brace placeholders are substituted and unknown ones kept."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / PROMPT_FILES["strategy:market"]
+            path.write_text("Analyze {TOPIC} for {AUDIENCE}", encoding="utf-8")
+            prompts = PromptManager(temp_dir)
+
+            text = prompts.render(prompts.strategy_name("market"), TOPIC="RAG")
+
+        assert text == "Analyze RAG for {AUDIENCE}"
+
+    def test_templates_are_cached(self):
+        """Test that a template is read from disk only once."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / PROMPT_FILES[STAGE_DECOMPOSITION]
+            path.write_text("first", encoding="utf-8")
+            prompts = PromptManager(temp_dir)
+            assert prompts.template(STAGE_DECOMPOSITION) == "first"
+            path.write_text("second", encoding="utf-8")
+
+            assert prompts.template(STAGE_DECOMPOSITION) == "first"
+
+    def test_unknown_and_missing_prompts(self):
+        """Test errors for unknown names and missing files."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            prompts = PromptManager(temp_dir)
+
+            with pytest.raises(ValueError, match="Unknown prompt"):
+                prompts.template("stage9")
+            with pytest.raises(ValueError, match="Prompt file not found"):
+                prompts.template(STAGE_DOSSIER)
+
+
+class TestCompactPrompts:
+    """Test cases for compact prompt variants."""
+
+    def test_compact_prompt_minimizes_markdown(self):
+        """Test that formatting is dropped but output-format blocks survive."""
+        text = (
+            "# **Title**\n\n"
+            "Write   a **very** short answer to every single question asked.\n"
+            "---\n"
+            "    - **Nested** item\n"
+            "Write a **very** short answer to every single question asked.\n"
+            "```\n"
+            "    **kept** verbatim\n"
+            "```\n"
+            "| **A** | B |\n"
+            "[**INSERT QUERY**]\n"
+        )
+
+        assert compact_prompt(text) == (
+            "# **Title**\n"
+            "Write a very short answer to every single question asked.\n"
+            "  - Nested item\n"
+            "```\n"
+            "    **kept** verbatim\n"
+            "```\n"
+            "| **A** | B |\n"
+            "[**INSERT QUERY]\n"
+        )
+
+    def test_strip_examples(self):
+        """Test that example lines and blocks go only when asked."""
+        text = (
+            "Rule one.\n"
+            "* **Example:** a sample.\n"
+            "*Пример: образец*\n"
+            "<Examples>\nLong sample\n</Examples>\n"
+            "Output Example for Stage 1:\n"
+        )
+
+        assert "Example:" in compact_prompt(text)
+        assert compact_prompt(text, strip_examples=True) == (
+            "Rule one.\nOutput Example for Stage 1:\n"
+        )
+
+    def test_library_variants_are_smaller(self):
+        """Test that every shipped prompt gets cheaper with each variant."""
+        prompts = PromptManager(DataConfig().prompts_dir)
+
+        for name in PROMPT_FILES:
+            full = prompts.token_count(name, VARIANT_FULL)
+            compact = prompts.token_count(name, VARIANT_COMPACT)
+            assert compact < full
+            assert prompts.token_count(name, VARIANT_MINIMAL) <= compact
+
+    def test_profile_selects_rendered_variant(self):
+        """Test that the profile decides which variant is rendered."""
+        prompts = PromptManager(DataConfig().prompts_dir, VARIANT_MINIMAL)
+
+        search = prompts.render(STAGE_SEARCH, HIERARCHICAL_QUERY="1.1 RAG")
+        dossier = prompts.render(STAGE_DOSSIER, HIERARCHICAL_QUERY="1.1 RAG")
+
+        assert prompts.variant(STAGE_DECOMPOSITION) == VARIANT_COMPACT
+        assert prompts.variant(prompts.strategy_name()) == VARIANT_MINIMAL
+        assert "\n1.1 RAG\n" in search
+        assert "[**" not in search
+        assert '<var n="HIERARCHICAL_QUERY" v="1.1 RAG" />' in dossier
+        assert prompts.template(STAGE_SEARCH, VARIANT_MINIMAL) is prompts.template(
+            STAGE_SEARCH, VARIANT_MINIMAL
+        )
+
+    def test_unknown_profile_and_variant(self):
+        """Test errors for unknown profiles and variants."""
+        with pytest.raises(ValueError, match="Unknown prompt profile"):
+            PromptManager(DataConfig().prompts_dir, "tiny")
+        with pytest.raises(ValueError, match="Unknown prompt variant"):
+            PromptManager(DataConfig().prompts_dir).template(STAGE_SEARCH, "tiny")
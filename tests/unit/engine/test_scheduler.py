@@ -0,0 +1,376 @@
+"""Tests for research task scheduling."""
+
+import asyncio
+
+import pytest
+
+from src.core.config import EngineConfig, LLMConfig
+from src.core.deadline import Deadline, DeadlineExceededError
+from src.core.llm_client import LLMRequest, MockLLMClient
+from src.engine.scheduler import FairShareScheduler, ProviderPool, ResearchScheduler
+
+
+class TestResearchScheduler:
+    """Test cases for ResearchScheduler class."""
+
+    def test_from_config_builds_session_deadline(self):
+        """Test that the session scheduler takes its limits from the config."""
+        config = EngineConfig(concurrent_queries=4, session_timeout=120)
+
+        scheduler = ResearchScheduler.from_config(config)
+
+        assert scheduler.concurrent_queries == 4
+        assert scheduler.deadline is not None
+        assert 119 < scheduler.deadline.remaining() <= 120
+
+    def test_invalid_concurrency(self):
+        """Test that a non-positive slot count is rejected."""
+        with pytest.raises(ValueError, match="Concurrent queries must be positive"):
+            ResearchScheduler(0)
+
+    def test_run_llm_respects_concurrency_limit(self):
+        """Test that no more than concurrent_queries calls run at once."""
+
+        async def scenario():
+            scheduler = ResearchScheduler(2)
+            peak = 0
+
+            async def call():
+                nonlocal peak
+                peak = max(peak, scheduler.in_flight)
+                await asyncio.sleep(0.01)
+                return "ok"
+
+            results = await asyncio.gather(*(scheduler.run_llm(call) for _ in range(6)))
+            return results, peak, scheduler.in_flight
+
+        results, peak, in_flight = asyncio.run(scenario())
+
+        assert results == ["ok"] * 6
+        assert peak == 2
+        assert in_flight == 0
+
+    def test_parked_task_does_not_block_llm_work(self):
+        """Test that LLM work completes while a manual task stays parked."""
+
+        async def scenario():
+            scheduler = ResearchScheduler(1)
+            order = []
+
+            async def manual_branch():
+                result = await scheduler.park("search-1")
+                order.append(f"manual:{result}")
+
+            async def llm_branch(name):
+                async def call():
+                    await asyncio.sleep(0)
+                    order.append(name)
+
+                await scheduler.run_llm(call)
+
+            scheduler.spawn(manual_branch())
+            scheduler.spawn(llm_branch("stage0"))
+            scheduler.spawn(llm_branch("stage1"))
+            await asyncio.sleep(0.01)
+            assert scheduler.parked == ["search-1"]
+            assert scheduler.resolve("search-1", "pasted")
+            await scheduler.join()
+            return order, scheduler.pending_tasks
+
+        order, pending = asyncio.run(scenario())
+
+        assert order == ["stage0", "stage1", "manual:pasted"]
+        assert pending == 0
+
+    def test_park_returns_same_future_and_resolve_unknown(self):
+        """Test parking is idempotent and unknown keys are not resolved."""
+
+        async def scenario():
+            scheduler = ResearchScheduler(1)
+            first = scheduler.park("a")
+            second = scheduler.park("a")
+            return first is second, scheduler.resolve("missing", "x")
+
+        same, resolved = asyncio.run(scenario())
+
+        assert same is True
+        assert resolved is False
+
+    def test_cancelled_park_is_dropped(self):
+        """Test that cancelling a parked future removes it from pending keys."""
+
+        async def scenario():
+            scheduler = ResearchScheduler(1)
+            first = scheduler.park("a")
+            first.cancel()
+            await asyncio.sleep(0)
+            dropped = scheduler.parked
+            second = scheduler.park("a")
+            return dropped, second is not first, scheduler.parked
+
+        dropped, fresh, parked = asyncio.run(scenario())
+
+        assert dropped == []
+        assert fresh is True
+        assert parked == ["a"]
+
+
+class TestSchedulerDeadline:
+    """Test cases for deadline enforcement in ResearchScheduler."""
+
+    def test_spawn_skips_branch_that_cannot_finish(self):
+        """Test that branches estimated past the deadline are not started."""
+
+        async def scenario():
+            scheduler = ResearchScheduler(1, Deadline(10))
+            started = []
+
+            async def branch(name):
+                started.append(name)
+
+            fits = scheduler.spawn(branch("short"), estimate=1)
+            skipped = scheduler.spawn(branch("long"), estimate=60)
+            await scheduler.join()
+            return fits, skipped, started, scheduler.skipped
+
+        fits, skipped, started, skipped_count = asyncio.run(scenario())
+
+        assert fits is not None
+        assert skipped is None
+        assert started == ["short"]
+        assert skipped_count == 1
+
+    def test_run_llm_rejects_call_past_deadline(self):
+        """Test that LLM calls that cannot fit raise DeadlineExceededError."""
+
+        async def scenario():
+            scheduler = ResearchScheduler(1, Deadline(5))
+
+            async def call():
+                return "never"
+
+            await scheduler.run_llm(call, estimate=30)
+
+        with pytest.raises(DeadlineExceededError):
+            asyncio.run(scenario())
+
+    def test_run_until_deadline_cancels_and_persists(self):
+        """Test in-flight work is cancelled at the deadline with partial output."""
+
+        async def scenario():
+            scheduler = ResearchScheduler(2, Deadline(0.05))
+            buffer = []
+            persisted = []
+
+            async def slow_branch():
+                for i in range(100):
+                    buffer.append(str(i))
+                    await asyncio.sleep(0.01)
+
+            async def manual_branch():
+                await scheduler.park("manual")
+
+            scheduler.spawn(
+                slow_branch(), on_cancel=lambda: persisted.append("".join(buffer))
+            )
+            scheduler.spawn(manual_branch())
+            finished = await scheduler.run_until_deadline()
+            return finished, persisted, scheduler.pending_tasks, scheduler.parked
+
+        finished, persisted, pending, parked = asyncio.run(scenario())
+
+        assert finished is False
+        assert len(persisted) == 1
+        assert persisted[0].startswith("01")
+        assert pending == 0
+        assert parked == []
+
+    def test_run_until_deadline_completes_early(self):
+        """Test that sessions finishing in time report success."""
+
+        async def scenario():
+            scheduler = ResearchScheduler(1, Deadline(5))
+
+            async def branch():
+                await asyncio.sleep(0)
+
+            scheduler.spawn(branch())
+            return await scheduler.run_until_deadline()
+
+        assert asyncio.run(scenario()) is True
+        assert asyncio.run(ResearchScheduler(1).run_until_deadline()) is True
+
+    def test_run_until_deadline_with_call_timing_out_at_deadline(self):
+        """Test that a branch ending exactly at the deadline does not stall."""
+
+        async def scenario():
+            scheduler = ResearchScheduler(2, Deadline(0.1))
+            client = MockLLMClient(default="x" * 640, delay=0.05, chunk_size=64)
+            outcomes = []
+
+            async def branch():
+                try:
+                    await client.generate(
+                        LLMRequest(prompt="q", stage="dossier"),
+                        deadline=scheduler.deadline,
+                    )
+                except DeadlineExceededError:
+                    outcomes.append("deadline")
+
+            scheduler.spawn(branch())
+            await scheduler.run_until_deadline()
+            return outcomes, scheduler.pending_tasks
+
+        outcomes, pending = asyncio.run(scenario())
+
+        assert outcomes == ["deadline"]
+        assert pending == 0
+
+
+async def hold(pool, name, order, seconds=0.01):
+    """Take one slot of the pool, record the grant and hold it briefly."""
+    async with pool.slot(name):
+        order.append(name)
+        await asyncio.sleep(seconds)
+
+
+class TestFairShareScheduler:
+    """Test cases for FairShareScheduler and ProviderPool."""
+
+    def test_slots_follow_session_weights(self):
+        """Test that a busy session with twice the weight gets twice the calls."""
+
+        async def scenario():
+            pool = ProviderPool("mock", 1)
+            pool.register("heavy", weight=2)
+            pool.register("light", weight=1)
+            order = []
+            await asyncio.gather(
+                *(hold(pool, name, order) for name in ["heavy", "light"] * 6)
+            )
+            return order
+
+        order = asyncio.run(scenario())
+
+        assert order[:9].count("heavy") == 6
+        assert order[:9].count("light") == 3
+
+    def test_quota_caps_session_slots(self):
+        """Test that a session never holds more slots than its quota."""
+
+        async def scenario():
+            pool = ProviderPool("mock", 4)
+            pool.register("capped", quota=1)
+            pool.register("free")
+            peak = 0
+
+            async def call(name):
+                nonlocal peak
+                async with pool.slot(name):
+                    if name == "capped":
+                        peak = max(peak, pool._sessions["capped"].in_flight)
+                    await asyncio.sleep(0.01)
+
+            await asyncio.gather(*(call(n) for n in ["capped", "free"] * 4))
+            return peak, pool.in_flight
+
+        peak, in_flight = asyncio.run(scenario())
+
+        assert peak == 1
+        assert in_flight == 0
+
+    def test_late_session_is_not_starved(self):
+        """Test that a session joining a busy pool is served next."""
+
+        async def scenario():
+            pool = ProviderPool("mock", 1)
+            pool.register("deep")
+            order = []
+            deep = [asyncio.create_task(hold(pool, "deep", order)) for _ in range(8)]
+            await asyncio.sleep(0.025)
+            pool.register("late")
+            await hold(pool, "late", order)
+            await asyncio.gather(*deep)
+            return order
+
+        order = asyncio.run(scenario())
+
+        assert order.index("late") <= 4
+
+    def test_cancelled_waiter_releases_nothing(self):
+        """Test that cancelling a queued call leaves the pool consistent."""
+
+        async def scenario():
+            pool = ProviderPool("mock", 1)
+            pool.register("a")
+            order = []
+            first = asyncio.create_task(hold(pool, "a", order, 0.02))
+            queued = asyncio.create_task(hold(pool, "a", order))
+            await asyncio.sleep(0.005)
+            queued.cancel()
+            await first
+            await hold(pool, "a", order)
+            return order, pool.in_flight, pool.waiting("a")
+
+        order, in_flight, waiting = asyncio.run(scenario())
+
+        assert order == ["a", "a"]
+        assert in_flight == 0
+        assert waiting == 0
+
+    def test_requests_per_minute_spaces_calls(self):
+        """Test that the rate budget spreads call starts."""
+
+        async def scenario():
+            pool = ProviderPool("mock", 4, requests_per_minute=1200)
+            pool.register("a")
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            await asyncio.gather(*(hold(pool, "a", [], 0) for _ in range(3)))
+            return loop.time() - started
+
+        assert asyncio.run(scenario()) >= 0.09
+
+    def test_sessions_share_provider_budget(self):
+        """Test that two session schedulers stay within one provider limit."""
+
+        async def scenario():
+            fair = FairShareScheduler.from_config(
+                LLMConfig(provider="mock", max_concurrent=2)
+            )
+            schedulers = [
+                ResearchScheduler(3, share=fair.session(name, "mock", quota=3))
+                for name in ("one", "two")
+            ]
+            pool = fair.pool("mock")
+            peak = 0
+
+            async def call():
+                nonlocal peak
+                peak = max(peak, pool.in_flight)
+                await asyncio.sleep(0.01)
+                return "ok"
+
+            await asyncio.gather(
+                *(s.run_llm(call) for s in schedulers for _ in range(4))
+            )
+            for scheduler in schedulers:
+                scheduler.share.close()
+            return peak, pool.sessions
+
+        peak, sessions = asyncio.run(scenario())
+
+        assert peak == 2
+        assert sessions == []
+
+    def test_invalid_registration(self):
+        """Test that bad weights, quotas and duplicate names are rejected."""
+        pool = FairShareScheduler(default_concurrency=1).pool("x")
+        pool.register("a")
+
+        with pytest.raises(ValueError, match="weight must be positive"):
+            pool.register("b", weight=0)
+        with pytest.raises(ValueError, match="quota must be positive"):
+            pool.register("b", quota=0)
+        with pytest.raises(ValueError, match="already registered"):
+            pool.register("a")
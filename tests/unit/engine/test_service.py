@@ -0,0 +1,226 @@
+"""Tests for the research daemon and its HTTP API."""
+
+import asyncio
+import contextlib
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.core.config import Config
+from src.core.llm_client import MockLLMClient
+from src.engine.prompts import STAGE_DECOMPOSITION, STAGE_DOSSIER
+from src.engine.service import ResearchService, run_service
+
+
+def make_service(temp_dir, max_jobs=2, delay=0.0):
+    """Automatic-mode service with a mock client, writing under temp_dir."""
+    config = Config(mode="automatic").override(
+        data={
+            "output_dir": str(Path(temp_dir) / "output"),
+            "cache_dir": str(Path(temp_dir) / "cache"),
+        },
+        engine={"max_recursion_depth": 1},
+    )
+    client = MockLLMClient(
+        responses={STAGE_DECOMPOSITION: "1.0 What is CoVe?", STAGE_DOSSIER: "# D"},
+        default="text",
+        delay=delay,
+    )
+    return ResearchService(config, client, max_jobs=max_jobs)
+
+
+async def http(socket_path, method, target, body=None):
+    """Send one request over the Unix socket; return status and body."""
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nHost: x\r\n"
+        f"Content-Length: {len(data)}\r\n\r\n".encode()
+        + data
+    )
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), payload
+
+
+class TestResearchService:
+    """Test cases for ResearchService class."""
+
+    def test_job_runs_in_own_directory(self):
+        """Test that a submitted job finishes and writes under jobs/<id>."""
+
+        async def scenario(temp_dir):
+            service = make_service(temp_dir)
+            job = service.submit("CoVe")
+            await service.wait(job.id)
+            return job
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            job = asyncio.run(scenario(temp_dir))
+            dossier = job.output_dir / "dossiers" / "1.0.md"
+
+            assert job.state == "finished"
+            assert job.dossiers == 1
+            assert job.output_dir.parent.name == "jobs"
+            assert dossier.read_text(encoding="utf-8") == "# D"
+
+    def test_max_jobs_queues_the_rest(self):
+        """Test that jobs beyond max_jobs wait for a free slot."""
+
+        async def scenario(temp_dir):
+            service = make_service(temp_dir, max_jobs=1, delay=0.05)
+            first = service.submit("first")
+            second = service.submit("second")
+            await asyncio.sleep(0.02)
+            states = (first.state, second.state)
+            await service.wait(second.id)
+            return states, second.state
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            states, final = asyncio.run(scenario(temp_dir))
+
+        assert states == ("running", "queued")
+        assert final == "finished"
+
+    def test_stream_yields_journal_until_done(self):
+        """Test that streaming replays journal events and ends with the job."""
+
+        async def scenario(temp_dir):
+            service = make_service(temp_dir, delay=0.01)
+            job = service.submit("CoVe")
+            return [event["event"] async for event in service.stream(job.id)]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            events = asyncio.run(scenario(temp_dir))
+
+        assert events[0] == "session_started"
+        assert "dossier_saved" in events
+        assert events[-1] == "job_finished"
+
+    def test_close_cancels_jobs(self):
+        """Test that closing the service cancels queued jobs."""
+
+        async def scenario(temp_dir):
+            service = make_service(temp_dir, max_jobs=1, delay=0.05)
+            service.submit("first")
+            queued = service.submit("second")
+            await asyncio.sleep(0)
+            await service.close()
+            return queued.state
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            assert asyncio.run(scenario(temp_dir)) == "cancelled"
+
+    def test_job_can_use_another_model(self):
+        """Test that a job picks its own provider and model through the factory."""
+        created = []
+
+        def factory(llm):
+            created.append((llm.provider, llm.model))
+            return MockLLMClient(llm, responses={STAGE_DECOMPOSITION: "1.0 Q?"})
+
+        async def scenario(temp_dir):
+            service = make_service(temp_dir)
+            service.client_factory = factory
+            job = service.submit("CoVe", provider="openai", model="gpt-4o", priority=2)
+            service.submit("again", provider="openai", model="gpt-4o")
+            await service.wait(job.id)
+            return job, service.fair.pool("openai").sessions
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            job, sessions = asyncio.run(scenario(temp_dir))
+
+        assert job.state == "finished"
+        assert job.to_dict()["model"] == "gpt-4o"
+        assert job.priority == 2
+        assert created == [("openai", "gpt-4o")]
+        assert job.id not in sessions
+
+    def test_rejects_invalid_submissions(self):
+        """Test that empty topics and unknown strategists are rejected."""
+
+        async def scenario(temp_dir):
+            service = make_service(temp_dir)
+            with pytest.raises(ValueError, match="Topic must not be empty"):
+                service.submit(" ")
+            with pytest.raises(ValueError, match="Unknown prompt"):
+                service.submit("CoVe", "astrologer")
+            with pytest.raises(ValueError, match="Priority must be positive"):
+                service.submit("CoVe", priority=0)
+            with pytest.raises(ValueError, match="No client for openai/gpt-4o"):
+                service.submit("CoVe", provider="openai", model="gpt-4o")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            asyncio.run(scenario(temp_dir))
+
+
+class TestServiceAPI:
+    """Test cases for the HTTP API over a Unix socket."""
+
+    def test_submit_status_and_stream(self):
+        """Test the job lifecycle through the HTTP endpoints."""
+
+        async def scenario(temp_dir):
+            socket_path = str(Path(temp_dir) / "ai.sock")
+            service = make_service(temp_dir)
+            server = asyncio.create_task(run_service(service, socket_path=socket_path))
+            while not Path(socket_path).exists():
+                await asyncio.sleep(0.01)
+            try:
+                status, body = await http(socket_path, "POST", "/jobs", {"topic": "X"})
+                job_id = json.loads(body)["id"]
+                stream = await http(socket_path, "GET", f"/jobs/{job_id}/stream")
+                job = await http(socket_path, "GET", f"/jobs/{job_id}")
+                listing = await http(socket_path, "GET", "/jobs")
+                metrics = await http(socket_path, "GET", "/metrics")
+            finally:
+                server.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await server
+            return status, stream, job, listing, metrics, Path(socket_path).exists()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            status, stream, job, listing, metrics, leftover = asyncio.run(
+                scenario(temp_dir)
+            )
+
+        events = [json.loads(line) for line in stream[1].splitlines()]
+        assert status == 202
+        assert stream[0] == 200
+        assert events[-1]["event"] == "job_finished"
+        assert json.loads(job[1])["state"] == "finished"
+        assert len(json.loads(listing[1])["jobs"]) == 1
+        assert b"airesearcher_llm_requests_total" in metrics[1]
+        assert not leftover
+
+    def test_errors(self):
+        """Test that bad requests get 400 and unknown routes get 404."""
+
+        async def scenario(temp_dir):
+            socket_path = str(Path(temp_dir) / "ai.sock")
+            service = make_service(temp_dir)
+            api_server = asyncio.create_task(
+                run_service(service, socket_path=socket_path)
+            )
+            while not Path(socket_path).exists():
+                await asyncio.sleep(0.01)
+            try:
+                return [
+                    (await http(socket_path, "POST", "/jobs", {"no": "topic"}))[0],
+                    (await http(socket_path, "POST", "/jobs", ["x"]))[0],
+                    (await http(socket_path, "GET", "/jobs/missing"))[0],
+                    (await http(socket_path, "GET", "/jobs/missing/stream"))[0],
+                    (await http(socket_path, "DELETE", "/jobs"))[0],
+                ]
+            finally:
+                api_server.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await api_server
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            statuses = asyncio.run(scenario(temp_dir))
+
+        assert statuses == [400, 400, 404, 404, 404]
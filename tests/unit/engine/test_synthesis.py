@@ -0,0 +1,173 @@
+"""Tests for map-reduce dossier synthesis."""
+
+import asyncio
+import tempfile
+
+import pytest
+
+from src.core.config import DataConfig
+from src.core.llm_client import MockLLMClient
+from src.data.cache import ResponseCache
+from src.data.citations import CitationStore
+from src.engine.prompts import STAGE_DOSSIER, PromptManager
+from src.engine.scheduler import ResearchScheduler
+from src.engine.synthesis import (
+    SOURCES_HEADING,
+    STAGE_DOSSIER_MAP,
+    STAGE_DOSSIER_UPDATE,
+    MapReduceSynthesizer,
+    chunk_results,
+)
+
+
+def make_synthesizer(client, cache=None, chunk_chars=100, concurrency=2):
+    """Build a synthesizer over the repository prompt library."""
+    return MapReduceSynthesizer(
+        client,
+        PromptManager(DataConfig().prompts_dir),
+        ResearchScheduler(concurrency),
+        cache=cache,
+        chunk_chars=chunk_chars,
+    )
+
+
+class TestChunkResults:
+    """Test cases for chunk_results."""
+
+    def test_packs_paragraphs_up_to_limit(self):
+        """Test that paragraphs are packed greedily without exceeding the limit."""
+        results = ["a" * 40 + "\n\n" + "b" * 40, "c" * 40]
+
+        chunks = chunk_results(results, 90)
+
+        assert chunks == ["a" * 40 + "\n\n" + "b" * 40, "c" * 40]
+
+    def test_splits_oversized_paragraphs(self):
+        """Test that a paragraph longer than the limit is hard-split."""
+        assert chunk_results(["x" * 25], 10) == ["x" * 10, "x" * 10, "x" * 5]
+
+    def test_appending_results_keeps_leading_chunks(self):
+        """Test that new results only change trailing chunks."""
+        results = ["p" * 60, "q" * 60]
+
+        before = chunk_results(results, 100)
+        after = chunk_results([*results, "r" * 60], 100)
+
+        assert after[: len(before) - 1] == before[:-1]
+
+    def test_invalid_chunk_size(self):
+        """Test that a non-positive chunk size is rejected."""
+        with pytest.raises(ValueError, match="Chunk size must be positive"):
+            chunk_results(["x"], 0)
+
+
+class TestMapReduceSynthesizer:
+    """Test cases for MapReduceSynthesizer class."""
+
+    def test_small_results_skip_map_step(self):
+        """Test that results fitting one chunk go straight to the dossier call."""
+        client = MockLLMClient(responses={STAGE_DOSSIER: "# Dossier"})
+
+        dossier = asyncio.run(
+            make_synthesizer(client).synthesize("1.1 RAG", ["short result"])
+        )
+
+        assert dossier == "# Dossier"
+        assert [r.stage for r in client.requests] == [STAGE_DOSSIER]
+        assert "short result" in client.requests[0].prompt
+        assert 'v="1.1 RAG"' in client.requests[0].system
+
+    def test_citations_are_sent_as_references(self):
+        """Test that repeated URLs reach the prompt once and come back as links."""
+        url = "https://example.com/a-very-long/report-path"
+        client = MockLLMClient(responses={STAGE_DOSSIER: "Adoption grew [S1]."})
+        results = [f"Fact one ({url}). Fact two [Report]({url}#p2)."]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            citations = CitationStore(f"{temp_dir}/citations.sqlite3")
+            synthesizer = make_synthesizer(client, chunk_chars=1000)
+            synthesizer.citations = citations
+            dossier = asyncio.run(synthesizer.synthesize("1.1 RAG", results))
+            citations.close()
+
+        prompt = client.requests[0].prompt
+        assert prompt.count(url) == 1
+        assert "Fact one ([S1]). Fact two Report [S1]." in prompt
+        assert f"{SOURCES_HEADING}\n[S1] {url}" in prompt
+        assert dossier == f"Adoption grew [S1]({url})."
+
+    def test_update_sends_dossier_and_new_results_only(self):
+        """Test that an update asks for changed sections of the dossier."""
+        client = MockLLMClient(responses={STAGE_DOSSIER_UPDATE: "- **Facts:**\n"})
+
+        patch = asyncio.run(
+            make_synthesizer(client).update(
+                "1.1 RAG", "# Dossier\n- **Facts:**\n", ["fresh result"]
+            )
+        )
+
+        [request] = client.requests
+        assert patch == "- **Facts:**\n"
+        assert request.stage == STAGE_DOSSIER_UPDATE
+        assert "Current dossier:\n\n# Dossier" in request.prompt
+        assert request.prompt.endswith("New search findings:\n\nfresh result")
+
+    def test_large_results_are_mapped_then_reduced(self):
+        """Test that each chunk is summarized before the final dossier."""
+        client = MockLLMClient(
+            responses={STAGE_DOSSIER_MAP: "- fact", STAGE_DOSSIER: "# Dossier"}
+        )
+        results = [f"{i}" * 80 for i in range(4)]
+
+        dossier = asyncio.run(make_synthesizer(client).synthesize("1.2", results))
+
+        stages = [r.stage for r in client.requests]
+        assert dossier == "# Dossier"
+        assert stages.count(STAGE_DOSSIER_MAP) == 4
+        assert stages[-1] == STAGE_DOSSIER
+        assert "- fact" in client.requests[-1].prompt
+
+    def test_chunk_summaries_are_cached(self):
+        """Test that re-synthesis only summarizes new chunks."""
+        client = MockLLMClient(
+            responses={STAGE_DOSSIER_MAP: "- fact", STAGE_DOSSIER: "# Dossier"}
+        )
+        results = ["a" * 80, "b" * 80]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            synthesizer = make_synthesizer(client, ResponseCache(temp_dir))
+            asyncio.run(synthesizer.synthesize("1.3", results))
+            client.requests.clear()
+            asyncio.run(synthesizer.synthesize("1.3", [*results, "c" * 80]))
+
+        stages = [r.stage for r in client.requests]
+        assert stages.count(STAGE_DOSSIER_MAP) == 1
+        assert "c" * 80 in client.requests[0].prompt
+
+    def test_non_shrinking_summaries_stop_reducing(self):
+        """Test that the reduce loop terminates when summaries do not shrink."""
+        client = MockLLMClient(
+            responses={STAGE_DOSSIER_MAP: "s" * 90, STAGE_DOSSIER: "# Dossier"}
+        )
+        results = ["a" * 90, "b" * 90]
+
+        dossier = asyncio.run(make_synthesizer(client).synthesize("1.4", results))
+
+        assert dossier == "# Dossier"
+        assert [r.stage for r in client.requests].count(STAGE_DOSSIER_MAP) == 2
+
+    def test_non_shrinking_reduce_input_is_capped(self, caplog):
+        """Test that the fallback reduce prompt stays within one chunk."""
+        client = MockLLMClient(
+            responses={STAGE_DOSSIER_MAP: "s" * 95, STAGE_DOSSIER: "# Dossier"}
+        )
+        results = ["a" * 95, "b" * 95, "c" * 95]
+
+        asyncio.run(make_synthesizer(client).synthesize("1.5", results))
+
+        reduce_prompt = client.requests[-1].prompt
+        findings = reduce_prompt.split("\n\n", 1)[1]
+        assert client.requests[-1].stage == STAGE_DOSSIER
+        assert len(findings) <= 100
+        assert findings.count("s") > 0
+        assert "not shrinking" in caplog.text
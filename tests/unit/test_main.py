@@ -0,0 +1,283 @@
+"""Tests for the command line interface."""
+
+import asyncio
+import io
+import tempfile
+from pathlib import Path
+
+from click.testing import CliRunner
+from rich.console import Console
+
+from src.core.cassette import RecordingLLMClient, ReplayLLMClient
+from src.core.config import Config, ConfigManager
+from src.core.llm_client import MockLLMClient
+from src.data.citations import CitationStore
+from src.engine.prompts import STAGE_DECOMPOSITION, STAGE_DOSSIER, STAGE_STRATEGY
+from src.engine.synthesis import STAGE_DOSSIER_UPDATE
+from src.main import build_client, main, run_session, run_update
+
+
+def make_config(temp_dir):
+    """Automatic-mode config writing under a temporary directory."""
+    return Config(mode="automatic").override(
+        data={
+            "output_dir": str(Path(temp_dir) / "output"),
+            "cache_dir": str(Path(temp_dir) / "cache"),
+        },
+        engine={"max_recursion_depth": 1},
+    )
+
+
+class WarmingClient(MockLLMClient):
+    """Mock client that notes when it connected relative to its calls."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls_before_connect = None
+
+    async def connect(self):
+        self.calls_before_connect = len(self.requests)
+
+
+class TestRunSession:
+    """Test cases for run_session."""
+
+    def test_session_warms_up_before_first_call(self):
+        """Test that the connection is set up before Stage 0 and TTFT reported."""
+        client = WarmingClient(responses={STAGE_DECOMPOSITION: "1.0 Q?"}, default="x")
+        cold = WarmingClient(default="x")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = make_config(temp_dir)
+            asyncio.run(run_session(config, client, "CoVe"))
+            asyncio.run(
+                run_session(config.override(llm={"warm_up": False}), cold, "CoVe")
+            )
+
+        assert client.calls_before_connect == 0
+        assert client.telemetry is not None
+        assert client.telemetry.first_ttft is not None
+        assert cold.calls_before_connect is None
+
+    def test_update_patches_session_dossier(self):
+        """Test that run_update versions a dossier written by a session."""
+        client = MockLLMClient(
+            responses={
+                STAGE_DECOMPOSITION: "1.0 What is CoVe?",
+                STAGE_DOSSIER: "- **Facts:**\n    - old (https://example.com/a)\n",
+                STAGE_DOSSIER_UPDATE: "- **Facts:**\n    - new [S1]\n",
+            },
+            default="x",
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = make_config(temp_dir)
+            asyncio.run(run_session(config, client, "CoVe"))
+            outcome = asyncio.run(run_update(config, client, "1.0", "new results"))
+            dossier = outcome.dossier_path.read_text(encoding="utf-8")
+
+        assert outcome.version == 2
+        assert dossier == "- **Facts:**\n    - new [S1](https://example.com/a)\n"
+
+    def test_automatic_session_with_dashboard(self):
+        """Test a full automatic session with the dashboard running alongside."""
+        client = MockLLMClient(
+            responses={
+                STAGE_STRATEGY: "Strategy",
+                STAGE_DECOMPOSITION: "1.0 What is CoVe?",
+                STAGE_DOSSIER: "# Dossier",
+            },
+            default="search results",
+        )
+        console = Console(file=io.StringIO(), width=100)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = make_config(temp_dir)
+            results = asyncio.run(
+                run_session(config, client, "CoVe", dashboard=True, console=console)
+            )
+            saved = [p.name for p in (Path(temp_dir) / "output" / "dossiers").iterdir()]
+            lengths = Path(temp_dir) / "cache" / "output_lengths.json"
+            assert lengths.exists()
+
+        assert [r.number for r in results] == ["1.0"]
+        assert saved == ["1.0.md"]
+        assert client.telemetry is not None
+        assert client.telemetry.snapshot().latency["search"].calls == 1
+        assert "Session" in console.file.getvalue()
+
+    def test_session_writes_metrics_textfile(self):
+        """Test that the metrics textfile is written when the session ends."""
+        client = MockLLMClient(
+            responses={STAGE_DECOMPOSITION: "1.0 Q?"}, default="text"
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = make_config(temp_dir).override(
+                data={"metrics_textfile": str(Path(temp_dir) / "ai.prom")}
+            )
+            asyncio.run(run_session(config, client, "CoVe"))
+            text = Path(config.data.metrics_textfile).read_text(encoding="utf-8")
+
+        assert (
+            'airesearcher_llm_requests_total{provider="mock",stage="strategy"}' in text
+        )
+        assert "airesearcher_storage_writes_total" in text
+
+    def test_session_profile_writes_reports(self):
+        """Test that --profile cpu leaves per-stage reports in output/profiles."""
+        client = MockLLMClient(
+            responses={STAGE_DECOMPOSITION: "1.0 Q?", STAGE_DOSSIER: "# D"},
+            default="text",
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = make_config(temp_dir)
+            asyncio.run(run_session(config, client, "CoVe", profile="cpu"))
+            profiles = {
+                p.name for p in (Path(temp_dir) / "output" / "profiles").iterdir()
+            }
+
+        assert {"prompt_render.pstats", "parse.pstats", "cpu.collapsed"} <= profiles
+
+    def test_recorded_session_replays_offline(self):
+        """Test that a recorded session replays to the same dossiers."""
+        client = MockLLMClient(
+            responses={STAGE_DECOMPOSITION: "1.0 Q?", STAGE_DOSSIER: "# Recorded"},
+            default="text",
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cassette = Path(temp_dir) / "session.jsonl.gz"
+            manager = ConfigManager()
+            recorder = RecordingLLMClient(client, cassette)
+            config = make_config(temp_dir)
+            asyncio.run(run_session(config, recorder, "CoVe"))
+            recorder.close()
+
+            replay_config = make_config(temp_dir).override(
+                data={
+                    "output_dir": str(Path(temp_dir) / "replayed"),
+                    "cache_dir": str(Path(temp_dir) / "cache2"),
+                }
+            )
+            replay = build_client(manager, replay=str(cassette), replay_latency="zero")
+            results = asyncio.run(run_session(replay_config, replay, "CoVe"))
+            dossier = results[0].dossier_path.read_text(encoding="utf-8")
+
+        assert isinstance(replay, ReplayLLMClient)
+        assert recorder.budget is None
+        assert replay.budget is None
+        assert dossier == "# Recorded"
+        assert replay.remaining == 0
+
+
+class TestCli:
+    """Test cases for the click commands."""
+
+    def test_run_help(self):
+        """Test that the run command documents its options."""
+        result = CliRunner().invoke(main, ["run", "--help"])
+
+        assert result.exit_code == 0
+        assert "--dashboard" in result.output
+        assert "--metrics-port" in result.output
+        assert "--profile" in result.output
+        assert "--strategist" in result.output
+
+    def test_serve_help(self):
+        """Test that the serve command documents its listeners."""
+        result = CliRunner().invoke(main, ["serve", "--help"])
+
+        assert result.exit_code == 0
+        assert "--socket" in result.output
+        assert "--max-jobs" in result.output
+
+    def test_prewarm_help(self):
+        """Test that the prewarm command documents its options."""
+        result = CliRunner().invoke(main, ["prewarm", "--help"])
+
+        assert result.exit_code == 0
+        assert "--mindmap" in result.output
+        assert "--concurrency" in result.output
+
+    def test_mindmap_dry_run_reports_diff(self):
+        """Test that mindmap --dry-run only reports the node diff."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = Path(temp_dir) / "mindmap.csv"
+            csv_path.write_text('"Level 1","Level 2"\n"AI","CoVe"\n', encoding="utf-8")
+            config_path = Path(temp_dir) / "config.yaml"
+            config_path.write_text(f"data:\n  output_dir: {temp_dir}\n")
+            result = CliRunner().invoke(
+                main,
+                [
+                    "--config",
+                    str(config_path),
+                    "mindmap",
+                    "--mindmap",
+                    str(csv_path),
+                    "--dry-run",
+                ],
+            )
+
+        assert result.exit_code == 0
+        assert "1 added, 0 removed, 0 changed, 0 unchanged" in result.output
+
+    def test_status_reports_progress_and_gaps(self):
+        """Test that status shows per-branch progress and missing nodes."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = Path(temp_dir) / "mindmap.csv"
+            csv_path.write_text(
+                '"Level 1","Level 2","Level 3"\n"AI","CoVe","Plan"\n',
+                encoding="utf-8",
+            )
+            config_path = Path(temp_dir) / "config.yaml"
+            config_path.write_text(f"data:\n  output_dir: {temp_dir}\n")
+            prefix = ["--config", str(config_path), "status", "--mindmap"]
+            progress = CliRunner().invoke(main, [*prefix, str(csv_path)])
+            gaps = CliRunner().invoke(
+                main, [*prefix, str(csv_path), "--level", "3", "--missing"]
+            )
+
+        assert progress.exit_code == 0
+        assert "0%       0/2       AI > CoVe" in progress.output
+        assert gaps.exit_code == 0
+        assert "AI > CoVe > Plan\n1 Level 3 nodes lack stage dossier" in gaps.output
+
+    def test_cited_by_lists_dossiers(self):
+        """Test that cited-by reports the dossiers citing a URL."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = make_config(temp_dir)
+            store = CitationStore.from_config(config)
+            store.add("run:1.1", "See https://example.com/report.")
+            store.close()
+            config_path = Path(temp_dir) / "config.yaml"
+            config_path.write_text(f"data:\n  cache_dir: {config.data.cache_dir}\n")
+            result = CliRunner().invoke(
+                main,
+                [
+                    "--config",
+                    str(config_path),
+                    "cited-by",
+                    "https://example.com/report",
+                ],
+            )
+
+        assert result.exit_code == 0
+        assert "run:1.1\n1 dossiers cite" in result.output
+
+    def test_prompts_reports_token_savings(self):
+        """Test that the prompts command compares variant token counts."""
+        result = CliRunner().invoke(main, ["prompts", "--profile", "compact"])
+
+        assert result.exit_code == 0
+        assert "full   compact   minimal" in result.output
+        assert "Profile compact sends" in result.output
+        assert "saved" in result.output
+
+    def test_run_rejects_unknown_strategist(self):
+        """Test that strategist choices are validated."""
+        result = CliRunner().invoke(main, ["run", "topic", "--strategist", "x"])
+
+        assert result.exit_code != 0
+        assert "Invalid value" in result.output
@@ -0,0 +1,74 @@
+"""Tests for the live session dashboard."""
+
+import asyncio
+import io
+import tempfile
+
+import pytest
+from rich.console import Console
+
+from src.core.deadline import Deadline
+from src.core.telemetry import Telemetry
+from src.data.cache import ResponseCache
+from src.engine.scheduler import ResearchScheduler
+from src.ui.dashboard import SessionDashboard
+
+
+def make_console():
+    """Console writing to a string buffer."""
+    return Console(file=io.StringIO(), width=100, force_terminal=False)
+
+
+class TestSessionDashboard:
+    """Test cases for SessionDashboard class."""
+
+    def test_render_shows_session_numbers(self):
+        """Test that the rendered view contains the live metrics."""
+        telemetry = Telemetry()
+        telemetry.queue_changed(2, 3)
+        telemetry.call_started("openai")
+        telemetry.call_finished(
+            "openai", "dossier", 1.5, input_tokens=400, output_tokens=200
+        )
+        telemetry.call_started("openai")
+        telemetry.record_wait("slots", 2.0)
+        scheduler = ResearchScheduler(3, Deadline(600))
+        console = make_console()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dashboard = SessionDashboard(
+                telemetry, scheduler, ResponseCache(temp_dir), console=console
+            )
+            console.print(dashboard.render())
+        output = console.file.getvalue()
+
+        assert "openai 1/3" in output
+        assert "dossier" in output
+        assert "1.50s" in output
+        assert "Wait: slots" in output
+        assert "Cache hit rate" in output
+        assert "Deadline in" in output
+
+    def test_run_refreshes_until_cancelled(self):
+        """Test that the refresh loop runs in its own task and stops on cancel."""
+
+        async def scenario():
+            dashboard = SessionDashboard(
+                Telemetry(),
+                ResearchScheduler(1),
+                refresh_interval=0.01,
+                console=make_console(),
+            )
+            task = asyncio.create_task(dashboard.run())
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return dashboard.console.file.getvalue()
+
+        assert "Session" in asyncio.run(scenario())
+
+    def test_invalid_refresh_interval(self):
+        """Test that a non-positive refresh interval is rejected."""
+        with pytest.raises(ValueError, match="Refresh interval must be positive"):
+            SessionDashboard(Telemetry(), ResearchScheduler(1), refresh_interval=0)
@@ -0,0 +1,244 @@
+"""Tests for LLM response parsers."""
+
+from src.utils.parsers import (
+    PARSE_FAILED,
+    PARSE_MARKDOWN,
+    PARSE_STRUCTURED,
+    Citation,
+    Question,
+    apply_section_patch,
+    extract_citations,
+    extract_next_level_questions,
+    extract_next_level_section,
+    next_level_end,
+    normalize_url,
+    parse_numbered_questions,
+    parse_questions,
+    parse_structured_questions,
+    split_next_level_section,
+    split_sections,
+)
+
+DECOMPOSITION = """Here are the key questions:
+
+1.0 What is Chain-of-Verification?
+2.0 **How** are verification questions planned?
+- 3.0: Which benchmarks measure hallucination?
+Not a question line
+2.0 Duplicate number is ignored
+
+Please select a question for the next stage.
+"""
+
+DOSSIER = """### **Research Dossier: CoVe**
+
+#### **4. Synthesis & Strategic Outlook**
+
+Some analysis mentioning 1.2 in passing.
+
+#### **5. Next-Level Questions**
+
+- **[1.1.1]** How does factored CoVe differ from joint CoVe?
+- **[1.1.2]** What is the latency overhead of verification?
+
+#### Appendix
+
+- **[9.9.9]** Not part of the section
+"""
+
+RUSSIAN_DOSSIER = """- **Ключевой ответ:** ...
+- **Вопросы следующего уровня (Кандидаты для иерархии 1.1.X):**
+    - 1.1.1. Как измерить долю галлюцинаций?
+    - 1.1.2) Какие метрики используются?
+"""
+
+
+class TestParseNumberedQuestions:
+    """Test cases for parse_numbered_questions."""
+
+    def test_decomposition_format(self):
+        """Test extraction of Stage 1 style numbered questions."""
+        questions = parse_numbered_questions(DECOMPOSITION)
+
+        assert questions == [
+            Question("1.0", "What is Chain-of-Verification?"),
+            Question("2.0", "How are verification questions planned?"),
+            Question("3.0", "Which benchmarks measure hallucination?"),
+        ]
+
+    def test_question_depth(self):
+        """Test that depth ignores a trailing .0."""
+        assert Question("1.0", "q").depth == 1
+        assert Question("1.2", "q").depth == 2
+        assert Question("1.2.3", "q").depth == 3
+
+
+class TestStructuredQuestions:
+    """Test cases for JSON question lists and the markdown fallback."""
+
+    def test_fenced_json_is_parsed(self):
+        """Test that fenced JSON is accepted and bad items are dropped."""
+        text = """```json
+{"questions": [
+  {"number": "1.0", "text": " What is CoVe? "},
+  {"number": "[1.1]", "text": "Why verify?"},
+  {"number": "one", "text": "Not numbered"},
+  {"number": "1.1", "text": "Duplicate"},
+  {"number": "2.0", "text": ""}
+]}
+```"""
+        assert parse_structured_questions(text) == [
+            Question("1.0", "What is CoVe?"),
+            Question("1.1", "Why verify?"),
+        ]
+
+    def test_non_json_returns_none(self):
+        """Test that free text and other JSON shapes are not structured."""
+        assert parse_structured_questions(DECOMPOSITION) is None
+        assert parse_structured_questions('{"items": []}') is None
+
+    def test_parse_questions_outcomes(self):
+        """Test that parse_questions reports how the questions were obtained."""
+        structured = '{"questions": [{"number": "1.0", "text": "Q?"}]}'
+
+        assert parse_questions(structured) == (
+            [Question("1.0", "Q?")],
+            PARSE_STRUCTURED,
+        )
+        assert parse_questions(DECOMPOSITION)[1] == PARSE_MARKDOWN
+        assert parse_questions('{"questions": []}') == ([], PARSE_FAILED)
+        assert parse_questions("No questions here.") == ([], PARSE_FAILED)
+
+
+class TestNextLevelExtraction:
+    """Test cases for next-level question extraction from dossiers."""
+
+    def test_section_ends_at_next_heading(self):
+        """Test that only the Next-Level Questions section is parsed."""
+        questions = extract_next_level_questions(DOSSIER)
+
+        assert [q.number for q in questions] == ["1.1.1", "1.1.2"]
+        assert questions[1].text == "What is the latency overhead of verification?"
+
+    def test_russian_dossier_structure(self):
+        """Test the Targeted Research Dossier Engine (Russian) layout."""
+        questions = extract_next_level_questions(RUSSIAN_DOSSIER)
+
+        assert [q.number for q in questions] == ["1.1.1", "1.1.2"]
+        assert questions[0].text == "Как измерить долю галлюцинаций?"
+
+    def test_missing_section(self):
+        """Test that dossiers without the section yield nothing."""
+        assert extract_next_level_section("# Dossier\n\n1.1 text") == ""
+        assert extract_next_level_questions("# Dossier\n\n1.1 text") == []
+
+    def test_split_excludes_section_from_body(self):
+        """Test that the body keeps text around the section but not its questions."""
+        body, section = split_next_level_section(DOSSIER)
+
+        assert "factored CoVe" in section
+        assert "factored CoVe" not in body
+        assert "Next-Level" not in body
+        assert "Synthesis & Strategic Outlook" in body
+        assert "Appendix" in body
+        assert split_next_level_section("# Only body") == ("# Only body", "")
+
+
+class TestNextLevelEnd:
+    """Test cases for detecting a complete streamed dossier."""
+
+    def test_closing_remark_after_questions_is_cut(self):
+        """Test that the dossier ends before text following its questions."""
+        dossier = DOSSIER.split("#### Appendix", maxsplit=1)[0] + "I hope this helps!\n"
+
+        end = next_level_end(dossier)
+
+        assert end is not None
+        assert dossier[:end].rstrip().endswith("latency overhead of verification?")
+
+    def test_heading_after_questions_ends_dossier(self):
+        """Test that a heading of the section's level closes it."""
+        end = next_level_end(DOSSIER)
+
+        assert end is not None
+        assert DOSSIER[end:].startswith("#### Appendix")
+
+    def test_incomplete_dossiers_continue(self):
+        """Test that partial lines, open sections and sources are kept."""
+        head = DOSSIER.split("#### Appendix", maxsplit=1)[0]
+
+        assert next_level_end(head) is None
+        assert next_level_end(head + "I hope") is None
+        assert next_level_end("Body\n\nMore body\n\nEnd\n") is None
+        assert next_level_end(head + "**Sources:**\n- a\n\nBye\n") is None
+        assert next_level_end(RUSSIAN_DOSSIER) is None
+
+
+class TestCitations:
+    """Test cases for citation extraction."""
+
+    def test_links_and_bare_urls_are_extracted_once(self):
+        """Test that a source cited several ways is returned once, titled."""
+        text = (
+            "Adoption grew 40% (https://www.Example.com/report/?utm_source=x).\n"
+            "- [Example report](https://example.com/report#summary)\n"
+            "- See also https://arxiv.org/abs/2309.11495."
+        )
+
+        assert extract_citations(text) == [
+            Citation("https://example.com/report", "Example report"),
+            Citation("https://arxiv.org/abs/2309.11495"),
+        ]
+
+    def test_normalize_url_keeps_meaningful_query(self):
+        """Test that only tracking parameters are dropped from the query."""
+        url = "HTTPS://Docs.Example.com/a/?page=2&utm_medium=email"
+
+        assert normalize_url(url) == "https://docs.example.com/a?page=2"
+
+
+SECTIONED = """- **Досье по запросу 1.1:**
+- **Key facts:**
+    - **Adoption:** 40% of teams
+#### **Next-Level Questions**
+- **[1.1.1]** Deeper question?
+"""
+
+
+class TestSectionPatch:
+    """Test cases for section-level dossier patches."""
+
+    def test_split_sections_round_trips(self):
+        """Test that sections start at headings and bold labels only."""
+        sections = split_sections("Intro\n" + SECTIONED)
+
+        assert [key for key, _ in sections] == [
+            None,
+            "досье по запросу 1.1",
+            "key facts",
+            "next-level questions",
+        ]
+        assert "".join(text for _, text in sections) == "Intro\n" + SECTIONED
+
+    def test_patch_replaces_and_adds_sections(self):
+        """Test that matching sections are replaced and new ones inserted."""
+        patch = (
+            "Here are the changes:\n\n"
+            "**Key facts**:\n    - **Adoption:** 55% of teams\n"
+            "- **Risks:**\n    - Vendor lock-in"
+        )
+
+        patched, sections = apply_section_patch(SECTIONED, patch)
+
+        assert sections == ["**Key facts**:", "- **Risks:**"]
+        assert "55% of teams" in patched
+        assert "40% of teams" not in patched
+        assert patched.index("Vendor lock-in\n") < patched.index("Next-Level")
+        assert patched.startswith("- **Досье по запросу 1.1:**\n")
+
+    def test_unchanged_sections_are_not_reported(self):
+        """Test that repeating a section or answering NO CHANGES changes nothing."""
+        repeated = "- **Key facts:**\n    - **Adoption:** 40% of teams\n"
+
+        assert apply_section_patch(SECTIONED, repeated) == (SECTIONED, [])
+        assert apply_section_patch(SECTIONED, "NO CHANGES") == (SECTIONED, [])
@@ -0,0 +1,82 @@
+"""Tests for per-stage profiling."""
+
+import pstats
+import tempfile
+import time
+
+import pytest
+
+from src.utils.parsers import parse_numbered_questions
+from src.utils.profiling import (
+    StageProfiler,
+    active_profiler,
+    profile_scope,
+    profile_snapshot,
+    profiled,
+)
+
+
+@profiled("busy")
+def busy(n):
+    """Burn a little CPU inside a profiled stage."""
+    return sum(i * i for i in range(n))
+
+
+class TestStageProfiler:
+    """Test cases for StageProfiler class."""
+
+    def test_scopes_are_noops_without_profiler(self):
+        """Test that profiling helpers do nothing when no profiler is active."""
+        assert active_profiler() is None
+        with profile_scope("idle"):
+            assert busy(10) == 285
+        profile_snapshot("ignored")
+
+    def test_invalid_mode(self):
+        """Test that unknown modes are rejected."""
+        with pytest.raises(ValueError, match="Invalid profile mode"):
+            StageProfiler("gpu", ".")
+
+    def test_cpu_mode_writes_pstats_and_collapsed_stacks(self):
+        """Test per-stage pstats files, nested scopes and collapsed stacks."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profiler = StageProfiler("cpu", temp_dir, sample_interval=0.001)
+            profiler.start()
+            with profile_scope("outer"):
+                busy(20000)
+                parse_numbered_questions("1.0 First?\n2.0 Second?")
+            deadline = time.monotonic() + 0.05
+            while time.monotonic() < deadline:
+                busy(1000)
+            written = {p.name for p in profiler.stop()}
+            stats = pstats.Stats(str(profiler.profile_dir / "parse.pstats"))
+            collapsed = (profiler.profile_dir / "cpu.collapsed").read_text()
+            summary = (profiler.profile_dir / "cpu.txt").read_text()
+
+        assert {"outer.pstats", "busy.pstats", "parse.pstats"} <= written
+        assert any("parse_numbered_questions" in f[2] for f in stats.stats)
+        line = collapsed.splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert ";" in stack
+        assert "busy\t" in summary
+        assert active_profiler() is None
+
+    def test_mem_mode_reports_allocations(self):
+        """Test net allocations per stage and top-allocation snapshots."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profiler = StageProfiler("mem", temp_dir)
+            profiler.start()
+            with profile_scope("dossier_strings"):
+                kept = [str(i) * 1000 for i in range(200)]
+            profile_snapshot("depth-1")
+            written = {p.name for p in profiler.stop()}
+            summary = (profiler.profile_dir / "memory.txt").read_text()
+            top = (profiler.profile_dir / "depth-1.top.txt").read_text()
+
+        assert len(kept) == 200
+        assert written == {"final.top.txt", "memory.txt"}
+        row = next(r for r in summary.splitlines() if r.startswith("dossier_strings"))
+        assert int(row.split("\t")[3]) > 200 * 1000
+        assert "## By line" in top
+        assert "test_profiling.py" in top